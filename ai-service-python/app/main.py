@@ -1,21 +1,46 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
 from pydantic import BaseModel
-from typing import Optional
-import uvicorn
+from typing import List, Literal, Optional
 import os
 import sys
 
 # Add parent directory to path to allow imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.services.parser import extract_text_from_pdf
+from app.services.parser import extract_text_from_pdf, PDFLimitError, PDF_MAX_BYTES
+from app.services.http import download_bytes, ResponseTooLarge
 from app.services.llm import analyze_resume_text
+from app.services.index import get_resume_index
+from app.services.cache import llm_cache
+from app.services.concurrency import configure_io_threads, cpu_executor, run_cpu
+from app.services.llm_client import llm_client
+from app.services.scraper import google_jobs_cache, job_search_cache, page_cache
+from app.services.embeddings import EmbeddingUnavailable, embedder, embeddings_enabled, index_resume
+from app.services.job_artifacts import job_artifacts
+from app.services.metrics import span
 
-app = FastAPI(title="AI Resume Service")
+# Coroutines awaited once when the app starts (threadpool sizing, model loading and other warm-up)
+STARTUP_HOOKS = [configure_io_threads]
+
+
+@asynccontextmanager
+async def lifespan(app):
+    for hook in STARTUP_HOOKS:
+        await hook()
+    yield
+
+
+app = FastAPI(title="AI Resume Service", lifespan=lifespan)
+
+# Stop PDF extraction once this much text is collected (the LLM prompt uses the first 10,000)
+RESUME_TEXT_MAX_CHARS = int(os.getenv("RESUME_TEXT_MAX_CHARS", "20000"))
 
 
 class ResumeRequest(BaseModel):
     file_path: str
+    resume_id: Optional[str] = None  # When set, the extracted text is added to the resume index
+    bypass_cache: bool = False  # Force a fresh LLM analysis
 
 
 @app.get("/")
@@ -23,161 +48,594 @@ def read_root():
     return {"message": "AI Service is running", "version": "feature-job-search-v2"}
 
 
+def _cache_stats() -> dict:
+    return {
+        "llm": llm_cache.stats(),
+        "job_search": job_search_cache.stats(),
+        "serpapi": google_jobs_cache.stats(),
+        "pages": page_cache.stats(),
+        "embeddings": embedder.stats(),
+        "job_artifacts": job_artifacts.stats(),
+    }
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counters for the service's result caches."""
+    return {"success": True, "data": _cache_stats()}
+
+
+@app.get("/llm/stats")
+def llm_stats():
+    """Per-provider call counts and latency for the LLM client."""
+    return {"success": True, "data": llm_client.stats()}
+
+
+@app.get("/concurrency/stats")
+def concurrency_stats():
+    """Occupancy of the CPU executor."""
+    return {"success": True, "data": {"cpu": cpu_executor.stats()}}
+
+
+# --- Observability ---
+#
+# Every request gets an id (X-Request-ID from the Node backend, or a new one),
+# echoed in the response along with a Server-Timing header of its stage spans
+# (download, pdf_parse, llm_call per provider, llm_json_parse, job_search per
+# provider, tfidf, ...). Streaming responses (SSE, NDJSON) get no Server-Timing
+# and are timed until their body ends. Requests slower than SLOW_REQUEST_SECONDS are logged with
+# their breakdown. /metrics serves the histograms and counters in Prometheus format.
+
+import time
+import uuid
+
+from fastapi import Request
+from fastapi.responses import PlainTextResponse
+from app.services.metrics import (
+    SLOW_REQUEST_SECONDS, format_stages, registry, request_scope, request_seconds, server_timing,
+)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+# Responses whose body is still being produced after the headers are sent
+STREAMING_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
+
+
+def _finish_request(request: Request, rid: str, status: int, start: float, stages: list):
+    elapsed = time.perf_counter() - start
+    # Label by route template so ids in the path do not create new series
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    request_seconds.observe(elapsed, method=request.method, route=route, status=str(status))
+    if elapsed >= SLOW_REQUEST_SECONDS:
+        print(f"Slow request {rid}: {request.method} {route} {status} in {elapsed:.2f}s; "
+              f"{format_stages(stages) or 'no stages'}")
+
+
+async def _finish_after_body(body, request: Request, rid: str, status: int, start: float, stages: list):
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        _finish_request(request, rid, status, start, stages)
+
+
+@app.middleware("http")
+async def instrument_request(request: Request, call_next):
+    rid = (request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex)[:128]
+    start = time.perf_counter()
+    with request_scope(rid) as stages:
+        try:
+            response = await call_next(request)
+        except BaseException:
+            _finish_request(request, rid, 500, start, stages)
+            raise
+    response.headers[REQUEST_ID_HEADER] = rid
+    if response.headers.get("content-type", "").split(";")[0] in STREAMING_MEDIA_TYPES:
+        # The stream's stages (LLM calls, ...) are still to come: time the request when the
+        # body ends, and leave out Server-Timing, which would have to be sent incomplete
+        response.body_iterator = _finish_after_body(response.body_iterator, request, rid,
+                                                    response.status_code, start, stages)
+        return response
+    _finish_request(request, rid, response.status_code, start, stages)
+    if stages:
+        response.headers["Server-Timing"] = server_timing(stages)
+    return response
+
+
+def _collect_service_metrics() -> list:
+    """Cache, LLM provider and CPU executor counters, read from their existing stats."""
+    hits, misses = [], []
+    for name, stats in _cache_stats().items():
+        if name == "job_artifacts":
+            served, missed = stats["memory_hits"] + stats["disk"]["hits"], stats["computed"]
+        else:
+            served = stats["hits"] + stats.get("stale_hits", 0) + stats.get("coalesced", 0)
+            missed = stats["misses"]
+        hits.append(({"cache": name}, served))
+        misses.append(({"cache": name}, missed))
+
+    providers = llm_client.stats()
+    cpu = cpu_executor.stats()
+    return [
+        ("cache_hits_total", "counter", "Lookups served from a cache (fresh, stale or coalesced).", hits),
+        ("cache_misses_total", "counter", "Lookups that went to the upstream or recomputed.", misses),
+        ("llm_calls_total", "counter", "LLM provider attempts.",
+         [({"provider": name}, p["calls"]) for name, p in providers.items()]),
+        ("llm_errors_total", "counter", "Failed LLM provider attempts.",
+         [({"provider": name}, p["errors"]) for name, p in providers.items()]),
+        ("llm_retries_total", "counter", "LLM provider retries.",
+         [({"provider": name}, p["retries"]) for name, p in providers.items()]),
+        ("llm_timeouts_total", "counter", "LLM provider attempts that timed out.",
+         [({"provider": name}, p["timeouts"]) for name, p in providers.items()]),
+        ("cpu_executor_active", "gauge", "CPU executor calls running.", [({}, cpu["active"])]),
+        ("cpu_executor_queued", "gauge", "CPU executor calls waiting for a worker.", [({}, cpu["queued"])]),
+    ]
+
+
+registry.collectors.append(_collect_service_metrics)
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+async def _load_resume_source(file_path: str):
+    """
+    Resolves a file path or URL to something the PDF parser can read.
+    URLs are streamed into memory (size-capped) over the pooled HTTP client.
+    """
+    if file_path.startswith(('http://', 'https://')):
+        try:
+            with span("download"):
+                return await download_bytes(file_path, max_bytes=PDF_MAX_BYTES)
+        except ResponseTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except Exception as e:
+            print(f"Download Error: {e}")
+            raise HTTPException(status_code=400, detail="Failed to download file from URL")
+
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail=f"File not found at {file_path}")
+    return file_path
+
+
+async def _extract_resume_text(source) -> str:
+    """Extracts PDF text on the CPU executor, mapping parser failures to HTTP errors."""
+    try:
+        text = await run_cpu(extract_text_from_pdf, source, max_chars=RESUME_TEXT_MAX_CHARS)
+    except PDFLimitError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    if not text:
+        raise HTTPException(status_code=500, detail="Failed to extract text from PDF")
+    return text
+
+
+async def _index_resume(resume_id: Optional[str], text: str):
+    if resume_id:
+        try:
+            await run_cpu(get_resume_index().upsert, resume_id, text)
+        except Exception as e:
+            print(f"Resume Index Error: {e}")
+        if embeddings_enabled():
+            try:
+                await run_cpu(index_resume, resume_id, text)
+            except Exception as e:
+                print(f"Embedding Index Error: {e}")
+
+
+async def _process_pdf(source, resume_id: Optional[str], bypass_cache: bool) -> dict:
+    """Extracts text from a PDF source, indexes it and runs the LLM analysis."""
+    text = await _extract_resume_text(source)
+    await _index_resume(resume_id, text)
+
+    analysis = await analyze_resume_text(text, bypass_cache=bypass_cache)
+
+    return {
+        "success": True,
+        "text_preview": text[:200],
+        "data": analysis
+    }
+
+
 @app.post("/process-resume")
-def process_resume(request: ResumeRequest):
+async def process_resume(request: ResumeRequest):
     """
     Receives a file path (from Node.js), extracts text,
     and returns structured data using LLM.
     """
-    file_path = request.file_path
-    temp_file = None
+    source = await _load_resume_source(request.file_path)
+    return await _process_pdf(source, request.resume_id, request.bypass_cache)
+
+
+@app.post("/process-resume/upload")
+async def process_resume_upload(
+    file: UploadFile = File(...),
+    resume_id: Optional[str] = Form(None),
+    bypass_cache: bool = Form(False),
+):
+    """Same as /process-resume, but the PDF bytes are pushed as a multipart upload."""
+    data = await file.read(PDF_MAX_BYTES + 1)
+    if len(data) > PDF_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"PDF exceeds the {PDF_MAX_BYTES} byte limit")
+    return await _process_pdf(data, resume_id, bypass_cache)
+
+
+# --- Background resume processing ---
+
+from fastapi.responses import JSONResponse
+from app.services.jobqueue import JOB_QUEUE_ENABLED, JobQueue, QueueFull, RetryableJobError, create_broker
+
+
+async def _run_resume_job(payload: dict) -> dict:
+    """Queue handler for resume processing; LLM failures are retried, bad inputs are not."""
+    source = await _load_resume_source(payload["file_path"])
+    result = await _process_pdf(source, payload.get("resume_id"), payload.get("bypass_cache", False))
+    if "error" in result["data"]:
+        raise RetryableJobError(result["data"]["error"])
+    return result
+
+
+resume_queue = JobQueue(create_broker(), handlers={"process_resume": _run_resume_job})
 
+
+async def _resume_queued_jobs():
+    """Picks up jobs left queued (or running) by the previous process, without waiting for a new submit."""
+    if JOB_QUEUE_ENABLED:
+        resume_queue.start_if_pending()
+
+
+STARTUP_HOOKS.append(_resume_queued_jobs)
+
+
+def _public_job(job: dict) -> dict:
+    return {k: job[k] for k in ("id", "status", "attempts", "result", "error", "created_at", "updated_at")}
+
+
+@app.post("/process-resume/async", status_code=202)
+def process_resume_async(request: ResumeRequest):
+    """Queues resume processing and returns a job id to poll at /jobs/{id}."""
+    if not JOB_QUEUE_ENABLED:
+        raise HTTPException(status_code=503, detail="Background processing is disabled; use /process-resume")
     try:
-        if file_path.startswith(('http://', 'https://')):
-            import requests
-            import tempfile
+        job = resume_queue.submit("process_resume", dict(request))
+    except QueueFull as e:
+        return JSONResponse(status_code=429, content={"detail": str(e)}, headers={"Retry-After": "5"})
+    return {"success": True, "job_id": job["id"], "status": job["status"]}
 
-            response = requests.get(file_path)
-            if response.status_code != 200:
-                raise HTTPException(status_code=400, detail="Failed to download file from URL")
 
-            temp_fd, temp_path = tempfile.mkstemp(suffix=".pdf")
-            with os.fdopen(temp_fd, 'wb') as tmp:
-                tmp.write(response.content)
+@app.get("/queue/stats")
+def queue_stats():
+    """Depth, capacity and per-status job counts for the resume processing queue."""
+    return {"success": True, "data": resume_queue.stats()}
 
-            file_path = temp_path
-            temp_file = temp_path
 
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail=f"File not found at {file_path}")
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status (and result once finished) of a queued resume processing job."""
+    job = resume_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "data": _public_job(job)}
 
-        text = extract_text_from_pdf(file_path)
 
-        if not text:
-            raise HTTPException(status_code=500, detail="Failed to extract text from PDF")
+# --- Bulk ingestion ---
 
-        analysis = analyze_resume_text(text)
+import asyncio
+import json
+from fastapi.responses import StreamingResponse
+from app.services.llm import ResumeBatcher
 
-        return {
-            "success": True,
-            "text_preview": text[:200],
-            "data": analysis
-        }
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+BULK_MAX_CONCURRENCY = int(os.getenv("BULK_MAX_CONCURRENCY", "32"))
 
+
+class BulkResumeItem(BaseModel):
+    file_path: str
+    resume_id: Optional[str] = None
+
+
+class BulkResumeRequest(BaseModel):
+    items: List[BulkResumeItem]
+    download_concurrency: int = 8  # Concurrent downloads + PDF parses
+    llm_concurrency: int = 4  # Concurrent LLM extractions
+    bypass_cache: bool = False
+    batch_llm: bool = False  # Pack several resumes into each LLM prompt
+
+
+async def _bulk_process_item(position: int, item: BulkResumeItem, io_limit, llm_limit, bypass_cache: bool,
+                             batcher: Optional[ResumeBatcher] = None) -> dict:
+    """Processes one manifest entry; any failure is reported on the item instead of raised."""
+    start = time.perf_counter()
+    outcome = {"type": "result", "index": position, "resume_id": item.resume_id, "file_path": item.file_path}
+    try:
+        async with io_limit:
+            source = await _load_resume_source(item.file_path)
+            text = await _extract_resume_text(source)
+        await _index_resume(item.resume_id, text)
+
+        if batcher is not None:
+            # Batched prompts; the provider semaphores bound concurrency
+            analysis = await batcher.analyze(position, text)
+        else:
+            async with llm_limit:
+                analysis = await analyze_resume_text(text, bypass_cache=bypass_cache)
+
+        if "error" in analysis:
+            outcome.update(success=False, error=analysis["error"])
+        else:
+            outcome.update(success=True, text_preview=text[:200], data=analysis)
+    except Exception as e:
+        outcome.update(success=False, error=getattr(e, "detail", None) or str(e))
+    outcome["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return outcome
+
+
+async def _bulk_stream(request: BulkResumeRequest):
+    """Yields one NDJSON line per resume as it completes, then a summary line."""
+    io_limit = asyncio.Semaphore(max(1, min(request.download_concurrency, BULK_MAX_CONCURRENCY)))
+    llm_limit = asyncio.Semaphore(max(1, min(request.llm_concurrency, BULK_MAX_CONCURRENCY)))
+    batcher = ResumeBatcher(bypass_cache=request.bypass_cache) if request.batch_llm else None
+    start = time.perf_counter()
+    succeeded = failed = 0
+
+    tasks = [
+        asyncio.ensure_future(_bulk_process_item(i, item, io_limit, llm_limit, request.bypass_cache, batcher))
+        for i, item in enumerate(request.items)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            outcome = await next_done
+            if outcome["success"]:
+                succeeded += 1
+            else:
+                failed += 1
+            yield json.dumps(outcome) + "\n"
     finally:
-        if temp_file and os.path.exists(temp_file):
-            os.remove(temp_file)
+        # Client went away: stop the remaining work
+        for task in tasks:
+            task.cancel()
+
+    elapsed = time.perf_counter() - start
+    yield json.dumps({
+        "type": "summary",
+        "total": len(tasks),
+        "succeeded": succeeded,
+        "failed": failed,
+        "elapsed_s": round(elapsed, 3),
+        "resumes_per_minute": round(len(tasks) / elapsed * 60, 1) if elapsed > 0 else None,
+    }) + "\n"
+
+
+@app.post("/process-resumes/bulk")
+async def process_resumes_bulk(request: BulkResumeRequest):
+    """
+    Processes a manifest of resume paths/URLs concurrently and streams NDJSON:
+    one "result" line per resume as it finishes, then a "summary" line.
+    """
+    if len(request.items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    return StreamingResponse(_bulk_stream(request), media_type="application/x-ndjson")
+
+
+# --- Streaming resume analysis ---
+
+from app.services.llm import stream_resume_analysis
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/process-resume/stream")
+async def process_resume_stream(request: ResumeRequest):
+    """
+    Same input as /process-resume, but the analysis is streamed as Server-Sent Events:
+      "text"    text_preview once the PDF is parsed
+      "field"   {"field", "value"} for each top-level field as soon as it is complete
+      "result"  the final validated analysis
+      "error"   if the LLM call fails
+    Download and PDF errors are still returned as plain HTTP errors.
+    """
+    source = await _load_resume_source(request.file_path)
+    text = await _extract_resume_text(source)
+    await _index_resume(request.resume_id, text)
+
+    async def events():
+        yield _sse("text", {"text_preview": text[:200]})
+        async for event in stream_resume_analysis(text, bypass_cache=request.bypass_cache):
+            yield _sse(event.pop("event"), event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # --- Phase 4 Endpoints ---
 
-from app.services.matcher import calculate_match_score
-from app.services.scraper import scrape_job_description
+from app.services.matcher import calculate_match_score, calculate_batch_match_scores, search_candidates
+from app.services.embeddings import EMBEDDING_PRELOAD, get_embedding_index
+from app.services.scraper import fetch_job_page, scrape_job_pages
+
+SCRAPE_BATCH_MAX_URLS = int(os.getenv("SCRAPE_BATCH_MAX_URLS", "100"))
+
+MatchMode = Literal["tfidf", "embedding", "hybrid"]
+
+
+async def _load_embedding_model():
+    """Loads the embedding model at startup so the first semantic match is not slowed down."""
+    if embeddings_enabled() and EMBEDDING_PRELOAD:
+        try:
+            await run_cpu(embedder.load)
+        except EmbeddingUnavailable as e:
+            print(f"Embedding Model Error: {e}")
+
+
+STARTUP_HOOKS.append(_load_embedding_model)
 
 
 class JobMatchRequest(BaseModel):
     resume_text: str
     job_description: str
+    mode: MatchMode = "tfidf"
+    job_id: Optional[str] = None  # Lets the job's cached artifacts be replaced when its description changes
+
+
+class BatchResumeItem(BaseModel):
+    id: str
+    resume_text: str
+
+
+class BatchJobMatchRequest(BaseModel):
+    job_description: str
+    resumes: List[BatchResumeItem]
+    top_k: int = 10
+    mode: MatchMode = "tfidf"
+    job_id: Optional[str] = None
+
+
+class CandidateSearchRequest(BaseModel):
+    job_description: str
+    top_k: int = 10
+    resume_ids: Optional[List[str]] = None  # Restrict ranking to these resumes
+    mode: MatchMode = "tfidf"
 
 
 class JobScrapeRequest(BaseModel):
     url: str
 
 
+class BatchJobScrapeRequest(BaseModel):
+    urls: List[str]
+    concurrency: int = 8  # Overall; each host is further limited to SCRAPE_PER_HOST_LIMIT
+    refresh: bool = False  # Revalidate cached pages even if they are still fresh
+
+
+class JobArtifactsRequest(BaseModel):
+    job_description: str
+    job_id: Optional[str] = None
+
+
 @app.post("/match-jobs")
-def match_jobs(request: JobMatchRequest):
+async def match_jobs(request: JobMatchRequest):
     """Compares resume text with job description and returns scoring."""
-    result = calculate_match_score(request.resume_text, request.job_description)
+    try:
+        result = await run_cpu(calculate_match_score, request.resume_text, request.job_description, mode=request.mode,
+                                       job_id=request.job_id)
+    except EmbeddingUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     return {"success": True, "data": result}
 
 
+@app.post("/match-jobs/batch")
+async def match_jobs_batch(request: BatchJobMatchRequest):
+    """Scores one job description against many resumes and returns a ranked top-k."""
+    resumes = [{"id": r.id, "text": r.resume_text} for r in request.resumes]
+    try:
+        result = await run_cpu(calculate_batch_match_scores, request.job_description, resumes, top_k=request.top_k,
+                                              mode=request.mode, job_id=request.job_id)
+    except EmbeddingUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {"success": True, "data": result}
+
+
+@app.post("/search-candidates")
+async def search_candidates_endpoint(request: CandidateSearchRequest):
+    """Ranks indexed resumes against a job description."""
+    try:
+        data = await run_cpu(search_candidates, request.job_description, top_k=request.top_k, resume_ids=request.resume_ids,
+                                 mode=request.mode)
+    except EmbeddingUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"success": True, "data": data}
+
+
+@app.delete("/resume-index/{resume_id}")
+def delete_from_index(resume_id: str):
+    """Removes a resume from the candidate search indexes."""
+    removed = get_resume_index().delete(resume_id)
+    if embeddings_enabled():
+        removed = get_embedding_index().delete(resume_id) or removed
+    if not removed:
+        raise HTTPException(status_code=404, detail="Resume not indexed")
+    return {"success": True}
+
+
+async def _job_artifacts(job_description: str, job_id: Optional[str] = None):
+    """Job artifacts on the CPU executor; without the embedding when the optional model is unavailable."""
+    try:
+        return await run_cpu(job_artifacts.get, job_description, job_id=job_id)
+    except EmbeddingUnavailable:
+        return await run_cpu(job_artifacts.get, job_description, job_id=job_id, embed=False)
+
+
 @app.post("/scrape-job")
-def scrape_job(request: JobScrapeRequest):
-    """Scrapes job content from a URL."""
-    content = scrape_job_description(request.url)
+async def scrape_job(request: JobScrapeRequest):
+    """Scrapes job content from a URL; structured posting fields are returned alongside the text."""
+    try:
+        page = await fetch_job_page(request.url)
+    except Exception as e:
+        print(f"Scraping Error: {e}")
+        page = {"text": ""}
+    content = page["text"]
     if not content:
         raise HTTPException(status_code=400, detail="Failed to scrape content")
-    return {"success": True, "data": content}
+    # Precompute the job side now so the first match against this job is a cache hit
+    artifacts = await _job_artifacts(content)
+    return {"success": True, "data": content, "fields": page["fields"], "job_fingerprint": artifacts.fingerprint}
+
+
+@app.post("/scrape-jobs")
+async def scrape_jobs(request: BatchJobScrapeRequest):
+    """Scrapes many job URLs concurrently; one result per URL, in request order."""
+    if len(request.urls) > SCRAPE_BATCH_MAX_URLS:
+        raise HTTPException(status_code=413, detail=f"At most {SCRAPE_BATCH_MAX_URLS} URLs per request")
+    results = await scrape_job_pages(request.urls, concurrency=min(request.concurrency, BULK_MAX_CONCURRENCY),
+                                     refresh=request.refresh)
+    for result in results:
+        if result["success"]:
+            result["job_fingerprint"] = (await _job_artifacts(result["text"])).fingerprint
+    succeeded = sum(r["success"] for r in results)
+    return {"success": True, "data": {"total": len(results), "succeeded": succeeded, "results": results}}
+
+
+@app.post("/job-artifacts")
+async def create_job_artifacts(request: JobArtifactsRequest):
+    """Computes and stores the matching artifacts for a job description (call on job create or edit)."""
+    artifacts = await _job_artifacts(request.job_description, job_id=request.job_id)
+    return {"success": True, "data": artifacts.summary()}
+
+
+@app.delete("/job-artifacts/{job_id}")
+def delete_job_artifacts(job_id: str):
+    """Drops the cached matching artifacts for a job."""
+    if not job_artifacts.invalidate(job_id):
+        raise HTTPException(status_code=404, detail="No artifacts stored for this job")
+    return {"success": True}
 
 
 # --- Phase 5: External Job Recommendations ---
 
 from app.services.llm import extract_search_criteria
+from app.services.taxonomy import infer_domain, select_best_skill, years_to_level
 from app.services.scraper import search_external_jobs
 
 
 class RecommendJobsRequest(BaseModel):
     resume_text: str
     parsed_data: Optional[dict] = None  # Pre-parsed structured data from Node.js
-
-
-def _years_to_level(years: float) -> str:
-    """Map total years of experience to a job level label."""
-    if years < 1:
-        return "Intern"
-    elif years < 3:
-        return "Junior"
-    elif years < 6:
-        return "Mid-Level"
-    elif years < 10:
-        return "Senior"
-    else:
-        return "Lead"
-
-
-# Keyword maps for domain inference from job titles and skills
-_DOMAIN_KEYWORDS = [
-    (["backend", "node", "express", "fastapi", "django", "spring", "api", "server", "microservice"], "Backend Developer"),
-    (["frontend", "react", "angular", "vue", "next", "nuxt", "ui", "css", "html", "tailwind"],       "Frontend Developer"),
-    (["full stack", "fullstack", "mern", "mean", "full-stack"],                                       "Full Stack Developer"),
-    (["data science", "machine learning", "ml", "deep learning", "pytorch", "tensorflow", "nlp"],    "Data Scientist"),
-    (["devops", "kubernetes", "docker", "ci/cd", "jenkins", "terraform", "ansible", "aws", "cloud"], "DevOps Engineer"),
-    (["android", "ios", "flutter", "react native", "swift", "kotlin", "mobile"],                     "Mobile Developer"),
-    (["blockchain", "solidity", "web3", "smart contract"],                                            "Blockchain Developer"),
-]
-
-
-# Prioritize these skills for search queries as they are more "niche" and lead to better hits
-_SEARCH_PRIORITY_SKILLS = [
-    "nodejs", "node.js", "react", "reactjs", "angular", "vue", "fastapi", "django", 
-    "spring", "flask", "docker", "kubernetes", "aws", "azure", "gcp", "devops",
-    "machine learning", "data science", "nlp", "blockchain", "solidity", "webrtc"
-]
-
-def _select_best_skill(skills: list) -> str:
-    """Select the most 'search-relevant' skill from a list."""
-    if not skills:
-        return ""
-    
-    # Check for priority skills first
-    for s in skills:
-        s_clean = s.lower().replace(" ", "")
-        if s_clean in _SEARCH_PRIORITY_SKILLS:
-            return s
-            
-    # Fallback to the first skill that isn't just a single character or common language
-    for s in skills:
-        if len(s) > 2: # Ignore 'C', 'C++', 'Java' (too common)
-            return s
-            
-    return skills[0] if skills else ""
-
-
-def _infer_domain(titles: list, skills: list) -> str:
-    """
-    Infer job domain from experience titles and skills.
-    Uses a keyword-matching priority list so backend skills
-    are never misclassified as frontend.
-    """
-    combined = " ".join(titles + skills).lower()
-    for keywords, domain in _DOMAIN_KEYWORDS:
-        if any(kw in combined for kw in keywords):
-            return domain
-    return "Software Developer"
+    bypass_cache: bool = False  # Force a fresh LLM call on the slow path
 
 
 @app.post("/recommend-jobs")
-def recommend_jobs(request: RecommendJobsRequest):
+async def recommend_jobs(request: RecommendJobsRequest):
     """
     1. Build search criteria from parsedData (fast path) or via LLM (slow path).
     2. Search for experience-appropriate jobs via SerpApi / external APIs.
@@ -197,8 +655,8 @@ def recommend_jobs(request: RecommendJobsRequest):
         skills = p.get("skills", [])
         titles = [e.get("title", "") for e in experience_entries]
 
-        domain = _infer_domain(titles, skills)
-        level = _years_to_level(total_years)
+        domain = infer_domain(titles, skills)
+        level = years_to_level(total_years)
         top_skills = skills[:5]
 
         criteria = {
@@ -212,7 +670,7 @@ def recommend_jobs(request: RecommendJobsRequest):
         # --- Slow path: extract criteria from resume text via LLM ---
         # Try LLM; if it fails, fall back to keyword matching on the raw text
         try:
-            llm_result = extract_search_criteria(request.resume_text)
+            llm_result = await extract_search_criteria(request.resume_text, bypass_cache=request.bypass_cache)
             if "error" not in llm_result:
                 criteria = llm_result
             else:
@@ -220,9 +678,7 @@ def recommend_jobs(request: RecommendJobsRequest):
         except Exception as e:
             print(f"LLM slow path failed: {e}. Using keyword fallback.")
             # Keyword-based fallback: scan the resume text directly
-            text_lower = request.resume_text.lower()
-            words = text_lower.split()
-            domain = _infer_domain([], words)
+            domain = infer_domain([], [request.resume_text])
             # Rough year count: assume 0 if no work history clues
             criteria = {
                 "years_of_experience": 0,
@@ -233,12 +689,12 @@ def recommend_jobs(request: RecommendJobsRequest):
 
     # Build an experience-anchored, precise search query
     years = criteria.get("years_of_experience", 0)
-    level = _years_to_level(float(years) if years else 0)
+    level = years_to_level(float(years) if years else 0)
     domain = criteria.get("domain", "Software Developer")
     top_skills = criteria.get("top_skills", [])
 
     # Use the single most relevant skill as a qualifier
-    skill_tag = _select_best_skill(top_skills)
+    skill_tag = select_best_skill(top_skills)
     
     # Primary specific query
     if skill_tag:
@@ -247,25 +703,101 @@ def recommend_jobs(request: RecommendJobsRequest):
         query = f"{level} {domain} India"
 
     print(f"DEBUG: Primary query -> {query}")
-    jobs = search_external_jobs(query, limit=10)
+    provider_timings = {}
+    jobs = await search_external_jobs(query, limit=10, timings=provider_timings)
 
     # Secondary broad fallback if primary fails
     if not jobs or (len(jobs) == 1 and jobs[0].get("id") == "no_results"):
         broader_query = f"{level} {domain} India"
         print(f"DEBUG: Faling back to broader query -> {broader_query}")
-        jobs = search_external_jobs(broader_query, limit=10)
+        provider_timings = {}
+        jobs = await search_external_jobs(broader_query, limit=10, timings=provider_timings)
         query = broader_query # record what actually worked
 
     return {
         "success": True,
         "criteria": {**criteria, "resolved_level": level, "final_query": query},
         "data": jobs,
+        "providers": provider_timings,
     }
 
 
+# --- Cold start ---
+#
+# Heavy libraries (scipy, pypdf, BeautifulSoup, the Groq SDK, the embedding model)
+# are imported by the routes that need them, so a cold start only pays for
+# FastAPI and the service modules. warm_up() loads them ahead of traffic; with
+# provisioned concurrency set WARMUP_ON_IMPORT=true so it runs in the Lambda init
+# phase, or send {"warmup": true} (e.g. from a scheduled rule) to warm a live container.
+
 from mangum import Mangum
 
-handler = Mangum(app)
+WARMUP_ON_IMPORT = os.getenv("WARMUP_ON_IMPORT", "false").lower() == "true"
+
+
+def _warm_pdf():
+    import pypdf  # noqa: F401
+
+
+def _warm_html():
+    from app.services.scraper import extract_page_text
+    extract_page_text("<html><body><main><p>Warm up</p></main></body></html>")
+
+
+def _warm_tfidf():
+    from app.services.matcher import tfidf_from_counts
+    from app.services.text import tokenize
+    tfidf_from_counts([tokenize("python developer"), tokenize("python engineer")])
+
+
+def _warm_llm_sdk():
+    try:
+        import groq  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _warm_embeddings():
+    if embeddings_enabled():
+        embedder.load()
+
+
+WARMUP_STEPS = (
+    ("pdf", _warm_pdf),
+    ("html", _warm_html),
+    ("tfidf", _warm_tfidf),
+    ("resume_index", get_resume_index),
+    ("llm_sdk", _warm_llm_sdk),
+    ("embeddings", _warm_embeddings),
+)
+
+
+def warm_up() -> dict:
+    """Imports the lazily loaded dependencies and builds shared state. Returns per-step timings in ms."""
+    timings = {}
+    for name, step in WARMUP_STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"Warm-up Error ({name}): {e}")
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
+
+
+_mangum = Mangum(app)
+
+
+def handler(event, context):
+    """Lambda entry point; a {"warmup": true} event warms the container without routing a request."""
+    if isinstance(event, dict) and event.get("warmup"):
+        return {"warmup": warm_up()}
+    return _mangum(event, context)
+
+
+if WARMUP_ON_IMPORT:
+    print(f"Warm-up: {warm_up()}")
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
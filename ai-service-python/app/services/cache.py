@@ -0,0 +1,281 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace so trivially different extractions share a cache key."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query."""
+    return normalize_text(query).lower()
+
+
+def make_key(*parts) -> str:
+    """Content-addressed key: sha256 over the given parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent key/value cache for JSON-serializable results, backed by SQLite.
+    Entries expire after `ttl_seconds`; once `max_entries` is exceeded the least
+    recently used entries are evicted. Hit/miss counters are kept per process.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int, enabled: bool = True):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str, count: bool = True):
+        """
+        Returns the cached value, or None on a miss or expired entry. Pass
+        count=False for bookkeeping lookups that should not move the hit/miss counters.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+                now = time.time()
+                if row is None or now - row[1] > self.ttl_seconds:
+                    if row is not None:
+                        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                        conn.commit()
+                    self.misses += count
+                    return None
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self.hits += count
+                return json.loads(row[0])
+            except Exception as e:
+                print(f"Cache Read Error: {e}")
+                self.misses += count
+                return None
+
+    def set(self, key: str, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                conn = self._connect()
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now),
+                )
+                count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                if count > self.max_entries:
+                    overflow = count - self.max_entries
+                    conn.execute(
+                        "DELETE FROM entries WHERE key IN "
+                        "(SELECT key FROM entries ORDER BY accessed ASC LIMIT ?)",
+                        (overflow,),
+                    )
+                    self.evictions += overflow
+                conn.commit()
+            except Exception as e:
+                print(f"Cache Write Error: {e}")
+
+    def delete(self, key: str):
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+            except Exception as e:
+                print(f"Cache Write Error: {e}")
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        with self._lock:
+            try:
+                size = self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            except Exception:
+                size = None
+        return {
+            "enabled": self.enabled,
+            "entries": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class AsyncTTLCache:
+    """
+    In-memory cache in front of an async upstream call.
+
+    - Entries are fresh for `ttl` seconds and served as-is.
+    - For a further `stale_ttl` seconds they are served stale while one
+      background refresh runs (stale-while-revalidate).
+    - Concurrent misses for the same key share a single upstream call.
+    - Least recently used entries are evicted beyond `max_entries`.
+
+    `cost(value)` returns {provider: calls} for the upstream calls a value took;
+    every hit or coalesced wait adds it to `calls_saved`.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int, enabled: bool = True):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.calls_saved = {}
+        self._entries = OrderedDict()  # key -> (value, cost, stored_at)
+        # In-flight upstream calls; concurrent futures so waiters on any loop can share them
+        self._inflight = {}
+        # Fetch tasks, referenced until done so they cannot be garbage-collected mid-flight
+        self._tasks = set()
+        self._lock = threading.Lock()
+
+    def _save(self, cost: dict):
+        for provider, calls in (cost or {}).items():
+            self.calls_saved[provider] = self.calls_saved.get(provider, 0) + calls
+
+    async def _fetch(self, key, fetch, cost, cacheable, future):
+        try:
+            value = await fetch()
+            if cacheable(value):
+                with self._lock:
+                    self._entries[key] = (value, cost(value) if cost else {}, time.monotonic())
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            future.set_result(value)
+        except BaseException as e:
+            future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _spawn(self, key, fetch, cost, cacheable, future):
+        """Runs the upstream call as its own task, so no single caller's cancellation stops it."""
+        task = asyncio.ensure_future(self._fetch(key, fetch, cost, cacheable, future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def get_or_fetch(self, key, fetch, cost=None, cacheable=bool):
+        """Returns the cached value for `key`, calling `await fetch()` on a miss."""
+        if not self.enabled:
+            return await fetch()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.monotonic() - entry[2] if entry else None
+
+            if entry and age <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._save(entry[1])
+                return entry[0]
+
+            if entry and age <= self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self._save(entry[1])
+                if key not in self._inflight:
+                    self.refreshes += 1
+                    future = concurrent.futures.Future()
+                    self._inflight[key] = future
+                    # Nobody waits on a background refresh; keep failures from being reported as unretrieved
+                    future.add_done_callback(lambda f: f.exception())
+                    self._spawn(key, fetch, cost, cacheable, future)
+                return entry[0]
+
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                self.misses += 1
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+
+        if leader:
+            self._spawn(key, fetch, cost, cacheable, future)
+        # Shielded: a cancelled caller stops waiting without cancelling the shared call
+        value = await asyncio.shield(asyncio.wrap_future(future))
+        if not leader and cost and cacheable(value):
+            with self._lock:
+                self._save(cost(value))
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+            served = self.hits + self.stale_hits + self.coalesced
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+                "upstream_calls_saved": dict(self.calls_saved),
+            }
+
+
+# Shared cache for LLM extraction results (resume analysis and search criteria)
+llm_cache = ResultCache(
+    path=os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "llm_cache.sqlite")),
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+    enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false",
+)
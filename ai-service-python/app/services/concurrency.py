@@ -0,0 +1,76 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import os
+import threading
+
+# Threads for CPU-bound work (PDF parsing, TF-IDF, HTML extraction, embeddings).
+# Kept near the core count so CPU work queues here instead of crowding out the
+# event loop and the blocking-I/O threadpool.
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(os.cpu_count() or 1)))
+# Starlette's threadpool for blocking I/O (SQLite caches, index files, sync routes)
+IO_THREADS = int(os.getenv("IO_THREADS", "40"))
+
+
+class CPUExecutor:
+    """
+    Bounded thread pool for CPU-bound calls from async code. Calls beyond
+    `max_workers` wait in the pool's queue; counters are kept for /concurrency/stats.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self.submitted = 0
+        self.completed = 0
+        self.active = 0
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                                   thread_name_prefix="cpu")
+            return self._pool
+
+    def _call(self, context, fn):
+        with self._lock:
+            self.active += 1
+        try:
+            return context.run(fn)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) on a CPU worker, keeping the caller's context variables."""
+        with self._lock:
+            self.submitted += 1
+        call = functools.partial(self._call, contextvars.copy_context(), functools.partial(fn, *args, **kwargs))
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool(), call)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "active": self.active,
+                "queued": self.submitted - self.completed - self.active,
+                "completed": self.completed,
+            }
+
+
+cpu_executor = CPUExecutor(CPU_WORKERS)
+
+
+async def run_cpu(fn, *args, **kwargs):
+    """Offloads a CPU-bound call to the shared bounded executor."""
+    return await cpu_executor.run(fn, *args, **kwargs)
+
+
+async def configure_io_threads():
+    """Sizes Starlette's threadpool (a startup hook; needs the running event loop)."""
+    import anyio.to_thread
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = IO_THREADS
@@ -0,0 +1,443 @@
+import base64
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.services.cache import make_key, normalize_text
+from app.services.index import (
+    current_generation, new_generation, publish_generation, remove_stale_generations, save_array, save_json,
+)
+
+# auto: on when a backend is installed; true/false force it
+EMBEDDINGS_ENABLED = os.getenv("EMBEDDINGS_ENABLED", "auto").lower()
+# Load the model when the app starts rather than on the first embedding request
+EMBEDDING_PRELOAD = os.getenv("EMBEDDING_PRELOAD", "true").lower() != "false"
+
+# Small CPU-friendly sentence-embedding model. fastembed runs ONNX weights (quantized
+# variants included); sentence-transformers can load an ONNX file or quantize to int8.
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "auto").lower()  # auto | fastembed | sentence-transformers
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE")  # e.g. onnx/model_qint8_avx512.onnx (sentence-transformers)
+EMBEDDING_QUANTIZE = os.getenv("EMBEDDING_QUANTIZE", "false").lower() == "true"  # dynamic int8 (torch)
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0")) or None
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+# Long documents are embedded as chunks (within the model's sequence limit) and mean-pooled
+EMBEDDING_CHUNK_WORDS = int(os.getenv("EMBEDDING_CHUNK_WORDS", "180"))
+EMBEDDING_MAX_CHUNKS = int(os.getenv("EMBEDDING_MAX_CHUNKS", "8"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+
+# flat: exact NumPy matmul; hnsw: approximate search with hnswlib once the index is large enough
+EMBEDDING_INDEX = os.getenv("EMBEDDING_INDEX", "flat").lower()
+EMBEDDING_HNSW_MIN_ITEMS = int(os.getenv("EMBEDDING_HNSW_MIN_ITEMS", "5000"))
+EMBEDDING_HNSW_EF = int(os.getenv("EMBEDDING_HNSW_EF", "64"))
+
+# Number of journaled operations before the delta is merged into the base arrays
+COMPACT_EVERY = int(os.getenv("EMBEDDING_INDEX_COMPACT_EVERY", "256"))
+# Files of the flat layout used before generation directories
+_LEGACY_FILES = ("ids.json", "vectors.npy", "vectors.npy.tmp", "journal.jsonl")
+
+
+class EmbeddingUnavailable(RuntimeError):
+    """No embedding backend is installed, or the model failed to load."""
+
+
+def embeddings_installed() -> bool:
+    """True if a supported embedding backend can be imported (the model is not loaded)."""
+    backends = {"fastembed": ("fastembed",), "sentence-transformers": ("sentence_transformers",)}
+    modules = backends.get(EMBEDDING_BACKEND, ("fastembed", "sentence_transformers"))
+    return any(importlib.util.find_spec(m) is not None for m in modules)
+
+
+def embeddings_enabled() -> bool:
+    """Whether resumes are embedded on indexing and the model is preloaded."""
+    if EMBEDDINGS_ENABLED == "auto":
+        return embeddings_installed()
+    return EMBEDDINGS_ENABLED == "true"
+
+
+def chunk_words(text: str, size: int = EMBEDDING_CHUNK_WORDS, limit: int = EMBEDDING_MAX_CHUNKS) -> list:
+    """Splits normalized text into at most `limit` chunks of `size` words."""
+    words = normalize_text(text).split(" ")
+    chunks = [" ".join(words[i:i + size]) for i in range(0, len(words), size)][:limit]
+    return [c for c in chunks if c] or [""]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+class Embedder:
+    """
+    Loads the sentence-embedding model once per process and embeds documents in
+    batches. All chunks of all uncached documents go through one encode call.
+    Document vectors are float32 and L2-normalized, so a dot product is the
+    cosine similarity. They are kept in an LRU cache keyed by model + text.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, cache_size: int = EMBEDDING_CACHE_SIZE):
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self._encode = None
+        self._error = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def _load_fastembed(self):
+        from fastembed import TextEmbedding
+
+        model = TextEmbedding(model_name=self.model_name, threads=EMBEDDING_THREADS)
+        return lambda texts: np.array(list(model.embed(texts, batch_size=EMBEDDING_BATCH_SIZE)))
+
+    def _load_sentence_transformers(self):
+        from sentence_transformers import SentenceTransformer
+
+        kwargs = {"device": "cpu"}
+        if EMBEDDING_ONNX_FILE:
+            kwargs.update(backend="onnx", model_kwargs={"file_name": EMBEDDING_ONNX_FILE})
+        model = SentenceTransformer(self.model_name, **kwargs)
+        if not EMBEDDING_ONNX_FILE:
+            import torch
+
+            if EMBEDDING_THREADS:
+                torch.set_num_threads(EMBEDDING_THREADS)
+            if EMBEDDING_QUANTIZE:
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return lambda texts: model.encode(texts, batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True)
+
+    def load(self):
+        """Loads the model if it is not loaded yet. Raises EmbeddingUnavailable."""
+        if self._encode is not None:
+            return
+        with self._load_lock:
+            if self._encode is not None:
+                return
+            if self._error:
+                raise EmbeddingUnavailable(self._error)
+            loaders = [("fastembed", "fastembed", self._load_fastembed),
+                       ("sentence-transformers", "sentence_transformers", self._load_sentence_transformers)]
+            for name, module, loader in loaders:
+                if EMBEDDING_BACKEND not in ("auto", name) or importlib.util.find_spec(module) is None:
+                    continue
+                try:
+                    self._encode = loader()
+                    self.backend = name
+                    return
+                except Exception as e:
+                    print(f"Embedding Model Error ({name}): {e}")
+                    self._error = f"Failed to load embedding model {self.model_name}: {e}"
+            self._error = self._error or "No embedding backend installed (pip install fastembed or sentence-transformers)"
+            raise EmbeddingUnavailable(self._error)
+
+    @property
+    def loaded(self) -> bool:
+        return self._encode is not None
+
+    def embed(self, texts: list) -> np.ndarray:
+        """Returns an (n, dim) float32 matrix of normalized document vectors."""
+        keys = [make_key(self.model_name, normalize_text(t)) for t in texts]
+        vectors = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    vectors[i] = vector
+            self.hits += sum(v is not None for v in vectors)
+
+        # Deduplicate misses so repeated texts in one batch are embedded once
+        pending = {}
+        for i, key in enumerate(keys):
+            if vectors[i] is None:
+                pending.setdefault(key, []).append(i)
+        if pending:
+            self.load()
+            chunks, starts = [], []
+            for positions in pending.values():
+                starts.append(len(chunks))
+                chunks.extend(chunk_words(texts[positions[0]]))
+            encoded = _normalize_rows(np.asarray(self._encode(chunks), dtype=np.float32))
+            # Each document's chunks are contiguous: sum them per document, then renormalize
+            pooled = _normalize_rows(np.add.reduceat(encoded, starts, axis=0))
+            with self._lock:
+                self.misses += len(pending)
+                for vector, (key, positions) in zip(pooled, pending.items()):
+                    for i in positions:
+                        vectors[i] = vector
+                    self._cache[key] = vector
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+    def similarity(self, text: str, others: list) -> np.ndarray:
+        """Cosine similarity of `text` with each of `others`, clipped to [0, 1]."""
+        vectors = self.embed([text] + list(others))
+        return np.clip(vectors[1:] @ vectors[0], 0.0, 1.0)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "loaded": self.loaded,
+            "error": self._error,
+            "cache_entries": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _encode_vector(vector: np.ndarray) -> str:
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def _decode_vector(data: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+class EmbeddingIndex:
+    """
+    Persistent nearest-neighbour index of resume embeddings.
+
+    On disk (under `directory`), with the same generation scheme as the TF-IDF ResumeIndex:
+      CURRENT                     name of the live generation directory
+      gen-NNNNNN/ids.json         row ids of the base matrix
+      gen-NNNNNN/vectors.npy      (n, dim) float32 base matrix, memory-mapped
+      gen-NNNNNN/journal.jsonl    add/delete operations since that generation was written
+
+    Compaction writes a complete new generation and then swaps CURRENT atomically,
+    so vectors and ids are always read from the same generation.
+
+    Search is an exact matmul over the live rows. With EMBEDDING_INDEX=hnsw and
+    hnswlib installed, indexes of EMBEDDING_HNSW_MIN_ITEMS or more are searched
+    approximately through an in-memory HNSW graph instead, updated in place on mutation.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # --- persistence ---
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.generation_dir, name)
+
+    def _load(self):
+        self.generation = current_generation(self.directory)
+        self.generation_dir = os.path.join(self.directory, self.generation)
+        self.base_ids = []
+        self.base = np.zeros((0, 0), dtype=np.float32)
+        if os.path.exists(self._path("ids.json")):
+            with open(self._path("ids.json")) as f:
+                self.base_ids = json.load(f)
+            self.base = np.load(self._path("vectors.npy"), mmap_mode="r")
+
+        self.base_rows = {rid: row for row, rid in enumerate(self.base_ids)}
+        self.alive = np.ones(len(self.base_ids), dtype=bool)
+        self.delta = {}  # resume id -> vector
+        self._journal_ops = 0
+        self._live = None
+        self._ann = None
+
+        if os.path.exists(self._path("journal.jsonl")):
+            with open(self._path("journal.jsonl")) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    op = json.loads(line)
+                    if op["op"] == "add":
+                        self._apply_add(op["id"], _decode_vector(op["vector"]))
+                    else:
+                        self._apply_delete(op["id"])
+                    self._journal_ops += 1
+        remove_stale_generations(self.directory, self.generation, _LEGACY_FILES)
+
+    def _append_journal(self, ops: list):
+        with open(self._path("journal.jsonl"), "a") as f:
+            f.writelines(json.dumps(op) + "\n" for op in ops)
+        self._journal_ops += len(ops)
+        if self._journal_ops >= COMPACT_EVERY:
+            self._compact()
+
+    def _compact(self):
+        """Merges the delta and tombstones into a new generation with an empty journal and makes it current."""
+        matrix, ids = self._live_matrix()
+        generation, directory = new_generation(self.directory, self.generation)
+        save_array(os.path.join(directory, "vectors.npy"), np.ascontiguousarray(matrix, dtype=np.float32))
+        save_json(os.path.join(directory, "ids.json"), ids)
+        publish_generation(self.directory, generation)
+        self._load()
+
+    # --- mutation ---
+
+    def _apply_delete(self, resume_id: str) -> bool:
+        removed = False
+        if resume_id in self.delta:
+            del self.delta[resume_id]
+            removed = True
+        else:
+            row = self.base_rows.get(resume_id)
+            if row is not None and self.alive[row]:
+                self.alive[row] = False
+                removed = True
+        if removed:
+            self._live = None
+            if self._ann is not None:
+                self._ann_delete(resume_id)
+        return removed
+
+    def _apply_add(self, resume_id: str, vector: np.ndarray):
+        self._apply_delete(resume_id)
+        self.delta[resume_id] = vector
+        self._live = None
+        if self._ann is not None:
+            self._ann_add([resume_id], vector[None, :])
+
+    def upsert_many(self, items: list):
+        """Adds [(resume_id, vector)] pairs, replacing previous versions with the same id."""
+        with self._lock:
+            for resume_id, vector in items:
+                self._apply_add(resume_id, np.asarray(vector, dtype=np.float32))
+            self._append_journal([{"op": "add", "id": rid, "vector": _encode_vector(v)} for rid, v in items])
+
+    def upsert(self, resume_id: str, vector: np.ndarray):
+        self.upsert_many([(resume_id, vector)])
+
+    def delete(self, resume_id: str) -> bool:
+        """Removes a resume. Returns False if the id was not indexed."""
+        with self._lock:
+            removed = self._apply_delete(resume_id)
+            if removed:
+                self._append_journal([{"op": "delete", "id": resume_id}])
+            return removed
+
+    # --- query ---
+
+    def __len__(self):
+        return int(self.alive.sum()) + len(self.delta)
+
+    def _live_matrix(self):
+        """Returns (vectors, ids) for all live resumes, base rows first; cached until the next mutation."""
+        if self._live is None:
+            base = np.asarray(self.base[self.alive] if not self.alive.all() else self.base, dtype=np.float32)
+            ids = [rid for rid, keep in zip(self.base_ids, self.alive) if keep]
+            if self.delta:
+                delta = np.vstack(list(self.delta.values()))
+                base = np.vstack([base, delta]) if len(base) else delta
+                ids += list(self.delta)
+            self._live = (base, ids)
+        return self._live
+
+    def _ann_add(self, ids: list, vectors: np.ndarray):
+        ann, labels, label_of = self._ann
+        if ann.get_current_count() + len(ids) > ann.get_max_elements():
+            ann.resize_index(max(2 * ann.get_max_elements(), ann.get_current_count() + len(ids)))
+        new_labels = np.arange(len(labels), len(labels) + len(ids))
+        ann.add_items(vectors, new_labels)
+        for rid, label in zip(ids, new_labels):
+            label_of[rid] = int(label)
+            labels.append(rid)
+
+    def _ann_delete(self, resume_id: str):
+        ann, labels, label_of = self._ann
+        label = label_of.pop(resume_id, None)
+        if label is not None:
+            ann.mark_deleted(label)
+
+    def _ann_index(self, matrix: np.ndarray, ids: list):
+        """The HNSW graph, built on first use once the index is large enough; None for flat search."""
+        if self._ann is None:
+            if EMBEDDING_INDEX != "hnsw" or len(ids) < EMBEDDING_HNSW_MIN_ITEMS:
+                return None
+            try:
+                import hnswlib
+            except ImportError:
+                return None
+            ann = hnswlib.Index(space="ip", dim=matrix.shape[1])
+            ann.init_index(max_elements=len(ids) * 2, ef_construction=200, M=16)
+            self._ann = (ann, [], {})
+            self._ann_add(ids, matrix)
+        self._ann[0].set_ef(EMBEDDING_HNSW_EF)
+        return self._ann
+
+    def search(self, query: np.ndarray, top_k: int = 10, resume_ids: list = None) -> list:
+        """
+        Returns the top_k resumes by cosine similarity to the normalized `query`
+        vector as [{"id", "match_percentage"}]. If `resume_ids` is given, only
+        those resumes are ranked.
+        """
+        with self._lock:
+            matrix, ids = self._live_matrix()
+            if not ids or top_k <= 0:
+                return []
+            ann = self._ann_index(matrix, ids)
+            if ann is not None:
+                index, labels, label_of = ann
+                allowed = None
+                if resume_ids is not None:
+                    allowed = {label_of[rid] for rid in resume_ids if rid in label_of}
+                    if not allowed:
+                        return []
+                k = min(top_k, len(allowed) if allowed is not None else len(ids))
+                found, distances = index.knn_query(
+                    query[None, :], k=k, filter=(lambda label: label in allowed) if allowed is not None else None,
+                )
+                # hnswlib "ip" distance is 1 - inner product
+                return [
+                    {"id": labels[label], "match_percentage": round(max(0.0, 1.0 - float(d)) * 100, 2)}
+                    for label, d in zip(found[0], distances[0])
+                ]
+
+        scores = matrix @ query
+        candidates = np.arange(len(ids))
+        if resume_ids is not None:
+            wanted = set(resume_ids)
+            candidates = np.array([i for i, rid in enumerate(ids) if rid in wanted], dtype=np.int64)
+            if candidates.size == 0:
+                return []
+
+        top_k = min(top_k, candidates.size)
+        candidate_scores = scores[candidates]
+        top = np.argpartition(-candidate_scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+        return [
+            {"id": ids[candidates[i]], "match_percentage": round(max(0.0, float(candidate_scores[i])) * 100, 2)}
+            for i in top
+        ]
+
+
+embedder = Embedder()
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_embedding_index() -> EmbeddingIndex:
+    """Returns the process-wide embedding index, loading it from disk on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                base = os.getenv("EMBEDDING_INDEX_DIR", os.path.join(tempfile.gettempdir(), "embedding_index"))
+                # Vectors from different models are not comparable; each model gets its own directory
+                _index = EmbeddingIndex(os.path.join(base, make_key(EMBEDDING_MODEL)[:16]))
+    return _index
+
+
+def index_resume(resume_id: str, text: str):
+    """Embeds a resume and adds it to the embedding index."""
+    get_embedding_index().upsert(resume_id, embedder.embed([text])[0])
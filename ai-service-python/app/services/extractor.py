@@ -0,0 +1,222 @@
+import datetime
+import re
+
+from app.services.taxonomy import DOMAIN_KEYWORDS, SEARCH_PRIORITY_SKILLS, SKILL_ALIASES, SKILLS
+from app.services.text import SECTION_HEADINGS, normalize_whitespace, split_sections
+
+# Domain keywords that are too generic to count as a skill on their own
+_GENERIC_KEYWORDS = {"api", "server", "ui", "next", "cloud", "mobile", "backend", "frontend", "microservice", "mean"}
+
+# Skills that are also ordinary English words ("rest", "spring 2021", "react to incidents").
+# Outside a skills section they only count in their canonical spelling, and resumes only
+# count them inside the skills section.
+AMBIGUOUS_SKILLS = {
+    "agile", "algorithms", "bash", "bootstrap", "cypress", "dart", "dl", "excel", "express", "flask", "flutter",
+    "jest", "lambda", "ml", "node", "oracle", "pandas", "postman", "react", "rest", "ruby", "rust", "sass",
+    "selenium", "snowflake", "spark", "spring", "statistics", "swift", "ts",
+}
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# International or local numbers with 10-13 digits, allowing spaces, dots, dashes and brackets
+PHONE_RE = re.compile(r"(?<![\w+])\+?\d[\d\s().-]{8,16}\d(?!\w)")
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sept?|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s*,?\s*\d{{4}}|\d{{1,2}}\s*/\s*\d{{4}}|\d{{4}})"
+DATE_RANGE_RE = re.compile(
+    rf"({_DATE})\s*(?:-|–|—|to|till|until)\s*({_DATE}|present|current|now|ongoing|today|date)",
+    re.IGNORECASE,
+)
+
+_TITLE_RE = re.compile(
+    r"\b(engineer|developer|intern|analyst|scientist|architect|consultant|programmer|designer|administrator)\b",
+    re.IGNORECASE,
+)
+_NAME_RE = re.compile(r"^[A-Z][a-zA-Z.'-]+(?: [A-Z][a-zA-Z.'-]+){1,3}$")
+# Capitalized header lines that are not a person's name: document titles, section headings, job titles
+_NOT_NAME_WORDS = {
+    "curriculum", "vitae", "resume", "cv", "profile", "contact", "portfolio", "personal", "details", "information",
+    "manager", "lead", "director", "specialist", "officer", "executive", "senior", "junior", "head",
+} | {word for aliases in SECTION_HEADINGS.values() for alias in aliases for word in alias.split()}
+# What follows a title on the same line: "Engineer, Acme", "Engineer | Acme", "Engineer at Acme", "Engineer - Acme"
+_TITLE_SEPARATOR_RE = re.compile(r"\s*(?:[,|•·@(]|\s[-–—]\s|\sat\s)\s*", re.IGNORECASE)
+
+
+def _build_gazetteer():
+    canonical = {skill.lower(): skill for skill in SKILLS}
+    for alias, skill in SKILL_ALIASES.items():
+        if skill:
+            canonical[alias] = skill
+    for keywords, _ in DOMAIN_KEYWORDS:
+        for keyword in keywords:
+            if keyword not in _GENERIC_KEYWORDS and keyword not in SKILL_ALIASES:
+                canonical.setdefault(keyword, keyword.title())
+    for keyword in SEARCH_PRIORITY_SKILLS:
+        canonical.setdefault(keyword, keyword.title())
+
+    # Longest alternatives first so "react native" wins over "react"
+    terms = sorted(canonical, key=len, reverse=True)
+    pattern = re.compile(
+        r"(?<![\w+#.])(" + "|".join(re.escape(t) for t in terms) + r")(?![\w+#]|\.\w)",
+        re.IGNORECASE,
+    )
+    # Spellings that count for an ambiguous term in "cased" mode: the canonical name when it is
+    # the same word ("REST", "Swift"), else the capitalized term ("Express"), plus all caps
+    cased = {}
+    for term in AMBIGUOUS_SKILLS & set(canonical):
+        skill = canonical[term]
+        cased[term] = {skill if skill.lower() == term else term.capitalize(), term.upper()}
+    return pattern, canonical, cased
+
+
+_SKILL_RE, _SKILL_CANONICAL, _AMBIGUOUS_SPELLINGS = _build_gazetteer()
+
+
+def find_skills(text: str, ambiguous: str = "cased") -> list:
+    """
+    Gazetteer skills mentioned in `text`, in order of first mention, deduplicated.
+    AMBIGUOUS_SKILLS count in any case with ambiguous="any", only in their
+    canonical spelling with "cased", and not at all with "none".
+    """
+    found = {}
+    for match in _SKILL_RE.finditer(text):
+        term = match.group(1).lower()
+        if term in _AMBIGUOUS_SPELLINGS:
+            if ambiguous == "none" or (ambiguous == "cased" and match.group(1) not in _AMBIGUOUS_SPELLINGS[term]):
+                continue
+        found.setdefault(_SKILL_CANONICAL[term], None)
+    return list(found)
+
+
+def _is_name(line: str) -> bool:
+    return bool(_NAME_RE.match(line)) and not _TITLE_RE.search(line) and not any(
+        word.lower().strip(".") in _NOT_NAME_WORDS for word in line.split()
+    )
+
+
+def _name_matches_email(name: str, email: str) -> bool:
+    """True if a part of the name (2+ letters) appears in the email's local part, e.g. jsmith@ for John Smith."""
+    local = re.sub(r"[^a-z]", "", email.split("@")[0].lower())
+    return any(len(part) >= 2 and part in local for part in re.sub(r"[^a-z ]", "", name.lower()).split())
+
+
+def _clean_title(line: str) -> str:
+    """The job title from an experience line, without the date range and company around it."""
+    line = DATE_RANGE_RE.sub(" ", line)
+    parts = [part.strip(" .-–—)") for part in _TITLE_SEPARATOR_RE.split(line)]
+    return next((part for part in parts if _TITLE_RE.search(part)), "")
+
+
+def _parse_date(value: str, today: datetime.date):
+    """Returns a month index (year * 12 + month - 1) for a resume date."""
+    value = value.strip().lower()
+    if value in ("present", "current", "now", "ongoing", "today", "date"):
+        return today.year * 12 + today.month - 1
+    year = int(re.search(r"\d{4}", value).group())
+    month_name = re.match(r"[a-z]+", value)
+    if month_name:
+        month = _MONTHS.get(month_name.group()[:3], 1)
+    elif "/" in value:
+        month = int(value.split("/")[0])
+    else:
+        month = 1
+    return year * 12 + min(max(month, 1), 12) - 1
+
+
+def date_range_years(text: str, today: datetime.date = None) -> tuple:
+    """
+    Sums the date ranges in `text` (overlaps counted once).
+    Returns (years rounded to one decimal, number of ranges found).
+    """
+    today = today or datetime.date.today()
+    intervals = []
+    for start, end in DATE_RANGE_RE.findall(text):
+        try:
+            begin, finish = _parse_date(start, today), _parse_date(end, today)
+        except (AttributeError, ValueError):
+            continue
+        if 1950 * 12 <= begin <= finish <= (today.year + 1) * 12:
+            intervals.append((begin, finish + 1))
+
+    months = 0
+    current_start = current_end = None
+    for begin, finish in sorted(intervals):
+        if current_end is None or begin > current_end:
+            if current_end is not None:
+                months += current_end - current_start
+            current_start, current_end = begin, finish
+        else:
+            current_end = max(current_end, finish)
+    if current_end is not None:
+        months += current_end - current_start
+    return round(months / 12, 1), len(intervals)
+
+
+def extract_resume_fields(text: str) -> dict:
+    """
+    Deterministic first pass over resume text. Returns
+      {"fields": {...}, "confidence": {field: 0..1}, "score": overall confidence}
+    for name, email, phone, skills, years_of_experience and job titles.
+    Fields that were not found are omitted from "fields" and scored 0.
+    """
+    text = normalize_whitespace(text or "")
+    sections = split_sections(text)
+    by_name = {}
+    for name, body in sections:
+        by_name.setdefault(name, []).append(body)
+    fields, confidence = {}, {}
+
+    emails = EMAIL_RE.findall(text)
+    if emails:
+        fields["email"] = emails[0]
+    confidence["email"] = 0.99 if emails else 0.0
+
+    phones = [p for p in PHONE_RE.findall(text) if 10 <= len(re.sub(r"\D", "", p)) <= 13]
+    if phones:
+        fields["phone"] = phones[0].strip()
+    confidence["phone"] = 0.9 if phones else 0.0
+
+    header = "\n".join(by_name.get("header", [])) or text[:300]
+    name_line = next((line.strip() for line in header.split("\n")[:3] if _is_name(line.strip())), None)
+    if name_line:
+        fields["name"] = name_line
+    # A capitalized line alone is a guess; it only skips the LLM when the email agrees with it
+    if name_line:
+        confidence["name"] = 0.9 if emails and _name_matches_email(name_line, emails[0]) else 0.6
+    else:
+        confidence["name"] = 0.0
+
+    # Common-word skills ("spring", "rest") only count where they are listed as skills
+    found = {}
+    for name, body in sections:
+        for skill in find_skills(body, ambiguous="any" if name == "skills" else "none"):
+            found.setdefault(skill, None)
+    skills = list(found)
+    if skills:
+        fields["skills"] = skills
+    # Gazetteer hits alone stay below the LLM fast-path threshold; a skills section is needed
+    has_skills_section = "skills" in by_name
+    if len(skills) >= 5:
+        confidence["skills"] = 0.9 if has_skills_section else 0.7
+    else:
+        confidence["skills"] = 0.6 if len(skills) >= 3 else 0.3 if skills else 0.0
+
+    experience = "\n".join(by_name.get("experience", []))
+    if experience:
+        years, ranges = date_range_years(experience)
+        fields["years_of_experience"] = years
+        confidence["years_of_experience"] = 0.85 if ranges else 0.3
+        titles = [_clean_title(line) for line in experience.split("\n")[1:] if _TITLE_RE.search(line) and len(line) < 80]
+        titles = list(dict.fromkeys(title for title in titles if title))
+        if titles:
+            fields["titles"] = titles[:5]
+    else:
+        # No work history section: most likely a student or fresher
+        fields["years_of_experience"] = 0
+        confidence["years_of_experience"] = 0.5
+
+    scored = [confidence[f] for f in ("name", "email", "skills", "years_of_experience")]
+    return {"fields": fields, "confidence": confidence, "score": round(sum(scored) / len(scored), 2)}
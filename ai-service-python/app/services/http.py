@@ -0,0 +1,68 @@
+import asyncio
+import os
+import weakref
+
+import httpx
+
+# Outbound I/O concurrency: connections shared by downloads, scraping and job APIs.
+# Requests beyond the limit wait up to HTTP_POOL_TIMEOUT_SECONDS for a free connection.
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_POOL_TIMEOUT_SECONDS = float(os.getenv("HTTP_POOL_TIMEOUT_SECONDS", "10"))
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class LoopLocal:
+    """
+    Holds one instance of a loop-bound object (HTTP client, semaphore) per event loop.
+    The service normally runs on a single loop, but background workers run their own.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._instances = weakref.WeakKeyDictionary()
+
+    def get(self):
+        loop = asyncio.get_running_loop()
+        instance = self._instances.get(loop)
+        if instance is None:
+            instance = self._factory()
+            self._instances[loop] = instance
+        return instance
+
+
+# Shared keep-alive client for outbound API calls
+_http_client = LoopLocal(lambda: httpx.AsyncClient(
+    timeout=httpx.Timeout(10, pool=HTTP_POOL_TIMEOUT_SECONDS),
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE),
+))
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the pooled async HTTP client for the running event loop."""
+    return _http_client.get()
+
+
+class ResponseTooLarge(Exception):
+    """The response body exceeds the caller's size limit."""
+
+
+async def download_bytes(url: str, max_bytes: int) -> bytearray:
+    """
+    Streams a URL into memory, aborting as soon as the body exceeds `max_bytes`.
+    Raises httpx.HTTPStatusError on a non-2xx response.
+    """
+    async with get_http_client().stream("GET", url) as response:
+        response.raise_for_status()
+        declared = response.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise ResponseTooLarge(f"Response is {declared} bytes; the limit is {max_bytes}")
+
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) > max_bytes:
+                raise ResponseTooLarge(f"Response exceeds the {max_bytes} byte limit")
+        return body
@@ -0,0 +1,334 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+
+import numpy as np
+
+# Same tokenization as the matcher so index scores line up with /match-jobs
+from app.services.text import tokenize
+
+# Number of journaled operations before the delta is merged into the base arrays
+COMPACT_EVERY = int(os.getenv("RESUME_INDEX_COMPACT_EVERY", "256"))
+
+# Files of the flat layout used before generation directories
+_LEGACY_FILES = ("meta.json", "df.npy", "data.npy", "indices.npy", "indptr.npy", "journal.jsonl")
+
+
+# --- generation directories (shared with the embedding index) ---
+
+def current_generation(directory: str) -> str:
+    """Name of the live generation under `directory`; "" for an index written before generations existed."""
+    try:
+        with open(os.path.join(directory, "CURRENT")) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+
+
+def new_generation(directory: str, current: str):
+    """Creates an empty directory for the generation after `current`; returns (name, path)."""
+    number = int(current[len("gen-"):]) + 1 if current else 1
+    name = f"gen-{number:06d}"
+    path = os.path.join(directory, name)
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    return name, path
+
+
+def save_array(path: str, array: np.ndarray):
+    with open(path, "wb") as f:
+        np.save(f, array)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def save_json(path: str, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def publish_generation(directory: str, name: str):
+    """The switch-over: points CURRENT at a fully written generation with one atomic rename."""
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".CURRENT")
+    with os.fdopen(fd, "w") as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(directory, "CURRENT"))
+
+
+def remove_stale_generations(directory: str, current: str, legacy_files: tuple):
+    """Drops generation directories left behind by a crash or an earlier compaction."""
+    for name in os.listdir(directory):
+        if name.startswith("gen-") and name != current:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+        elif name.startswith(".CURRENT"):
+            os.remove(os.path.join(directory, name))
+    if current:
+        for name in legacy_files:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class ResumeIndex:
+    """
+    Persistent TF-IDF index of resume texts.
+
+    On disk (under `directory`):
+      CURRENT                          name of the live generation directory
+      gen-NNNNNN/meta.json             vocabulary (term -> column) and row ids
+      gen-NNNNNN/df.npy                document frequency per column
+      gen-NNNNNN/data.npy, indices.npy, indptr.npy  CSR matrix of raw term counts, one row per resume
+      gen-NNNNNN/journal.jsonl         add/delete operations since that generation was written
+
+    Compaction writes a complete new generation and then swaps CURRENT with one
+    atomic rename, so a crash at any point leaves either the old or the new
+    generation intact, never a mix. Terms no live resume contains are dropped
+    from the vocabulary at compaction.
+
+    The base arrays are memory-mapped. Adds, updates and deletes are appended to
+    the journal and applied to an in-memory delta, so a single resume never
+    re-tokenizes the corpus. IDF weights are derived from `df` at query time,
+    which keeps stored rows valid as the corpus changes.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # --- persistence ---
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.generation_dir, name)
+
+    def _load(self):
+        import scipy.sparse as sp
+
+        self.generation = current_generation(self.directory)
+        self.generation_dir = os.path.join(self.directory, self.generation)
+        self.vocabulary = {}
+        self.base_ids = []
+        self.df = np.zeros(0, dtype=np.int64)
+        self.base = sp.csr_matrix((0, 0), dtype=np.float64)
+
+        if os.path.exists(self._path("meta.json")):
+            with open(self._path("meta.json")) as f:
+                meta = json.load(f)
+            self.vocabulary = meta["vocabulary"]
+            self.base_ids = meta["ids"]
+            self.df = np.array(np.load(self._path("df.npy")), dtype=np.int64)
+            data = np.load(self._path("data.npy"), mmap_mode="r")
+            indices = np.load(self._path("indices.npy"), mmap_mode="r")
+            indptr = np.load(self._path("indptr.npy"), mmap_mode="r")
+            self.base = sp.csr_matrix(
+                (data, indices, indptr), shape=(len(self.base_ids), len(self.vocabulary)), copy=False
+            )
+
+        self.base_rows = {rid: row for row, rid in enumerate(self.base_ids)}
+        self.alive = np.ones(len(self.base_ids), dtype=bool)
+        self.delta = {}  # resume id -> (columns, counts)
+        self._journal_ops = 0
+        self._norms = None
+
+        if os.path.exists(self._path("journal.jsonl")):
+            with open(self._path("journal.jsonl")) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    op = json.loads(line)
+                    if op["op"] == "add":
+                        self._apply_add(op["id"], Counter(op["terms"]))
+                    else:
+                        self._apply_delete(op["id"])
+                    self._journal_ops += 1
+        remove_stale_generations(self.directory, self.generation, _LEGACY_FILES)
+
+    def _append_journal(self, op: dict):
+        with open(self._path("journal.jsonl"), "a") as f:
+            f.write(json.dumps(op) + "\n")
+        self._journal_ops += 1
+        if self._journal_ops >= COMPACT_EVERY:
+            self._compact()
+
+    def _compact(self):
+        """
+        Merges the delta and tombstones into a new generation with an empty journal,
+        dropping vocabulary columns no live resume uses, then makes it current.
+        """
+        matrix, ids = self._live_matrix()
+        keep = self.df > 0
+        new_column = np.cumsum(keep) - 1
+        matrix = matrix.tocsr()[:, keep]
+        matrix.sort_indices()
+        vocabulary = {term: int(new_column[col]) for term, col in self.vocabulary.items() if keep[col]}
+
+        generation, directory = new_generation(self.directory, self.generation)
+        for name, array in (("data", matrix.data), ("indices", matrix.indices),
+                            ("indptr", matrix.indptr), ("df", self.df[keep])):
+            save_array(os.path.join(directory, f"{name}.npy"), array)
+        save_json(os.path.join(directory, "meta.json"), {"vocabulary": vocabulary, "ids": ids})
+        publish_generation(self.directory, generation)
+        self._load()
+
+    # --- mutation ---
+
+    def _columns_for(self, terms: Counter):
+        columns = []
+        for term in terms:
+            col = self.vocabulary.get(term)
+            if col is None:
+                col = len(self.vocabulary)
+                self.vocabulary[term] = col
+            columns.append(col)
+        if len(self.vocabulary) > len(self.df):
+            self.df = np.concatenate([self.df, np.zeros(len(self.vocabulary) - len(self.df), dtype=np.int64)])
+        return np.array(columns, dtype=np.int32), np.array(list(terms.values()), dtype=np.float64)
+
+    def _apply_delete(self, resume_id: str) -> bool:
+        if resume_id in self.delta:
+            columns, _ = self.delta.pop(resume_id)
+            self.df[columns] -= 1
+            self._norms = None
+            return True
+        row = self.base_rows.get(resume_id)
+        if row is not None and self.alive[row]:
+            self.alive[row] = False
+            start, end = self.base.indptr[row], self.base.indptr[row + 1]
+            self.df[self.base.indices[start:end]] -= 1
+            self._norms = None
+            return True
+        return False
+
+    def _apply_add(self, resume_id: str, terms: Counter):
+        self._apply_delete(resume_id)
+        columns, counts = self._columns_for(terms)
+        self.df[columns] += 1
+        self.delta[resume_id] = (columns, counts)
+        self._norms = None
+
+    def upsert(self, resume_id: str, text: str):
+        """Adds a resume, replacing any previous version with the same id."""
+        terms = tokenize(text)
+        with self._lock:
+            self._apply_add(resume_id, terms)
+            self._append_journal({"op": "add", "id": resume_id, "terms": dict(terms)})
+
+    def delete(self, resume_id: str) -> bool:
+        """Removes a resume. Returns False if the id was not indexed."""
+        with self._lock:
+            removed = self._apply_delete(resume_id)
+            if removed:
+                self._append_journal({"op": "delete", "id": resume_id})
+            return removed
+
+    # --- query ---
+
+    def __len__(self):
+        return int(self.alive.sum()) + len(self.delta)
+
+    def _live_matrix(self):
+        """Returns (count matrix, ids) for all live resumes, base rows first."""
+        import scipy.sparse as sp
+
+        n_terms = len(self.vocabulary)
+        base = self.base[self.alive] if not self.alive.all() else self.base
+        base = sp.csr_matrix((base.data, base.indices, base.indptr), shape=(base.shape[0], n_terms), copy=False)
+        ids = [rid for rid, keep in zip(self.base_ids, self.alive) if keep]
+
+        if self.delta:
+            delta_ids = list(self.delta)
+            rows = [self.delta[rid] for rid in delta_ids]
+            indptr = np.cumsum([0] + [len(cols) for cols, _ in rows])
+            delta = sp.csr_matrix(
+                (np.concatenate([c for _, c in rows]), np.concatenate([cols for cols, _ in rows]), indptr),
+                shape=(len(rows), n_terms),
+            )
+            return sp.vstack([base, delta], format="csr"), ids + delta_ids
+        return base, ids
+
+    def _idf(self, n_docs: int) -> np.ndarray:
+        # Smoothed IDF, same formula as sklearn's TfidfVectorizer
+        return np.log((1 + n_docs) / (1 + self.df)) + 1
+
+    def search(self, job_description: str, top_k: int = 10, resume_ids: list = None,
+               query_terms: Counter = None) -> list:
+        """
+        Scores a job description against every indexed resume with one sparse
+        mat-vec and returns the top_k as [{"id", "match_percentage"}].
+        If `resume_ids` is given, only those resumes are ranked. `query_terms`
+        are the job's precomputed term counts, used instead of re-tokenizing.
+        """
+        with self._lock:
+            matrix, ids = self._live_matrix()
+            if not ids:
+                return []
+
+            idf = self._idf(len(ids))
+            if self._norms is None:
+                # Row L2 norms of the TF-IDF weighted matrix, cached until the next mutation
+                self._norms = np.sqrt(matrix.multiply(matrix) @ (idf ** 2))
+            norms = self._norms
+
+            if query_terms is None:
+                query_terms = tokenize(job_description)
+            query = np.zeros(len(self.vocabulary))
+            unseen_weight = 0.0
+            unseen_idf = np.log(1 + len(ids)) + 1
+            # Terms no resume contains still count towards the query norm,
+            # as they do when /match-jobs fits on the resume/job pair
+            for term, count in query_terms.items():
+                col = self.vocabulary.get(term)
+                if col is None or self.df[col] == 0:
+                    unseen_weight += (count * unseen_idf) ** 2
+                else:
+                    query[col] = count * idf[col]
+
+        query_norm = np.sqrt(np.dot(query, query) + unseen_weight)
+        if query_norm == 0:
+            return []
+
+        scores = matrix @ (query * idf)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(norms > 0, scores / (norms * query_norm), 0.0)
+
+        candidates = np.arange(len(ids))
+        if resume_ids is not None:
+            wanted = set(resume_ids)
+            candidates = np.array([i for i, rid in enumerate(ids) if rid in wanted], dtype=np.int64)
+            if candidates.size == 0:
+                return []
+
+        top_k = min(max(top_k, 0), candidates.size)
+        if top_k == 0:
+            return []
+        candidate_scores = scores[candidates]
+        top = np.argpartition(-candidate_scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-candidate_scores[top], kind="stable")]
+
+        return [
+            {"id": ids[candidates[i]], "match_percentage": round(float(candidate_scores[i]) * 100, 2)}
+            for i in top
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_resume_index() -> ResumeIndex:
+    """Returns the process-wide resume index, loading it from disk on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                directory = os.getenv("RESUME_INDEX_DIR", os.path.join(tempfile.gettempdir(), "resume_index"))
+                _index = ResumeIndex(directory)
+    return _index
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from app.services.cache import ResultCache, make_key, normalize_text
+from app.services.embeddings import embedder, embeddings_enabled
+from app.services.text import tokenize
+
+# Bump when the tokenization or the stored fields change so old entries are not reused
+ARTIFACT_VERSION = "job-artifacts-v1"
+
+JOB_ARTIFACT_MEMORY_ENTRIES = int(os.getenv("JOB_ARTIFACT_MEMORY_ENTRIES", "512"))
+
+
+class JobArtifacts:
+    """
+    Job-side matching features, computed once per distinct job description.
+
+    terms      raw term counts from the matcher's TF-IDF analyzer. IDF weights depend
+               on the resumes a job is compared with, so they are applied per match.
+    keywords   the set of job terms, for quick overlap checks
+    embedding  normalized sentence embedding, or None when embeddings are disabled
+    """
+
+    def __init__(self, fingerprint: str, terms: Counter, embedding=None):
+        self.fingerprint = fingerprint
+        self.terms = terms
+        self.keywords = frozenset(terms)
+        self.embedding = embedding
+
+    def to_json(self) -> dict:
+        return {
+            "terms": dict(self.terms),
+            "embedding": self.embedding.tolist() if self.embedding is not None else None,
+        }
+
+    @classmethod
+    def from_json(cls, fingerprint: str, data: dict):
+        embedding = data.get("embedding")
+        return cls(fingerprint, Counter(data["terms"]),
+                   np.array(embedding, dtype=np.float32) if embedding is not None else None)
+
+    def summary(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "terms": len(self.terms),
+            "has_embedding": self.embedding is not None,
+        }
+
+
+def job_fingerprint(job_description: str) -> str:
+    """Content hash of a job description; any edit to the text gives a new fingerprint."""
+    return make_key(ARTIFACT_VERSION, normalize_text(job_description))
+
+
+class JobArtifactStore:
+    """
+    Two-level cache of JobArtifacts keyed by fingerprint: an in-memory LRU in
+    front of a persistent ResultCache. When a job id is given, the id's previous
+    fingerprint is remembered and its artifacts are dropped once the description
+    changes.
+    """
+
+    def __init__(self, disk: ResultCache, memory_entries: int = JOB_ARTIFACT_MEMORY_ENTRIES):
+        self.disk = disk
+        self.memory_entries = memory_entries
+        self.computed = 0
+        self.memory_hits = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, artifacts: JobArtifacts):
+        with self._lock:
+            self._memory[artifacts.fingerprint] = artifacts
+            self._memory.move_to_end(artifacts.fingerprint)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _forget(self, fingerprint: str):
+        with self._lock:
+            self._memory.pop(fingerprint, None)
+        self.disk.delete(fingerprint)
+
+    def get(self, job_description: str, job_id: str = None, embed: bool = None) -> JobArtifacts:
+        """
+        Returns the artifacts for a job description, computing and storing them on
+        a miss. `embed` defaults to whether embeddings are enabled; an entry without
+        an embedding is completed when one is asked for.
+        """
+        embed = embeddings_enabled() if embed is None else embed
+        fingerprint = job_fingerprint(job_description)
+
+        with self._lock:
+            artifacts = self._memory.get(fingerprint)
+            if artifacts is not None:
+                self._memory.move_to_end(fingerprint)
+                self.memory_hits += 1
+        if artifacts is None:
+            stored = self.disk.get(fingerprint)
+            if stored is not None:
+                artifacts = JobArtifacts.from_json(fingerprint, stored)
+
+        changed = artifacts is None
+        if artifacts is None:
+            artifacts = JobArtifacts(fingerprint, tokenize(job_description))
+            self.computed += 1
+        if embed and artifacts.embedding is None:
+            artifacts.embedding = embedder.embed([job_description])[0]
+            changed = True
+        if changed:
+            self.disk.set(fingerprint, artifacts.to_json())
+        self._remember(artifacts)
+
+        if job_id:
+            previous = self.disk.get(f"job:{job_id}", count=False)
+            if previous != fingerprint:
+                if previous:
+                    self._forget(previous)
+                self.disk.set(f"job:{job_id}", fingerprint)
+        return artifacts
+
+    def invalidate(self, job_id: str) -> bool:
+        """Drops the artifacts stored for a job id. Returns False if none were stored."""
+        fingerprint = self.disk.get(f"job:{job_id}", count=False)
+        if not fingerprint:
+            return False
+        self._forget(fingerprint)
+        self.disk.delete(f"job:{job_id}")
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "computed": self.computed,
+            "disk": self.disk.stats(),
+        }
+
+
+job_artifacts = JobArtifactStore(ResultCache(
+    path=os.getenv("JOB_ARTIFACT_CACHE_PATH", os.path.join(tempfile.gettempdir(), "job_artifacts.sqlite")),
+    ttl_seconds=float(os.getenv("JOB_ARTIFACT_TTL_SECONDS", str(30 * 24 * 3600))),
+    max_entries=int(os.getenv("JOB_ARTIFACT_MAX_ENTRIES", "20000")),
+    enabled=os.getenv("JOB_ARTIFACT_CACHE_ENABLED", "true").lower() != "false",
+))
@@ -0,0 +1,360 @@
+import json
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+from app.services.extractor import find_skills
+
+# Never part of the posting's content
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "footer", "header", "aside", "form",
+              "button", "select", "iframe"}
+# Elements that structure content; an element containing any of these is not itself a paragraph
+_BLOCK_TAGS = {"p", "div", "section", "article", "main", "li", "ul", "ol", "table", "tr", "td", "th",
+               "h1", "h2", "h3", "h4", "h5", "h6", "dd", "dt", "dl", "blockquote", "pre"}
+# Text containers that score their ancestors when they hold no nested blocks
+_PARAGRAPH_TAGS = {"p", "pre", "li", "dd", "td", "th", "div", "section", "span", "font", "blockquote"}
+_HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Headings that introduce a list of requirements
+_REQUIREMENT_HEADING = re.compile(
+    r"requirement|qualification|what you.?ll (?:need|bring)|must.?have|skills|who you are|you have|experience|"
+    r"candidate profile",
+    re.IGNORECASE,
+)
+# Headings that typically appear inside a job posting; a candidate block containing them is boosted
+_JOB_HEADING = re.compile(
+    r"responsibilit|requirement|qualification|about the (?:role|job|position)|what you|benefits|job description",
+    re.IGNORECASE,
+)
+_MIN_BLOCK_CHARS = 25
+# Ancestor levels a paragraph's score is propagated to
+_SCORE_LEVELS = 5
+# Siblings of the best block are merged in when they score at least this share of it
+_SIBLING_SHARE = 0.2
+MAX_REQUIREMENTS = 25
+
+
+class _Node:
+    __slots__ = ("tag", "parent", "start", "end", "score", "text_len", "link_len", "job_headings", "has_blocks",
+                 "children")
+
+    def __init__(self, tag, parent, start):
+        self.tag = tag
+        self.parent = parent
+        self.start = start
+        self.end = None
+        self.score = 0.0
+        self.text_len = 0
+        self.link_len = 0
+        self.job_headings = 0
+        self.has_blocks = False
+        self.children = []
+
+
+class _PageScanner(HTMLParser):
+    """
+    One streaming pass over the page that collects, without building a DOM:
+    JSON-LD blocks, <title> and meta tags, text segments tagged with the element
+    they belong to, and per-element text/link lengths for density scoring.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.nodes = []
+        self.stack = []
+        self.segments = []  # (element start position, text, is_heading, in_list_item)
+        self.json_ld = []
+        self.meta = {}
+        self.title = ""
+        self._skip = 0
+        self._capture = None  # "ld" or "title" while inside those elements
+        self._captured = []
+        self._links = 0
+        self._list_items = 0
+        self._headings = 0
+        self._position = 0
+
+    def _open(self, tag):
+        parent = self.stack[-1] if self.stack else None
+        node = _Node(tag, parent, self._position)
+        if parent is not None:
+            parent.children.append(node)
+            if tag in _BLOCK_TAGS:
+                parent.has_blocks = True
+        self._position += 1
+        self.nodes.append(node)
+        self.stack.append(node)
+
+    def _close(self, tag):
+        # Tolerate unclosed elements: pop up to the matching tag if it is open
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth].tag == tag:
+                for node in self.stack[depth:]:
+                    node.end = self._position
+                del self.stack[depth:]
+                return True
+        return False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "script":
+            attrs = dict(attrs)
+            if (attrs.get("type") or "").lower() == "application/ld+json":
+                self._capture, self._captured = "ld", []
+        elif tag == "title" and not self.title:
+            self._capture, self._captured = "title", []
+        elif tag == "meta":
+            attrs = dict(attrs)
+            name = (attrs.get("property") or attrs.get("name") or "").lower()
+            if name in ("og:title", "og:site_name", "description", "og:description") and attrs.get("content"):
+                self.meta.setdefault(name, attrs["content"].strip())
+            return
+
+        if tag in _SKIP_TAGS:
+            if tag not in _VOID_TAGS:
+                self._skip += 1
+            return
+        if self._skip or tag in _VOID_TAGS:
+            return
+        if tag == "a":
+            self._links += 1
+        elif tag == "li":
+            self._list_items += 1
+        elif tag in _HEADING_TAGS:
+            self._headings += 1
+        self._open(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self._capture and tag in ("script", "title"):
+            text = "".join(self._captured)
+            if self._capture == "ld":
+                self.json_ld.append(text)
+            else:
+                self.title = " ".join(text.split())
+            self._capture = None
+            if tag == "script":
+                return
+        if tag in _SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+            return
+        if self._skip or tag in _VOID_TAGS:
+            return
+        if self._close(tag):
+            if tag == "a":
+                self._links = max(0, self._links - 1)
+            elif tag == "li":
+                self._list_items = max(0, self._list_items - 1)
+            elif tag in _HEADING_TAGS:
+                self._headings = max(0, self._headings - 1)
+
+    def handle_data(self, data):
+        if self._capture:
+            self._captured.append(data)
+            return
+        if self._skip or not self.stack:
+            return
+        text = " ".join(data.split())
+        if not text:
+            return
+        node = self.stack[-1]
+        self.segments.append((node.start, text, self._headings > 0, self._list_items > 0))
+        length = len(text)
+        # Text and link lengths count towards every enclosing element.
+        # A short bold "Responsibilities:" line is treated like a heading.
+        heading_like = self._headings > 0 or (len(text) < 60 and text.endswith(":"))
+        heading_hit = heading_like and _JOB_HEADING.search(text) is not None
+        for ancestor in self.stack:
+            ancestor.text_len += length
+            if self._links:
+                ancestor.link_len += length
+            if heading_hit:
+                ancestor.job_headings += 1
+
+    def close(self):
+        super().close()
+        for node in self.stack:
+            node.end = self._position
+        self.stack = []
+
+
+def _adjusted_score(node) -> float:
+    if node.score <= 0 or node.text_len == 0:
+        return 0.0
+    link_density = node.link_len / node.text_len
+    return node.score * (1 - link_density) * (1 + 0.5 * min(node.job_headings, 4))
+
+
+def _content_blocks(scanner: _PageScanner) -> list:
+    """
+    Finds the elements holding the posting, readability-style. Every paragraph
+    (a text container with no nested blocks) scores its ancestors: the parent
+    fully, the grandparent by half and higher levels less. Scores are scaled
+    down by link density and up by job-section headings. The best element is
+    returned together with the siblings that score a fair share of it, since
+    postings are often split into one sibling element per section.
+    """
+    for node in scanner.nodes:
+        if node.tag not in _PARAGRAPH_TAGS or node.text_len < _MIN_BLOCK_CHARS:
+            continue
+        if node.has_blocks and node.tag not in ("p", "li"):
+            continue
+        points = 1 + min(node.text_len / 100, 3)
+        ancestor, level = node.parent, 0
+        while ancestor is not None and level < _SCORE_LEVELS:
+            ancestor.score += points / (1 if level == 0 else 2 if level == 1 else level * 3)
+            ancestor, level = ancestor.parent, level + 1
+
+    best, best_score = None, 0.0
+    for node in scanner.nodes:
+        score = _adjusted_score(node)
+        if score > best_score:
+            best, best_score = node, score
+    if best is None or best.parent is None:
+        return [best] if best else []
+
+    threshold = best_score * _SIBLING_SHARE
+    return [
+        sibling for sibling in best.parent.children
+        if sibling is best or _adjusted_score(sibling) >= threshold or sibling.job_headings
+    ]
+
+
+def _block_segments(scanner: _PageScanner, blocks: list) -> list:
+    if not blocks:
+        return scanner.segments
+    ranges = [(block.start, block.end) for block in blocks]
+    return [segment for segment in scanner.segments if any(lo <= segment[0] < hi for lo, hi in ranges)]
+
+
+def _segments_text(segments) -> str:
+    return "\n".join(text for _, text, _, _ in segments)
+
+
+def _requirements_from_segments(segments) -> list:
+    """List items that follow a requirements-like heading."""
+    requirements, in_requirements = [], False
+    for _, text, is_heading, in_list_item in segments:
+        if is_heading or (not in_list_item and len(text) < 60 and text.endswith(":")):
+            in_requirements = _REQUIREMENT_HEADING.search(text) is not None
+        elif in_requirements and in_list_item and len(text) >= 3:
+            requirements.append(text)
+    return requirements[:MAX_REQUIREMENTS]
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _job_postings(node):
+    """Yields every JobPosting object in parsed JSON-LD (top level, lists and @graph)."""
+    for item in _as_list(node):
+        if not isinstance(item, dict):
+            continue
+        types = [t.lower() for t in _as_list(item.get("@type")) if isinstance(t, str)]
+        if "jobposting" in types:
+            yield item
+        if "@graph" in item:
+            yield from _job_postings(item["@graph"])
+
+
+def _name(value) -> str:
+    for item in _as_list(value):
+        if isinstance(item, dict) and item.get("name"):
+            return str(item["name"]).strip()
+        if isinstance(item, str) and item.strip():
+            return item.strip()
+    return ""
+
+
+def _location(posting: dict) -> str:
+    places = []
+    for place in _as_list(posting.get("jobLocation")):
+        address = place.get("address") if isinstance(place, dict) else None
+        if isinstance(address, dict):
+            parts = [address.get(k) for k in ("addressLocality", "addressRegion")]
+            parts.append(_name(address.get("addressCountry")))
+            label = ", ".join(str(p).strip() for p in parts if p)
+        else:
+            label = _name(address) if address else _name(place)
+        if label and label not in places:
+            places.append(label)
+    if (posting.get("jobLocationType") or "").upper() == "TELECOMMUTE":
+        places.append("Remote")
+    return "; ".join(places)
+
+
+def _parse_fragment(html: str) -> _PageScanner:
+    scanner = _PageScanner()
+    scanner.feed(html)
+    scanner.close()
+    return scanner
+
+
+def _from_json_ld(scanner: _PageScanner):
+    for raw in scanner.json_ld:
+        try:
+            data = json.loads(raw.strip().rstrip(";"))
+        except ValueError:
+            continue
+        for posting in _job_postings(data):
+            # The description is HTML, often entity-escaped once more
+            description = _parse_fragment(unescape(str(posting.get("description") or "")))
+            text = _segments_text(description.segments)
+            if len(text) < _MIN_BLOCK_CHARS:
+                continue
+            requirements = []
+            for key in ("qualifications", "experienceRequirements", "educationRequirements", "skills"):
+                for value in _as_list(posting.get(key)):
+                    value = _name(value) if isinstance(value, dict) else str(value)
+                    requirements.extend(text for _, text, _, _ in _parse_fragment(value).segments)
+            return {
+                "text": text,
+                "title": str(posting.get("title") or "").strip(),
+                "company": _name(posting.get("hiringOrganization")),
+                "location": _location(posting),
+                "employment_type": ", ".join(str(t) for t in _as_list(posting.get("employmentType"))),
+                "date_posted": str(posting.get("datePosted") or ""),
+                "requirements": (requirements or _requirements_from_segments(description.segments))[:MAX_REQUIREMENTS],
+                "source": "json-ld",
+            }
+    return None
+
+
+def extract_job_posting(html, max_chars: int = 10000, encoding: str = None) -> dict:
+    """
+    Extracts the job posting from a page (HTML str or bytes). Returns
+      {"text", "title", "company", "location", "employment_type", "date_posted",
+       "requirements", "skills", "source"}
+    where source is "json-ld" when the page carries schema.org JobPosting
+    metadata and "density" when the content block was found heuristically.
+    Missing fields are empty strings/lists.
+    """
+    if isinstance(html, (bytes, bytearray)):
+        html = bytes(html).decode(encoding or "utf-8", errors="replace")
+    scanner = _parse_fragment(html or "")
+
+    posting = _from_json_ld(scanner)
+    if posting is None:
+        segments = _block_segments(scanner, _content_blocks(scanner))
+        headings = [text for _, text, is_heading, _ in scanner.segments if is_heading]
+        posting = {
+            "text": _segments_text(segments),
+            "title": scanner.meta.get("og:title") or (headings[0] if headings else "") or scanner.title,
+            "company": scanner.meta.get("og:site_name", ""),
+            "location": "",
+            "employment_type": "",
+            "date_posted": "",
+            "requirements": _requirements_from_segments(segments),
+            "source": "density",
+        }
+
+    posting["text"] = posting["text"][:max_chars]
+    posting["skills"] = find_skills(posting["text"])
+    return posting
@@ -0,0 +1,305 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+# Queue configuration
+# Jobs and their worker threads live in this process, so the queue only works where the process
+# outlives the request. On Lambda the container freezes after each response and jobs are not
+# shared between containers, so it is off there unless explicitly enabled.
+JOB_QUEUE_ENABLED = os.getenv(
+    "JOB_QUEUE_ENABLED", "false" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "true"
+).lower() == "true"
+JOB_QUEUE_BROKER = os.getenv("JOB_QUEUE_BROKER", "memory")  # "memory" or "sqlite"
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(tempfile.gettempdir(), "job_queue.sqlite"))
+JOB_QUEUE_MAX_DEPTH = int(os.getenv("JOB_QUEUE_MAX_DEPTH", "100"))
+JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", "2"))
+JOB_QUEUE_MAX_ATTEMPTS = int(os.getenv("JOB_QUEUE_MAX_ATTEMPTS", "3"))
+JOB_QUEUE_RETRY_DELAY_SECONDS = float(os.getenv("JOB_QUEUE_RETRY_DELAY_SECONDS", "5"))
+# Finished jobs are kept this long for status polling
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", str(24 * 3600)))
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+DEAD_LETTER = "dead_letter"
+FINISHED_STATES = (SUCCEEDED, FAILED, DEAD_LETTER)
+
+
+class QueueFull(Exception):
+    """The queue is at JOB_QUEUE_MAX_DEPTH; the caller should back off and retry."""
+
+
+class RetryableJobError(Exception):
+    """A transient failure (e.g. an LLM call) that should be retried before dead-lettering."""
+
+
+def _new_job(kind: str, payload: dict) -> dict:
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "payload": payload,
+        "status": QUEUED,
+        "attempts": 0,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "available_at": now,
+    }
+
+
+class InMemoryBroker:
+    """Process-local broker: a delay-aware heap of queued ids plus a dict of job records."""
+
+    def __init__(self, max_depth: int):
+        self.max_depth = max_depth
+        self._jobs = {}
+        self._heap = []  # (available_at, seq, job_id)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def enqueue(self, job: dict):
+        with self._cond:
+            if job["attempts"] == 0 and len(self._heap) >= self.max_depth:
+                raise QueueFull(f"Queue is full ({self.max_depth} jobs waiting)")
+            self._jobs[job["id"]] = dict(job)
+            heapq.heappush(self._heap, (job["available_at"], next(self._seq), job["id"]))
+            self._cond.notify()
+
+    def claim(self, timeout: float):
+        """Blocks up to `timeout` for a job whose retry delay has passed and marks it running."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                if self._heap and self._heap[0][0] <= now:
+                    _, _, job_id = heapq.heappop(self._heap)
+                    job = self._jobs[job_id]
+                    job.update(status=RUNNING, updated_at=now)
+                    return dict(job)
+                wait = deadline - time.monotonic()
+                if wait <= 0:
+                    return None
+                if self._heap:
+                    wait = min(wait, self._heap[0][0] - now)
+                self._cond.wait(wait)
+
+    def save(self, job: dict):
+        with self._cond:
+            self._jobs[job["id"]] = dict(job)
+
+    def load(self, job_id: str):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def counts(self) -> dict:
+        with self._cond:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+    def prune(self, older_than: float):
+        with self._cond:
+            for job_id in [j["id"] for j in self._jobs.values()
+                           if j["status"] in FINISHED_STATES and j["updated_at"] < older_than]:
+                del self._jobs[job_id]
+
+
+class SQLiteBroker:
+    """Broker backed by a SQLite file, so queued jobs survive a restart of the service."""
+
+    def __init__(self, path: str, max_depth: int, poll_interval: float = 0.5):
+        self.max_depth = max_depth
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, "
+            "available_at REAL NOT NULL, updated_at REAL NOT NULL, data TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, available_at)")
+        # Jobs left running by a crashed process go back to the queue
+        self._conn.execute("UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING))
+        self._conn.commit()
+
+    def _write(self, job: dict):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, available_at, updated_at, data) VALUES (?, ?, ?, ?, ?)",
+            (job["id"], job["status"], job["available_at"], job["updated_at"], json.dumps(job)),
+        )
+        self._conn.commit()
+
+    def enqueue(self, job: dict):
+        with self._lock:
+            if job["attempts"] == 0:
+                depth = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+                if depth >= self.max_depth:
+                    raise QueueFull(f"Queue is full ({self.max_depth} jobs waiting)")
+            self._write(job)
+
+    def claim(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT data FROM jobs WHERE status = ? AND available_at <= ? "
+                    "ORDER BY available_at LIMIT 1",
+                    (QUEUED, now),
+                ).fetchone()
+                if row:
+                    job = json.loads(row[0])
+                    job.update(status=RUNNING, updated_at=now)
+                    self._write(job)
+                    return job
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def save(self, job: dict):
+        with self._lock:
+            self._write(job)
+
+    def load(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+
+    def counts(self) -> dict:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def prune(self, older_than: float):
+        with self._lock:
+            self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATES))}) AND updated_at < ?",
+                (*FINISHED_STATES, older_than),
+            )
+            self._conn.commit()
+
+
+class JobQueue:
+    """
+    Runs async job handlers on a pool of worker threads, each with its own event loop.
+
+    Handlers raising RetryableJobError are retried with a linear delay up to
+    `max_attempts`, then dead-lettered. Any other exception fails the job at once.
+    Workers start on the first submit, or from `start_if_pending` when the broker
+    restored queued jobs from a previous run.
+    """
+
+    def __init__(self, broker, handlers: dict, workers: int = JOB_QUEUE_WORKERS,
+                 max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS, retry_delay: float = JOB_QUEUE_RETRY_DELAY_SECONDS):
+        self.broker = broker
+        self.handlers = handlers
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._threads = []
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def start_if_pending(self):
+        """Starts the workers when jobs are already waiting, e.g. restored by SQLiteBroker."""
+        if self.broker.depth():
+            self.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, kind: str, payload: dict) -> dict:
+        """Queues a job and returns its record. Raises QueueFull when at capacity."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.broker.prune(time.time() - JOB_RESULT_TTL_SECONDS)
+        job = _new_job(kind, payload)
+        self.broker.enqueue(job)
+        self.start()
+        return job
+
+    def get(self, job_id: str):
+        return self.broker.load(job_id)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.broker.depth(),
+            "max_depth": self.broker.max_depth,
+            "workers": self.workers,
+            "jobs": self.broker.counts(),
+        }
+
+    def _worker(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            while not self._stop.is_set():
+                job = self.broker.claim(timeout=1.0)
+                if job is not None:
+                    loop.run_until_complete(self._run(job))
+        finally:
+            loop.close()
+
+    async def _run(self, job: dict):
+        job["attempts"] += 1
+        try:
+            job["result"] = await self.handlers[job["kind"]](job["payload"])
+            job["status"] = SUCCEEDED
+            job["error"] = None
+        except RetryableJobError as e:
+            job["error"] = str(e)
+            if job["attempts"] < self.max_attempts:
+                print(f"Job {job['id']} attempt {job['attempts']} failed: {e}. Retrying...")
+                job["status"] = QUEUED
+                job["available_at"] = time.time() + self.retry_delay * job["attempts"]
+                job["updated_at"] = time.time()
+                self.broker.enqueue(job)
+                return
+            print(f"Job {job['id']} dead-lettered after {job['attempts']} attempts: {e}")
+            job["status"] = DEAD_LETTER
+        except Exception as e:
+            print(f"Job {job['id']} failed: {e}")
+            job["status"] = FAILED
+            job["error"] = getattr(e, "detail", None) or str(e)
+        job["updated_at"] = time.time()
+        self.broker.save(job)
+
+
+def create_broker():
+    """Builds the broker selected by JOB_QUEUE_BROKER."""
+    if JOB_QUEUE_BROKER == "sqlite":
+        return SQLiteBroker(JOB_QUEUE_PATH, JOB_QUEUE_MAX_DEPTH)
+    return InMemoryBroker(JOB_QUEUE_MAX_DEPTH)
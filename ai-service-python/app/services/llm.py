@@ -1,109 +1,285 @@
-import google.generativeai as genai
-from groq import Groq
-import os
+import asyncio
 import json
-from dotenv import load_dotenv
+import os
+
+from app.services.cache import llm_cache, make_key, normalize_text
+from app.services.llm_client import (
+    llm_client, GROQ_API_KEY, GEMINI_API_KEY, GROQ_MODEL, GEMINI_MODEL, LLM_MAX_TOKENS
+)
+from app.services.llm_json import StreamingFieldParser, parse_llm_json
+from app.services.metrics import span
+from app.services.schemas import ResumeAnalysis, SearchCriteria, empty_value, validate_fields
+from app.services.text import CRITERIA_SECTION_PRIORITY, compact_text, estimate_tokens
+from app.services.extractor import extract_resume_fields
+from app.services.taxonomy import infer_domain, years_to_level
+
+# Bump when a prompt changes so cached results from the old prompt are not reused
+RESUME_PROMPT_VERSION = "resume-v1"
+CRITERIA_PROMPT_VERSION = "criteria-v1"
+
+# Resume text budget per prompt, in estimated tokens (see text.compact_text)
+LLM_RESUME_TOKEN_BUDGET = int(os.getenv("LLM_RESUME_TOKEN_BUDGET", "2500"))
+LLM_CRITERIA_TOKEN_BUDGET = int(os.getenv("LLM_CRITERIA_TOKEN_BUDGET", "1500"))
+
+
+# Batched extraction: several resumes share one instruction block
+RESUME_BATCH_PROMPT_VERSION = "resume-batch-v1"
+LLM_BATCH_MAX_ITEMS = int(os.getenv("LLM_BATCH_MAX_ITEMS", "4"))
+LLM_BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "6000"))  # Resume text tokens per prompt
+LLM_BATCH_ITEM_TOKENS = int(os.getenv("LLM_BATCH_ITEM_TOKENS", "1500"))  # Per-resume budget
+LLM_BATCH_OUTPUT_TOKENS_PER_ITEM = 1500
+
+# Follow-up prompts that re-request only the fields that failed validation
+LLM_REPAIR_ATTEMPTS = int(os.getenv("LLM_REPAIR_ATTEMPTS", "1"))
+LLM_REPAIR_MAX_TOKENS = 800
+
+# Resume fields and their extraction instructions, in prompt order
+RESUME_FIELD_GUIDE = {
+    "name": "candidate name",
+    "email": "candidate email",
+    "skills": "list of technical and soft skills (strings)",
+    "experience": """list of objects with "title", "company", "years" (number), "description". 
+           IMPORTANT: Only include PROFESSIONAL work (jobs, internships). Do NOT include personal or academic projects here.""",
+    "projects": """list of objects with "title", "technologies", "description". 
+           IMPORTANT: Put all personal, academic, or group projects here. Do NOT include a "years" field for projects.""",
+    "education": 'list of objects with "degree", "school", "year"',
+    "summary": "a brief professional summary (2-3 sentences)",
+    "years_of_experience": """total years of professional work experience ONLY (number). 
+           CRITICAL: Do NOT include time spent on projects or education in this total.""",
+}
+
+
+def _field_guide(fields) -> str:
+    lines = [f'        {i}. "{field}": {RESUME_FIELD_GUIDE[field]}' for i, field in enumerate(fields, 1)]
+    return "\n        Fields to extract:\n" + "\n".join(lines) + "\n"
+
 
-load_dotenv()
+RESUME_FIELDS = _field_guide(RESUME_FIELD_GUIDE)
 
-# Configure API Keys
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Rule-based fast path (extractor.py): fields it finds with at least this confidence skip the LLM
+RULES_FAST_PATH = os.getenv("RULES_FAST_PATH", "true").lower() != "false"
+RULES_CONFIDENCE_THRESHOLD = float(os.getenv("RULES_CONFIDENCE_THRESHOLD", "0.85"))
+_RULE_RESUME_FIELDS = ("name", "email", "phone", "skills", "years_of_experience")
 
-# Initialize clients
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
 
-def call_llm(prompt: str, model_preference: str = "groq") -> str:
+async def call_llm(prompt: str, model_preference: str = "groq", max_tokens: int = LLM_MAX_TOKENS) -> str:
     """
     Calls LLM with automatic fallback.
     Primary: Groq (fast, free)
     Fallback: Gemini (reliable)
+    Pooling, concurrency limits, retries and optional hedging live in llm_client.
     """
-    
-    # Try Groq first
-    if groq_client and model_preference == "groq":
-        try:
-            response = groq_client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are an expert HR AI assistant. Always return valid JSON without markdown formatting."},
-                    {"role": "user", "content": prompt}
-                ],
-                model="llama-3.3-70b-versatile",  # Fast and accurate
-                temperature=0.3,
-                max_tokens=2000
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"Groq failed: {e}. Falling back to Gemini...")
-    
-    # Fallback to Gemini
-    if GEMINI_API_KEY:
+    return await llm_client.complete(prompt, preference=model_preference, max_tokens=max_tokens)
+
+CRITERIA_FIELDS = """
+        Fields:
+        1. "years_of_experience": total years of PROFESSIONAL work experience (integer), not projects or education
+        2. "experience_level": one of "Intern", "Junior", "Mid-Level", "Senior", "Lead"
+        3. "domain": primary job domain, e.g. "Frontend Developer"
+        4. "top_skills": 3-5 most relevant technical skills (strings)
+        5. "query": short job search query for India, at most 7 words, starting with the experience level
+"""
+
+
+def _repair_prompt(errors: dict, data: dict, field_guide: str, source_text: str) -> str:
+    """Asks again for just the fields that failed validation."""
+    problems = "\n".join(
+        f'- "{field}": {message} (you returned: {json.dumps(data.get(field))[:200]})'
+        if field in data else f'- "{field}": missing'
+        for field, message in errors.items()
+    )
+    # The source text is only needed to fill fields that were never returned
+    source = f"\nSOURCE TEXT:\n{source_text}\n" if any(f not in data for f in errors) else ""
+    return f"""
+        Your previous JSON answer had problems with these fields:
+        {problems}
+        {field_guide}
+        {source}
+        Return ONLY a valid JSON object containing exactly these keys: {json.dumps(list(errors))}.
+        """
+
+
+async def _complete_json(prompt: str, model, field_guide: str, source_text: str, known: dict = None) -> tuple:
+    """
+    Runs an extraction prompt and validates the answer against `model`.
+    The JSON is parsed tolerantly (preamble, fences and truncation are handled).
+    Returns (result, valid); see _validate_json.
+    """
+    response_text = await call_llm(prompt, model_preference="groq")
+    return await _validate_json(response_text, model, field_guide, source_text, known)
+
+
+async def _validate_json(response_text: str, model, field_guide: str, source_text: str, known: dict = None) -> tuple:
+    """
+    Parses an LLM answer, fills fields it left empty from `known` (e.g. the rule-based
+    extractor) and validates the result against `model`. Fields that are missing
+    or invalid are re-requested with a short follow-up prompt up to
+    LLM_REPAIR_ATTEMPTS times; whatever is still invalid is replaced with an empty
+    value. Returns (result, valid).
+    """
+    if not response_text or not response_text.strip():
+        raise ValueError("LLM returned an empty response. Check API keys and quota.")
+    with span("llm_json_parse"):
+        data = parse_llm_json(response_text)
+        if known and isinstance(data, dict):
+            # Known values only fill gaps; anything the model did return wins
+            data = {**known, **{k: v for k, v in data.items() if v not in (None, "", [], {})}}
+        result, errors = validate_fields(model, data)
+    if "__root__" in errors:
+        raise ValueError("LLM response is not a JSON object")
+
+    for _ in range(LLM_REPAIR_ATTEMPTS):
+        if not errors:
+            break
+        print(f"LLM returned invalid fields {list(errors)}; requesting a repair")
         try:
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            response = model.generate_content(prompt)
-            return response.text.strip()
+            fix = parse_llm_json(await call_llm(
+                _repair_prompt(errors, data, field_guide, source_text),
+                model_preference="groq", max_tokens=LLM_REPAIR_MAX_TOKENS,
+            ))
         except Exception as e:
-            raise Exception(f"Both Groq and Gemini failed. Groq: {e}")
-    
-    raise Exception("No valid API keys configured")
-
-def clean_json_response(text: str) -> str:
-    """Remove markdown formatting from LLM response"""
-    if text.startswith("```json"):
-        text = text[7:]
-    if text.startswith("```"):
-        text = text[3:]
-    if text.endswith("```"):
-        text = text[:-3]
-    return text.strip()
-
-def analyze_resume_text(text: str) -> dict:
+            print(f"LLM Repair Error: {e}")
+            break
+        if isinstance(fix, dict):
+            data = {**data, **{k: v for k, v in fix.items() if k in errors}}
+        result, errors = validate_fields(model, data)
+
+    if errors:
+        print(f"LLM fields still invalid after repair: {list(errors)}")
+        return {**data, **{field: empty_value(model, field) for field in errors}}, False
+    return result, True
+
+
+def _cache_key(prompt_version: str, text: str) -> str:
+    """Cache key for an extraction: normalized input text, prompt version and primary model."""
+    model = GROQ_MODEL if GROQ_API_KEY else GEMINI_MODEL
+    return make_key(prompt_version, model, normalize_text(text))
+
+
+def _resume_prompt(text: str, fields=RESUME_FIELD_GUIDE) -> str:
+    return f"""
+        You are an expert HR AI. Extract structured data from the following resume text.
+        Return ONLY valid JSON. Do not include markdown formatting like ```json ... ```.
+        {_field_guide(fields)}
+        RESUME TEXT:
+        {text}
+        """
+
+
+def _rule_fields(extracted: dict, fields) -> dict:
+    """Values from a rule-based extraction for `fields` it is confident about."""
+    if not RULES_FAST_PATH:
+        return {}
+    return {
+        field: extracted["fields"][field] for field in fields
+        if field in extracted["fields"] and extracted["confidence"][field] >= RULES_CONFIDENCE_THRESHOLD
+    }
+
+
+async def analyze_resume_text(text: str, bypass_cache: bool = False) -> dict:
     """
     Analyzes resume text using Groq (primary) or Gemini (fallback).
+    Successful results are cached by content; pass bypass_cache=True to force a fresh call.
     """
     if not GROQ_API_KEY and not GEMINI_API_KEY:
         return {"error": "No API keys configured"}
 
-    try:
-        prompt = f"""
-        You are an expert HR AI. Extract structured data from the following resume text.
-        Return ONLY valid JSON. Do not include markdown formatting like ```json ... ```.
-        
-        Fields to extract:
-        1. "name": candidate name
-        2. "email": candidate email
-        3. "skills": list of technical and soft skills (strings)
-        4. "experience": list of objects with "title", "company", "years" (number), "description". 
-           IMPORTANT: Only include PROFESSIONAL work (jobs, internships). Do NOT include personal or academic projects here.
-        5. "projects": list of objects with "title", "technologies", "description". 
-           IMPORTANT: Put all personal, academic, or group projects here. Do NOT include a "years" field for projects.
-        6. "education": list of objects with "degree", "school", "year"
-        7. "summary": a brief professional summary (2-3 sentences)
-        8. "years_of_experience": total years of professional work experience ONLY (number). 
-           CRITICAL: Do NOT include time spent on projects or education in this total.
+    text = compact_text(text, LLM_RESUME_TOKEN_BUDGET)
+    cache_key = _cache_key(RESUME_PROMPT_VERSION, text)
+    if not bypass_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        RESUME TEXT:
-        {text[:10000]} 
-        """
-
-        response_text = call_llm(prompt, model_preference="groq")
-        response_text = clean_json_response(response_text)
-        return json.loads(response_text)
+    try:
+        # Fields the rules are confident about are not requested from the LLM
+        known = _rule_fields(extract_resume_fields(text), _RULE_RESUME_FIELDS)
+        wanted = [field for field in RESUME_FIELD_GUIDE if field not in known]
+        result, valid = await _complete_json(
+            _resume_prompt(text, wanted), ResumeAnalysis, _field_guide(wanted), text, known
+        )
+        if valid:
+            llm_cache.set(cache_key, result)
+        return result
 
     except Exception as e:
         print(f"LLM Error: {e}")
         return {"error": f"Failed to analyze resume: {str(e)}"}
 
-def extract_search_criteria(text: str) -> dict:
+
+async def stream_resume_analysis(text: str, bypass_cache: bool = False):
+    """
+    Streaming variant of analyze_resume_text. Yields
+      {"event": "field", "field": name, "value": value}
+    for each top-level field as soon as the model has finished generating it, then
+      {"event": "result", "data": result}
+    with the validated (and if needed repaired) analysis, or {"event": "error", "error": ...}.
+    Cached results are replayed as field events followed by the result.
+    """
+    if not GROQ_API_KEY and not GEMINI_API_KEY:
+        yield {"event": "error", "error": "No API keys configured"}
+        return
+
+    text = compact_text(text, LLM_RESUME_TOKEN_BUDGET)
+    cache_key = _cache_key(RESUME_PROMPT_VERSION, text)
+    cached = None if bypass_cache else llm_cache.get(cache_key)
+    if cached is not None:
+        for field, value in cached.items():
+            yield {"event": "field", "field": field, "value": value}
+        yield {"event": "result", "data": cached}
+        return
+
+    # Rule-extracted fields are sent at once; the LLM streams the rest
+    known = _rule_fields(extract_resume_fields(text), _RULE_RESUME_FIELDS)
+    for field, value in known.items():
+        yield {"event": "field", "field": field, "value": value}
+    wanted = [field for field in RESUME_FIELD_GUIDE if field not in known]
+
+    parser = StreamingFieldParser()
+    try:
+        async for chunk in llm_client.stream(_resume_prompt(text, wanted), preference="groq"):
+            for field, value in parser.feed(chunk):
+                if field not in known:
+                    yield {"event": "field", "field": field, "value": value}
+        result, valid = await _validate_json(parser.buffer, ResumeAnalysis, _field_guide(wanted), text, known)
+        if valid:
+            llm_cache.set(cache_key, result)
+        yield {"event": "result", "data": result}
+    except Exception as e:
+        print(f"LLM Stream Error: {e}")
+        yield {"event": "error", "error": f"Failed to analyze resume: {str(e)}"}
+
+async def extract_search_criteria(text: str, bypass_cache: bool = False) -> dict:
     """
     Extracts criteria for searching external jobs.
     Returns: { "experience_level": str, "domain": str, "years_of_experience": int, "top_skills": list, "query": str }
+    When the rule-based extractor is confident about both years of experience and
+    skills, the criteria are built from its output without calling the LLM.
     """
+    extracted = extract_resume_fields(text)
+    known = _rule_fields(extracted, ("years_of_experience", "skills"))
+    if len(known) == 2:
+        level = years_to_level(known["years_of_experience"])
+        domain = infer_domain(extracted["fields"].get("titles", []), known["skills"])
+        return {
+            "years_of_experience": known["years_of_experience"],
+            "experience_level": level,
+            "domain": domain,
+            "top_skills": known["skills"][:5],
+            "query": f"{level} {domain} jobs in India",
+            "source": "rules",
+        }
+
     if not GROQ_API_KEY and not GEMINI_API_KEY:
         return {"error": "No API keys configured"}
 
+    text = compact_text(text, LLM_CRITERIA_TOKEN_BUDGET, CRITERIA_SECTION_PRIORITY)
+    cache_key = _cache_key(CRITERIA_PROMPT_VERSION, text)
+    if not bypass_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
         prompt = f"""
 You are a job search specialist. Analyze the resume below and extract structured job search data.
@@ -132,7 +308,7 @@ STEP 5 — Build a concise, experience-appropriate Google Search query for jobs
   - Example for 4 years: "Mid-Level Full Stack Developer Bangalore"
 
 RESUME TEXT:
-{text[:6000]}
+{text}
 
 Return ONLY valid JSON in this exact format:
 {{
@@ -144,12 +320,156 @@ Return ONLY valid JSON in this exact format:
 }}
 """
         
-        response_text = call_llm(prompt, model_preference="groq")
-        response_text = clean_json_response(response_text)
-        if not response_text or response_text.strip() == "":
-            raise ValueError("LLM returned an empty response. Check API keys and quota.")
-        return json.loads(response_text)
+        result, valid = await _complete_json(prompt, SearchCriteria, CRITERIA_FIELDS, text)
+        if valid:
+            llm_cache.set(cache_key, result)
+        return result
         
     except Exception as e:
         print(f"LLM Search Criteria Error: {e}")
         return {"error": f"LLM Failed: {str(e)}"}
+
+
+def pack_batches(items: list, token_budget: int = LLM_BATCH_TOKEN_BUDGET,
+                 max_items: int = LLM_BATCH_MAX_ITEMS) -> list:
+    """Greedily groups (id, text) pairs into batches that fit the token budget."""
+    batches, current, used = [], [], 0
+    for item_id, text in items:
+        tokens = estimate_tokens(text)
+        if current and (used + tokens > token_budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append((item_id, text))
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+async def _analyze_batch(batch: list) -> dict:
+    """
+    Sends one packed prompt for a batch of (id, compacted text) pairs.
+    Returns {id: result} for every item the model answered with a JSON object.
+    """
+    sections = "\n".join(f"=== RESUME id={item_id} ===\n{text}\n" for item_id, text in batch)
+    prompt = f"""
+        You are an expert HR AI. Extract structured data from EACH of the resumes below.
+        Return ONLY a valid JSON array with one object per resume, in any order.
+        Each object MUST include "id" (copied exactly from the resume header) plus the fields below.
+        Do not include markdown formatting like ```json ... ```.
+        {RESUME_FIELDS}
+        {sections}
+        """
+
+    max_tokens = min(8000, LLM_BATCH_OUTPUT_TOKENS_PER_ITEM * len(batch))
+    response_text = await call_llm(prompt, model_preference="groq", max_tokens=max_tokens)
+    parsed = parse_llm_json(response_text)
+    if not isinstance(parsed, list):
+        raise ValueError("Batch response is not a JSON array")
+
+    wanted = {item_id for item_id, _ in batch}
+    results = {}
+    for entry in parsed:
+        if isinstance(entry, dict) and str(entry.get("id")) in wanted:
+            item_id = str(entry.pop("id"))
+            # Invalid entries are left out and retried individually
+            result, errors = validate_fields(ResumeAnalysis, entry)
+            if not errors:
+                results[item_id] = result
+    return results
+
+
+async def analyze_resumes_batch(items: list, bypass_cache: bool = False) -> dict:
+    """
+    Analyzes many resumes with as few LLM calls as possible.
+    `items` is a list of (id, text) pairs; returns {id: result} in the same schema as
+    analyze_resume_text. Uncached resumes are compacted to LLM_BATCH_ITEM_TOKENS and packed
+    into prompts within LLM_BATCH_TOKEN_BUDGET. Items missing from a malformed or partial
+    batch response fall back to individual analyze_resume_text calls.
+    """
+    if not GROQ_API_KEY and not GEMINI_API_KEY:
+        return {str(item_id): {"error": "No API keys configured"} for item_id, _ in items}
+
+    results = {}
+    pending = []
+    texts = {}
+    for item_id, text in items:
+        item_id = str(item_id)
+        compacted = compact_text(text, LLM_BATCH_ITEM_TOKENS)
+        if not bypass_cache:
+            cached = (llm_cache.get(_cache_key(RESUME_PROMPT_VERSION, compact_text(text, LLM_RESUME_TOKEN_BUDGET)))
+                      or llm_cache.get(_cache_key(RESUME_BATCH_PROMPT_VERSION, compacted)))
+            if cached is not None:
+                results[item_id] = cached
+                continue
+        pending.append((item_id, compacted))
+        texts[item_id] = text
+
+    batches = pack_batches(pending)
+
+    async def run(batch):
+        try:
+            answered = await _analyze_batch(batch)
+        except Exception as e:
+            print(f"LLM Batch Error: {e}. Falling back to per-item calls.")
+            answered = {}
+        for item_id, compacted in batch:
+            if item_id in answered:
+                results[item_id] = answered[item_id]
+                llm_cache.set(_cache_key(RESUME_BATCH_PROMPT_VERSION, compacted), answered[item_id])
+        missing = [item_id for item_id, _ in batch if item_id not in answered]
+        fallbacks = await asyncio.gather(
+            *(analyze_resume_text(texts[item_id], bypass_cache=bypass_cache) for item_id in missing)
+        )
+        results.update(zip(missing, fallbacks))
+
+    await asyncio.gather(*(run(batch) for batch in batches))
+    return results
+
+
+class ResumeBatcher:
+    """
+    Collects resumes submitted concurrently (e.g. from a bulk ingestion) and analyzes
+    them together with analyze_resumes_batch. A batch is sent once it is full or
+    `max_wait` seconds after its first item arrived.
+    """
+
+    def __init__(self, bypass_cache: bool = False, max_wait: float = 0.5):
+        self.bypass_cache = bypass_cache
+        self.max_wait = max_wait
+        self._pending = []  # (id, text, future)
+        self._timer = None
+        self._tasks = set()
+
+    async def analyze(self, item_id, text: str) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((str(item_id), text, future))
+
+        used = sum(min(estimate_tokens(t), LLM_BATCH_ITEM_TOKENS) for _, t, _ in self._pending)
+        if len(self._pending) >= LLM_BATCH_MAX_ITEMS or used >= LLM_BATCH_TOKEN_BUDGET:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list):
+        try:
+            results = await analyze_resumes_batch([(i, t) for i, t, _ in batch], bypass_cache=self.bypass_cache)
+            for item_id, _, future in batch:
+                if not future.done():
+                    future.set_result(results.get(item_id, {"error": "Failed to analyze resume: no result"}))
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
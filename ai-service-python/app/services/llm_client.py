@@ -0,0 +1,369 @@
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+
+import httpx
+from dotenv import load_dotenv
+
+from app.services.http import LoopLocal
+from app.services.metrics import llm_fallbacks, llm_hedges, record_stage, span
+
+load_dotenv()
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+GROQ_MODEL = "llama-3.3-70b-versatile"
+GEMINI_MODEL = "gemini-1.5-flash"
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com")
+
+# Default completion length
+LLM_MAX_TOKENS = 2000
+
+SYSTEM_PROMPT = "You are an expert HR AI assistant. Always return valid JSON without markdown formatting."
+
+# Per-provider limits
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Start the secondary provider if the primary has not answered after this many seconds (unset = no hedging)
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0")) or None
+
+
+class ProviderStats:
+    """Rolling latency samples and outcome counters for one provider."""
+
+    def __init__(self, window: int = 512):
+        self.latencies = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.timeouts = 0
+
+    def summary(self) -> dict:
+        samples = sorted(self.latencies)
+
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1) if samples else None
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "avg_ms": round(sum(samples) / len(samples) * 1000, 1) if samples else None,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+        }
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """Timeouts, transport errors, rate limits and 5xx responses are worth retrying."""
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    # The Groq SDK wraps dropped connections and its own timeouts (no status code); groq is
+    # imported lazily, so if it is not loaded yet the error cannot have come from it
+    groq = sys.modules.get("groq")
+    if groq is not None and isinstance(exc, (groq.APIConnectionError, groq.APITimeoutError)):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is None and getattr(exc, "response", None) is not None:
+        status = getattr(exc.response, "status_code", None)
+    return status == 429 or (status is not None and status >= 500)
+
+
+class LLMProvider:
+    """
+    Base class for an LLM backend. Subclasses implement `_complete` (and optionally
+    `_stream`); `complete` and `stream` add the concurrency limit, timeouts, retry
+    backoff and stats.
+    """
+
+    name = "base"
+    model = ""
+
+    def __init__(self, timeout: float = LLM_TIMEOUT_SECONDS, max_retries: int = LLM_MAX_RETRIES,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.stats = ProviderStats()
+        self._semaphore = LoopLocal(lambda: asyncio.Semaphore(max_concurrency))
+
+    def available(self) -> bool:
+        raise NotImplementedError
+
+    async def _complete(self, prompt: str, max_tokens: int) -> str:
+        raise NotImplementedError
+
+    async def _stream(self, prompt: str, max_tokens: int):
+        """Yields text chunks. Providers without streaming yield the whole completion."""
+        yield await self._complete(prompt, max_tokens)
+
+    async def complete(self, prompt: str, max_tokens: int = LLM_MAX_TOKENS) -> str:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore.get():
+                    self.stats.calls += 1
+                    start = time.perf_counter()
+                    with span("llm_call", provider=self.name):
+                        text = await asyncio.wait_for(self._complete(prompt, max_tokens), timeout=self.timeout)
+                    self.stats.latencies.append(time.perf_counter() - start)
+                return text
+            except Exception as e:
+                self.stats.errors += 1
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats.timeouts += 1
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise asyncio.TimeoutError(f"timed out after {self.timeout}s") from e
+                    raise
+                attempt += 1
+                self.stats.retries += 1
+                # Exponential backoff with jitter: ~0.5s, 1s, 2s ...
+                await asyncio.sleep(0.5 * (2 ** (attempt - 1)) * (0.5 + random.random()))
+
+    async def stream(self, prompt: str, max_tokens: int = LLM_MAX_TOKENS):
+        """
+        Yields the completion as text chunks. Each chunk must arrive within the
+        timeout. Failures are retried only until the first chunk has been yielded.
+        """
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with self._semaphore.get():
+                    self.stats.calls += 1
+                    start = time.perf_counter()
+                    chunks = self._stream(prompt, max_tokens).__aiter__()
+                    try:
+                        while True:
+                            try:
+                                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.timeout)
+                            except StopAsyncIteration:
+                                break
+                            started = True
+                            yield chunk
+                    finally:
+                        await chunks.aclose()
+                    self.stats.latencies.append(time.perf_counter() - start)
+                    # Includes the time the consumer spends between chunks
+                    record_stage("llm_stream", time.perf_counter() - start, provider=self.name)
+                return
+            except Exception as e:
+                self.stats.errors += 1
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats.timeouts += 1
+                if started or attempt >= self.max_retries or not _is_retryable(e):
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise asyncio.TimeoutError(f"no output for {self.timeout}s") from e
+                    raise
+                attempt += 1
+                self.stats.retries += 1
+                await asyncio.sleep(0.5 * (2 ** (attempt - 1)) * (0.5 + random.random()))
+
+
+class GroqProvider(LLMProvider):
+    name = "groq"
+    model = GROQ_MODEL
+
+    def __init__(self, api_key: str, **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+        self._client = LoopLocal(self._build_client)
+
+    def _build_client(self):
+        from groq import AsyncGroq
+
+        # Retries are handled by LLMProvider.complete
+        return AsyncGroq(api_key=self.api_key, max_retries=0)
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def _request(self, prompt: str, max_tokens: int) -> dict:
+        return dict(
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            model=self.model,
+            temperature=0.3,
+            max_tokens=max_tokens
+        )
+
+    async def _complete(self, prompt: str, max_tokens: int) -> str:
+        response = await self._client.get().chat.completions.create(**self._request(prompt, max_tokens))
+        return response.choices[0].message.content.strip()
+
+    async def _stream(self, prompt: str, max_tokens: int):
+        stream = await self._client.get().chat.completions.create(**self._request(prompt, max_tokens), stream=True)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini over its REST API, sharing one pooled HTTP client per event loop."""
+
+    name = "gemini"
+    model = GEMINI_MODEL
+
+    def __init__(self, api_key: str, **kwargs):
+        super().__init__(**kwargs)
+        self.api_key = api_key
+        self._client = LoopLocal(lambda: httpx.AsyncClient(base_url=GEMINI_BASE_URL, timeout=self.timeout))
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    @staticmethod
+    def _body(prompt: str, max_tokens: int) -> dict:
+        return {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {"maxOutputTokens": max_tokens},
+        }
+
+    @staticmethod
+    def _text(payload: dict) -> str:
+        candidates = payload.get("candidates") or []
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(p.get("text", "") for p in parts)
+
+    async def _complete(self, prompt: str, max_tokens: int) -> str:
+        response = await self._client.get().post(
+            f"/v1beta/models/{self.model}:generateContent",
+            headers={"x-goog-api-key": self.api_key},
+            json=self._body(prompt, max_tokens),
+        )
+        response.raise_for_status()
+        payload = response.json()
+        if not payload.get("candidates"):
+            raise ValueError("Gemini returned no candidates")
+        return self._text(payload).strip()
+
+    async def _stream(self, prompt: str, max_tokens: int):
+        async with self._client.get().stream(
+            "POST",
+            f"/v1beta/models/{self.model}:streamGenerateContent",
+            params={"alt": "sse"},
+            headers={"x-goog-api-key": self.api_key},
+            json=self._body(prompt, max_tokens),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    text = self._text(json.loads(line[5:]))
+                    if text:
+                        yield text
+
+
+class LLMClient:
+    """
+    Calls providers in preference order. Without hedging, the next provider is
+    tried only after the previous one fails. With `hedge_after` set, the next
+    provider is also started once the current one has been silent that long,
+    and whichever answers first wins.
+    """
+
+    def __init__(self, providers: list, hedge_after: float = LLM_HEDGE_AFTER_SECONDS):
+        self.providers = providers
+        self.hedge_after = hedge_after
+
+    def available(self) -> bool:
+        return any(p.available() for p in self.providers)
+
+    def _ordered(self, preference: str) -> list:
+        providers = [p for p in self.providers if p.available()]
+        return sorted(providers, key=lambda p: p.name != preference)
+
+    async def complete(self, prompt: str, preference: str = "groq", max_tokens: int = LLM_MAX_TOKENS) -> str:
+        providers = self._ordered(preference)
+        if not providers:
+            raise Exception("No valid API keys configured")
+
+        if not self.hedge_after or len(providers) == 1:
+            errors = []
+            for provider in providers:
+                try:
+                    return await provider.complete(prompt, max_tokens)
+                except Exception as e:
+                    print(f"{provider.name} failed: {e}. Trying next provider...")
+                    errors.append(f"{provider.name}: {e}")
+                    if provider is not providers[-1]:
+                        llm_fallbacks.inc(provider=provider.name)
+            raise Exception(f"All LLM providers failed. {'; '.join(errors)}")
+
+        return await self._hedged(prompt, providers, max_tokens)
+
+    async def stream(self, prompt: str, preference: str = "groq", max_tokens: int = LLM_MAX_TOKENS):
+        """
+        Yields the completion as text chunks. Falls back to the next provider only
+        if the current one fails before producing any output; streams are not hedged.
+        """
+        providers = self._ordered(preference)
+        if not providers:
+            raise Exception("No valid API keys configured")
+
+        errors = []
+        for provider in providers:
+            started = False
+            try:
+                async for chunk in provider.stream(prompt, max_tokens):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    raise
+                print(f"{provider.name} failed: {e}. Trying next provider...")
+                errors.append(f"{provider.name}: {e}")
+                if provider is not providers[-1]:
+                    llm_fallbacks.inc(provider=provider.name)
+        raise Exception(f"All LLM providers failed. {'; '.join(errors)}")
+
+    async def _hedged(self, prompt: str, providers: list, max_tokens: int) -> str:
+        pending = {}
+        errors = []
+        remaining = list(providers)
+
+        def launch():
+            provider = remaining.pop(0)
+            pending[asyncio.ensure_future(provider.complete(prompt, max_tokens))] = provider
+
+        launch()
+        try:
+            while pending:
+                # Wait for an answer, or hedge to the next provider after the threshold
+                timeout = self.hedge_after if remaining else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    llm_hedges.inc(provider=remaining[0].name)
+                    launch()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    print(f"{provider.name} failed: {task.exception()}")
+                    errors.append(f"{provider.name}: {task.exception()}")
+                    if pending or remaining:
+                        llm_fallbacks.inc(provider=provider.name)
+                if not pending and remaining:
+                    launch()
+            raise Exception(f"All LLM providers failed. {'; '.join(errors)}")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {p.name: {"model": p.model, "available": p.available(), **p.stats.summary()} for p in self.providers}
+
+
+llm_client = LLMClient([GroqProvider(GROQ_API_KEY), GeminiProvider(GEMINI_API_KEY)])
@@ -0,0 +1,146 @@
+import json
+import re
+
+_CLOSERS = {"{": "}", "[": "]"}
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+
+def _close(stack) -> str:
+    return "".join(_CLOSERS[c] for c in reversed(stack))
+
+
+def extract_json(text: str) -> str:
+    """
+    Returns the first JSON object or array embedded in an LLM response, ignoring
+    any preamble, markdown fences or trailing commentary.
+
+    If the response was cut off (e.g. at max_tokens) the brackets left open are
+    closed. When the cut falls inside a value, the text is trimmed back to the last
+    complete element before closing. Raises ValueError if no JSON can be recovered.
+    """
+    text = text or ""
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("No JSON found in LLM response")
+    start = min(starts)
+
+    stack = []
+    in_string = escaped = False
+    # Positions where the text can be cut and closed: before a comma, or right after an opener
+    cut_points = []
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+            cut_points.append((i + 1, tuple(stack)))
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                return text[start:i + 1]
+        elif ch == ",":
+            cut_points.append((i, tuple(stack)))
+
+    body = text[start:].rstrip()
+    if in_string:
+        body += "\\" if escaped else ""
+        body += '"'
+    candidates = [body + _close(stack)]
+    candidates += [text[start:pos] + _close(opened) for pos, opened in reversed(cut_points)]
+    for candidate in candidates:
+        try:
+            json.loads(candidate)
+            return candidate
+        except ValueError:
+            continue
+    raise ValueError("Could not repair truncated JSON in LLM response")
+
+
+def parse_llm_json(text: str):
+    """Parses the JSON in an LLM response, tolerating preamble, fences, trailing commas and truncation."""
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        pass
+    candidate = extract_json(text)
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        # Trailing commas before a closing bracket, a common model slip
+        return json.loads(_TRAILING_COMMA.sub(r"\1", candidate))
+
+
+class StreamingFieldParser:
+    """
+    Scans a JSON object as it is streamed and reports each top-level field as
+    soon as its value is complete. Feed chunks with `feed`, which returns the
+    newly completed (key, value) pairs. Text before the opening brace is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key = None
+        self._key_start = None
+        self._value_start = None
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        buf = self.buffer
+        fields = []
+        i = self._pos
+        while i < len(buf) and not self.done:
+            ch = buf[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None and self._key is None:
+                        self._key = json.loads(buf[self._key_start:i + 1])
+            elif self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None:
+                    self._key_start = i
+            elif ch == ":" and self._depth == 1 and self._key is not None and self._value_start is None:
+                self._value_start = i + 1
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(buf, i, fields)
+                    self.done = True
+            elif ch == "," and self._depth == 1:
+                self._emit(buf, i, fields)
+            i += 1
+        self._pos = i
+        return fields
+
+    def _emit(self, buf: str, end: int, fields: list):
+        if self._key is not None and self._value_start is not None:
+            try:
+                fields.append((self._key, json.loads(buf[self._value_start:end])))
+            except ValueError:
+                pass
+        self._key = self._key_start = self._value_start = None
@@ -1,45 +1,239 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
 
-def calculate_match_score(resume_text: str, job_description: str) -> dict:
+import numpy as np
+
+from app.services.embeddings import EmbeddingUnavailable, embedder, get_embedding_index
+from app.services.index import get_resume_index
+from app.services.job_artifacts import job_artifacts
+from app.services.metrics import span
+from app.services.text import tokenize
+
+# Number of missing keywords reported per resume
+MAX_MISSING_KEYWORDS = 10
+
+# tfidf: keyword overlap; embedding: semantic similarity; hybrid: weighted blend of both
+MATCH_MODES = ("tfidf", "embedding", "hybrid")
+HYBRID_EMBEDDING_WEIGHT = float(os.getenv("HYBRID_EMBEDDING_WEIGHT", "0.6"))
+# Hybrid candidate search re-scores this many embedding hits per requested result with TF-IDF
+HYBRID_CANDIDATE_FACTOR = int(os.getenv("HYBRID_CANDIDATE_FACTOR", "5"))
+
+
+def blend_scores(tfidf_scores, embedding_scores, mode: str):
+    """Combines 0..1 similarity scores according to the match mode."""
+    if mode == "tfidf":
+        return tfidf_scores
+    if mode == "embedding":
+        return embedding_scores
+    return HYBRID_EMBEDDING_WEIGHT * embedding_scores + (1 - HYBRID_EMBEDDING_WEIGHT) * tfidf_scores
+
+
+@span("tfidf")
+def tfidf_from_counts(term_counts: list):
+    """
+    Builds the TF-IDF matrix TfidfVectorizer(stop_words='english').fit_transform
+    would return for the documents these term Counters came from (smoothed IDF,
+    L2-normalized rows, alphabetical columns). Lets the job side be tokenized once
+    and cached. Returns (matrix, feature_names).
+    """
+    import scipy.sparse as sp
+
+    vocabulary = sorted(set().union(*term_counts))
+    if not vocabulary:
+        raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+    column = {term: i for i, term in enumerate(vocabulary)}
+
+    indptr, indices, data = [0], [], []
+    for counts in term_counts:
+        indices.extend(column[term] for term in counts)
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    matrix = sp.csr_matrix((np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32), indptr),
+                           shape=(len(term_counts), len(vocabulary)))
+    matrix.sort_indices()
+
+    df = np.bincount(matrix.indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(term_counts)) / (1 + df)) + 1
+    matrix = matrix.multiply(idf).tocsr()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sp.diags(1.0 / norms) @ matrix
+    return matrix.tocsr(), np.array(vocabulary, dtype=object)
+
+
+@span("embedding")
+def _embedding_scores(artifacts, texts: list) -> np.ndarray:
+    """Cosine similarity of the job's cached embedding with each text, clipped to [0, 1]."""
+    return np.clip(embedder.embed(texts) @ artifacts.embedding, 0.0, 1.0)
+
+
+def keyword_gaps(job_vector, resume_matrix, feature_names, top_n: int = MAX_MISSING_KEYWORDS) -> list:
+    """
+    Finds the job terms each resume lacks, ranked by the term's TF-IDF weight in the job.
+    `job_vector` is a 1xV sparse row and `resume_matrix` an NxV sparse matrix from the same
+    vectorizer. Returns one list of {"keyword", "weight"} per resume row.
+    Nothing is densified: the job's columns are sliced out of the resume matrix and
+    presence is resolved with index arithmetic.
+    """
+    job_vector = job_vector.tocsr()
+    job_terms = job_vector.indices
+    job_weights = job_vector.data
+
+    # Rank job terms once (weight desc, alphabetical on ties); each resume's gaps
+    # are then the leading entries of this order that the resume does not contain.
+    order = np.lexsort((job_terms, -job_weights))
+    ranked_terms = job_terms[order]
+    ranked_weights = job_weights[order]
+
+    # Column j of `present` corresponds to ranked_terms[j]
+    present = resume_matrix.tocsr()[:, ranked_terms]
+    present.eliminate_zeros()
+
+    gaps = []
+    missing = np.empty(len(ranked_terms), dtype=bool)
+    for row in range(present.shape[0]):
+        missing.fill(True)
+        missing[present.indices[present.indptr[row]:present.indptr[row + 1]]] = False
+        top = np.flatnonzero(missing)[:top_n]
+        gaps.append([
+            {"keyword": str(feature_names[ranked_terms[i]]), "weight": round(float(ranked_weights[i]), 4)}
+            for i in top
+        ])
+    return gaps
+
+
+def calculate_match_score(resume_text: str, job_description: str, mode: str = "tfidf", job_id: str = None) -> dict:
     """
     Calculates the similarity score between a resume and a job description
-    using TF-IDF vectors and Cosine Similarity.
+    using TF-IDF vectors and Cosine Similarity. In "embedding" and "hybrid" mode
+    the score uses sentence embeddings; keyword gaps always come from TF-IDF.
+    Job-side terms and embedding come from the job artifact cache.
+    Raises EmbeddingUnavailable if those modes are asked for without a model.
     """
     try:
-        # Preprocessing: Basic list of 2 documents
-        documents = [resume_text, job_description]
-        
-        # Create TF-IDF Vectors
-        tfidf_vectorizer = TfidfVectorizer(stop_words='english')
-        tfidf_matrix = tfidf_vectorizer.fit_transform(documents)
+        job = job_artifacts.get(job_description, job_id=job_id, embed=mode != "tfidf")
+
+        # Create TF-IDF Vectors; matrix[0] is resume, matrix[1] is job
+        tfidf_matrix, feature_names = tfidf_from_counts([tokenize(resume_text), job.terms])
         
-        # Calculate Cosine Similarity (0 to 1)
-        # matrix[0] is resume, matrix[1] is job
-        score = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+        # Cosine Similarity (0 to 1); rows are already L2-normalized
+        score = float((tfidf_matrix[0:1] @ tfidf_matrix[1:2].T).toarray()[0][0])
         
+        semantic = None
+        if mode != "tfidf":
+            semantic = float(_embedding_scores(job, [resume_text])[0])
+            score = float(blend_scores(score, semantic, mode))
+
         # Convert to percentage
         match_percentage = round(score * 100, 2)
         
-        # Identify Keyword Gaps (Basic)
-        feature_names = tfidf_vectorizer.get_feature_names_out()
-        resume_vector = tfidf_matrix[0].toarray()[0]
-        job_vector = tfidf_matrix[1].toarray()[0]
-        
-        missing_keywords = []
-        for i, word in enumerate(feature_names):
-            # If word is in job but score in resume is 0 (or very low)
-            if job_vector[i] > 0 and resume_vector[i] == 0:
-                missing_keywords.append(word)
-                
-        # Limit missing keywords to top relevant ones (heuristic)
-        missing_keywords = missing_keywords[:10] 
-
-        return {
+        # Identify Keyword Gaps, ranked by how much each term weighs in the job
+        gaps = keyword_gaps(tfidf_matrix[1], tfidf_matrix[0:1], feature_names)[0]
+
+        result = {
             "match_percentage": match_percentage,
-            "missing_keywords": missing_keywords
+            "missing_keywords": [g["keyword"] for g in gaps],
+            "keyword_gaps": gaps
         }
+        if semantic is not None:
+            result["mode"] = mode
+            result["embedding_percentage"] = round(semantic * 100, 2)
+        return result
     
+    except EmbeddingUnavailable:
+        raise
     except Exception as e:
         print(f"Matching Error: {e}")
         return {"match_percentage": 0, "missing_keywords": [], "error": str(e)}
+
+
+def calculate_batch_match_scores(job_description: str, resumes: list, top_k: int = 10, mode: str = "tfidf",
+                                 job_id: str = None) -> dict:
+    """
+    Scores one job description against many resumes with a single TF-IDF fit.
+    `resumes` is a list of {"id": ..., "text": ...} dicts. All documents share one
+    sparse matrix and are scored with one sparse product; only the top_k
+    ranked candidates get keyword gaps computed. The job side comes from the job
+    artifact cache. In "embedding" and "hybrid" mode all resumes are embedded in
+    one batched call (cached texts are skipped).
+    """
+    if not resumes:
+        return {"total": 0, "results": []}
+
+    try:
+        job = job_artifacts.get(job_description, job_id=job_id, embed=mode != "tfidf")
+        tfidf_matrix, feature_names = tfidf_from_counts([job.terms] + [tokenize(r["text"]) for r in resumes])
+
+        # matrix[0] is the job, matrix[1:] are the resumes
+        job_vector = tfidf_matrix[0]
+        resume_matrix = tfidf_matrix[1:]
+        scores = (resume_matrix @ job_vector.T).toarray().ravel()
+        semantic = None
+        if mode != "tfidf":
+            semantic = _embedding_scores(job, [r["text"] for r in resumes])
+            scores = blend_scores(scores, semantic, mode)
+
+        # Stable sort keeps input order for ties
+        ranked = np.argsort(-scores, kind="stable")[:max(top_k, 0)]
+
+        # Keyword gaps for the ranked rows only, in one sparse pass
+        gaps = keyword_gaps(job_vector, resume_matrix[ranked], feature_names)
+
+        results = []
+        for row, row_gaps in zip(ranked, gaps):
+            result = {
+                "id": resumes[row]["id"],
+                "match_percentage": round(float(scores[row]) * 100, 2),
+                "missing_keywords": [g["keyword"] for g in row_gaps],
+                "keyword_gaps": row_gaps
+            }
+            if semantic is not None:
+                result["embedding_percentage"] = round(float(semantic[row]) * 100, 2)
+            results.append(result)
+
+        return {"total": len(resumes), "mode": mode, "results": results}
+
+    except EmbeddingUnavailable:
+        raise
+    except Exception as e:
+        print(f"Batch Matching Error: {e}")
+        return {"total": len(resumes), "results": [], "error": str(e)}
+
+
+@span("candidate_search")
+def search_candidates(job_description: str, top_k: int = 10, resume_ids: list = None, mode: str = "tfidf") -> dict:
+    """
+    Ranks indexed resumes against a job description.
+    tfidf searches the TF-IDF resume index and embedding the embedding index. hybrid
+    takes the top top_k * HYBRID_CANDIDATE_FACTOR embedding hits, re-scores them
+    against the TF-IDF index and ranks by the blended score.
+    """
+    job = job_artifacts.get(job_description, embed=mode != "tfidf")
+    if mode == "tfidf":
+        index = get_resume_index()
+        results = index.search(job_description, top_k=top_k, resume_ids=resume_ids, query_terms=job.terms)
+        return {"total": len(index), "results": results}
+
+    index = get_embedding_index()
+    query = job.embedding
+    if mode == "embedding":
+        return {"total": len(index), "results": index.search(query, top_k=top_k, resume_ids=resume_ids)}
+
+    pool = max(top_k, 0) * HYBRID_CANDIDATE_FACTOR
+    semantic = {r["id"]: r["match_percentage"] for r in index.search(query, top_k=pool, resume_ids=resume_ids)}
+    if not semantic:
+        return {"total": len(index), "results": []}
+    keyword = {r["id"]: r["match_percentage"]
+               for r in get_resume_index().search(job_description, top_k=len(semantic), resume_ids=list(semantic),
+                                                  query_terms=job.terms)}
+
+    results = []
+    for resume_id, embedding_percentage in semantic.items():
+        tfidf_percentage = keyword.get(resume_id, 0.0)
+        results.append({
+            "id": resume_id,
+            "match_percentage": round(float(blend_scores(tfidf_percentage, embedding_percentage, mode)), 2),
+            "embedding_percentage": embedding_percentage,
+            "tfidf_percentage": tfidf_percentage,
+        })
+    results.sort(key=lambda r: -r["match_percentage"])
+    return {"total": len(index), "results": results[:top_k]}
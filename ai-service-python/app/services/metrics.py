@@ -0,0 +1,204 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Requests slower than this are logged with their request id and stage breakdown
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "5"))
+
+# Id of the request being served (from X-Request-ID, or generated), for logs and tracing
+request_id = contextvars.ContextVar("request_id", default=None)
+# (stage, provider, seconds) spans recorded while serving the current request
+_request_stages = contextvars.ContextVar("request_stages", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with one series per label combination."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list:
+        with self._lock:
+            return [(self.name, key, value) for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics) with one series per label combination."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> list:
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        rows = []
+        for key, values in series:
+            for bound, count in zip(self.buckets, values):
+                rows.append((f"{self.name}_bucket", key + (("le", _format_value(bound)),), count))
+            rows.append((f"{self.name}_sum", key, round(values[-2], 6)))
+            rows.append((f"{self.name}_count", key, values[-1]))
+        return rows
+
+
+class Registry:
+    """
+    Metrics exposed on /metrics. Besides the metrics created here, collectors
+    (callables returning [(name, type, help, [(labels dict, value)])]) turn
+    existing stats, such as cache hit counters, into series at scrape time.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name: str, help: str) -> Counter:
+        metric = Counter(name, help)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}"
+                         for name, labels, value in metric.samples())
+        for collect in self.collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                print(f"Metrics Collector Error: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.extend(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}"
+                             for labels, value in samples if value is not None)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+request_seconds = registry.histogram("http_request_duration_seconds", "Request latency by route and status.")
+stage_seconds = registry.histogram("stage_duration_seconds", "Time spent in each processing stage.")
+llm_fallbacks = registry.counter("llm_fallbacks_total",
+                                 "LLM calls handed on to another provider after a failure, by failed provider.")
+llm_hedges = registry.counter("llm_hedges_total",
+                              "Hedged LLM calls started because the current provider was slow, by provider started.")
+
+
+@contextmanager
+def span(stage: str, provider: str = ""):
+    """
+    Times a block (or, as a decorator, each call) into stage_duration_seconds and
+    the current request's stage list. `provider` names the upstream for per-provider
+    stages such as LLM calls and job searches.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start, provider)
+
+
+def record_stage(stage: str, seconds: float, provider: str = ""):
+    """Records a stage timed elsewhere, as span does."""
+    stage_seconds.observe(seconds, stage=stage, provider=provider)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append((stage, provider, seconds))
+
+
+@contextmanager
+def request_scope(rid: str):
+    """Sets the request id for the enclosed work and yields the list its spans are recorded in."""
+    stages = []
+    id_token = request_id.set(rid)
+    stages_token = _request_stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _request_stages.reset(stages_token)
+        request_id.reset(id_token)
+
+
+def _totals(stages: list) -> list:
+    """Sums spans per (stage, provider), in first-seen order."""
+    totals = {}
+    for stage, provider, seconds in stages:
+        total = totals.setdefault((stage, provider), [0.0, 0])
+        total[0] += seconds
+        total[1] += 1
+    return [(stage, provider, seconds, count) for (stage, provider), (seconds, count) in totals.items()]
+
+
+def server_timing(stages: list) -> str:
+    """Server-Timing header value for a request's spans; repeated stages are summed."""
+    entries = []
+    for stage, provider, seconds, _ in _totals(stages):
+        desc = f';desc="{provider}"' if provider else ""
+        entries.append(f"{stage}{desc};dur={seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def format_stages(stages: list) -> str:
+    """One-line stage breakdown for logs, e.g. `download=120ms llm_call[groq]=2300ms x2`."""
+    return " ".join(
+        f"{stage}{f'[{provider}]' if provider else ''}={seconds * 1000:.0f}ms{f' x{count}' if count > 1 else ''}"
+        for stage, provider, seconds, count in _totals(stages)
+    )
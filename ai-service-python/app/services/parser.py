@@ -1,15 +1,157 @@
-from pypdf import PdfReader
+import concurrent.futures
+import io
+import os
+import time
 
-def extract_text_from_pdf(pdf_path: str) -> str:
+from app.services.metrics import span
+
+# Hard limits so a hostile or oversized upload cannot pin a worker
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", "20"))
+
+# Documents with at least this many pages are split across a process pool (0 disables)
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "0"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Pages per pool task when a character budget is set, so pages past the budget are never parsed
+PDF_PARALLEL_CHUNK_PAGES = int(os.getenv("PDF_PARALLEL_CHUNK_PAGES", "2"))
+
+# Pages are joined with a form feed, the conventional page break in extracted text
+PAGE_SEPARATOR = "\f"
+
+_pool = None
+
+
+class PDFLimitError(Exception):
+    """The PDF exceeds the configured size limit."""
+
+
+def _read_source(source) -> bytes:
+    """Reads a path, bytes-like object or binary file object, enforcing PDF_MAX_BYTES."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = source
+    elif isinstance(source, str):
+        size = os.path.getsize(source)
+        if size > PDF_MAX_BYTES:
+            raise PDFLimitError(f"PDF is {size} bytes; the limit is {PDF_MAX_BYTES}")
+        with open(source, "rb") as f:
+            data = f.read()
+    else:
+        data = source.read(PDF_MAX_BYTES + 1)
+
+    if len(data) > PDF_MAX_BYTES:
+        raise PDFLimitError(f"PDF exceeds the {PDF_MAX_BYTES} byte limit")
+    return data
+
+
+def iter_pdf_pages(reader, start: int = 0, stop: int = None, deadline: float = None):
+    """
+    Yields the text of pages [start, stop), stopping early once `deadline` (monotonic) passes.
+    The deadline is checked between pages, so it is best-effort: one slow page can overrun it.
+    """
+    stop = len(reader.pages) if stop is None else stop
+    for i in range(start, stop):
+        if deadline is not None and time.monotonic() > deadline:
+            print(f"PDF extraction timed out after page {i}")
+            return
+        yield reader.pages[i].extract_text() or ""
+
+
+def _extract_page_range(data: bytes, start: int, stop: int) -> list:
+    """Process-pool worker: extracts one contiguous range of pages."""
+    from pypdf import PdfReader
+
+    return list(iter_pdf_pages(PdfReader(io.BytesIO(data)), start, stop))
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = concurrent.futures.ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _pool
+
+
+def _kill_pool():
+    """Terminates the pool's workers, stopping pages still being parsed; the next call starts a new pool."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is None:
+        return
+    # ProcessPoolExecutor has no public way to stop running tasks
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_parallel(data: bytes, n_pages: int, timeout: float, max_chars: int = None) -> list:
+    """
+    Extracts pages in a process pool and returns them in order. Without a budget the
+    pages are split into one contiguous range per worker. With `max_chars`, ranges of
+    PDF_PARALLEL_CHUNK_PAGES are extracted a wave (one range per worker) at a time
+    until the budget is met. On timeout the workers are terminated and the pages
+    extracted so far are returned.
+    """
+    chunk = -(-n_pages // PDF_WORKERS) if max_chars is None else max(1, PDF_PARALLEL_CHUNK_PAGES)
+    ranges = [(start, min(start + chunk, n_pages)) for start in range(0, n_pages, chunk)]
+    wave = len(ranges) if max_chars is None else PDF_WORKERS
+    pages = []
+    collected = 0
+    deadline = time.monotonic() + timeout
+    for first in range(0, len(ranges), wave):
+        futures = [_get_pool().submit(_extract_page_range, bytes(data), start, stop)
+                   for start, stop in ranges[first:first + wave]]
+        try:
+            for future in futures:
+                for page_text in future.result(timeout=max(0.0, deadline - time.monotonic())):
+                    pages.append(page_text)
+                    collected += len(page_text) + len(PAGE_SEPARATOR)
+        except concurrent.futures.TimeoutError:
+            print("PDF extraction timed out in the process pool")
+            _kill_pool()
+            break
+        if max_chars is not None and collected >= max_chars:
+            break
+    return pages
+
+
+@span("pdf_parse")
+def extract_text_from_pdf(source, max_chars: int = None, max_pages: int = PDF_MAX_PAGES,
+                          timeout: float = PDF_TIMEOUT_SECONDS) -> str:
     """
     Extracts text from a PDF file buffer or path.
+    Stops reading pages once `max_chars` characters have been collected, after
+    `max_pages` pages, or when `timeout` seconds have elapsed. Large documents are
+    extracted in a process pool when PDF_PARALLEL_MIN_PAGES is set; there the timeout
+    is enforced by terminating the workers. In-process it is checked between pages
+    only (best-effort).
+    Raises PDFLimitError if the file is larger than PDF_MAX_BYTES.
     """
+    from pypdf import PdfReader
+
+    data = _read_source(source)
+
     try:
-        reader = PdfReader(pdf_path)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() or ""
-        return text
+        reader = PdfReader(io.BytesIO(data))
+        n_pages = min(len(reader.pages), max_pages)
+
+        if PDF_PARALLEL_MIN_PAGES and n_pages >= PDF_PARALLEL_MIN_PAGES:
+            try:
+                text = PAGE_SEPARATOR.join(_extract_parallel(data, n_pages, timeout, max_chars))
+                return text[:max_chars] if max_chars is not None else text
+            except (OSError, concurrent.futures.process.BrokenProcessPool) as e:
+                # No process support (e.g. Lambda lacks /dev/shm); fall back to sequential
+                print(f"Parallel PDF extraction unavailable: {e}")
+
+        pages = []
+        collected = 0
+        for page_text in iter_pdf_pages(reader, 0, n_pages, deadline=time.monotonic() + timeout):
+            pages.append(page_text)
+            collected += len(page_text) + len(PAGE_SEPARATOR)
+            if max_chars is not None and collected >= max_chars:
+                break
+
+        text = PAGE_SEPARATOR.join(pages)
+        return text[:max_chars] if max_chars is not None else text
     except Exception as e:
         print(f"Error reading PDF: {e}")
         return ""
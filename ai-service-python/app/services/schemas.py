@@ -0,0 +1,80 @@
+import typing
+from typing import List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+
+class Experience(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    title: Optional[str] = None
+    company: Optional[str] = None
+    years: Optional[float] = None
+    description: Optional[str] = None
+
+
+class Project(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    title: Optional[str] = None
+    technologies: Union[List[str], str, None] = None
+    description: Optional[str] = None
+
+
+class Education(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    degree: Optional[str] = None
+    school: Optional[str] = None
+    year: Union[int, str, None] = None
+
+
+class ResumeAnalysis(BaseModel):
+    """Structured resume returned by analyze_resume_text. Every field must be present."""
+
+    model_config = ConfigDict(extra="allow")
+
+    name: Optional[str]
+    email: Optional[str]
+    skills: List[str]
+    experience: List[Experience]
+    projects: List[Project]
+    education: List[Education]
+    summary: Optional[str]
+    years_of_experience: float = Field(ge=0)
+
+
+class SearchCriteria(BaseModel):
+    """Job search criteria returned by extract_search_criteria."""
+
+    model_config = ConfigDict(extra="allow")
+
+    years_of_experience: float = Field(ge=0)
+    experience_level: str
+    domain: str
+    top_skills: List[str]
+    query: str
+
+
+def validate_fields(model, data) -> tuple:
+    """
+    Validates `data` against `model`.
+    Returns (normalized dict, {}) when valid, otherwise (data, {field: error message})
+    with one entry per top-level field that is missing or invalid.
+    """
+    if not isinstance(data, dict):
+        return {}, {"__root__": "expected a JSON object"}
+    try:
+        return model.model_validate(data).model_dump(), {}
+    except ValidationError as e:
+        errors = {}
+        for error in e.errors():
+            field = str(error["loc"][0]) if error["loc"] else "__root__"
+            errors.setdefault(field, error["msg"])
+        return data, errors
+
+
+def empty_value(model, field: str):
+    """Placeholder for a field that could not be extracted: [] for lists, else None."""
+    annotation = model.model_fields[field].annotation
+    return [] if typing.get_origin(annotation) in (list, List) else None
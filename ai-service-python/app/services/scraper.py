@@ -1,199 +1,470 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import importlib.util
 import os
+import tempfile
+import time
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 
+from app.services.cache import AsyncTTLCache, ResultCache, make_key, normalize_query
+from app.services.concurrency import run_cpu
+from app.services.http import USER_AGENT, LoopLocal, get_http_client
+from app.services.job_extractor import extract_job_posting
+from app.services.metrics import span
+
 load_dotenv()
 
-def scrape_job_description(url: str) -> str:
+# Job API base URLs; overridable so the service can run against local stubs (benchmarks/stubs.py)
+SERPAPI_BASE_URL = os.getenv("SERPAPI_BASE_URL", "https://serpapi.com")
+ADZUNA_BASE_URL = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com")
+MUSE_BASE_URL = os.getenv("MUSE_BASE_URL", "https://www.themuse.com")
+REMOTIVE_BASE_URL = os.getenv("REMOTIVE_BASE_URL", "https://remotive.com")
+
+# Job search results change slowly; many users share the same (level, skill, domain) query
+_JOB_CACHE_TTL = float(os.getenv("JOB_CACHE_TTL_SECONDS", str(6 * 3600)))
+_JOB_CACHE_STALE = float(os.getenv("JOB_CACHE_STALE_SECONDS", str(18 * 3600)))
+_JOB_CACHE_MAX_ENTRIES = int(os.getenv("JOB_CACHE_MAX_ENTRIES", "1000"))
+_JOB_CACHE_ENABLED = os.getenv("JOB_CACHE_ENABLED", "true").lower() != "false"
+
+google_jobs_cache = AsyncTTLCache(_JOB_CACHE_TTL, _JOB_CACHE_STALE, _JOB_CACHE_MAX_ENTRIES, _JOB_CACHE_ENABLED)
+job_search_cache = AsyncTTLCache(_JOB_CACHE_TTL, _JOB_CACHE_STALE, _JOB_CACHE_MAX_ENTRIES, _JOB_CACHE_ENABLED)
+
+
+# --- Job page scraping ---
+
+# lxml's C parser is several times faster than the pure-Python html.parser
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+SCRAPE_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_TIMEOUT_SECONDS", "10"))
+# Only this much of a page is downloaded; job content sits well within it
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))
+SCRAPE_MAX_CHARS = int(os.getenv("SCRAPE_MAX_CHARS", "10000"))
+# Cached text is served without a request for this long, then revalidated with a conditional GET
+SCRAPE_FRESH_SECONDS = float(os.getenv("SCRAPE_FRESH_SECONDS", "3600"))
+SCRAPE_PER_HOST_LIMIT = int(os.getenv("SCRAPE_PER_HOST_LIMIT", "2"))
+
+# Extracted page text and its validators, keyed by URL
+page_cache = ResultCache(
+    path=os.getenv("SCRAPE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "page_cache.sqlite")),
+    ttl_seconds=float(os.getenv("SCRAPE_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    max_entries=int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "5000")),
+    enabled=os.getenv("SCRAPE_CACHE_ENABLED", "true").lower() != "false",
+)
+
+# host -> semaphore, per event loop
+_host_limits = LoopLocal(dict)
+
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc.lower()
+    limits = _host_limits.get()
+    if host not in limits:
+        limits[host] = asyncio.Semaphore(SCRAPE_PER_HOST_LIMIT)
+    return limits[host]
+
+
+def extract_page_text(html, encoding: str = None) -> str:
+    """
+    Visible text of the page's <main>, <article> or <body> (raw HTML bytes or str).
+    Fallback for pages where extract_job_posting finds no content block.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, HTML_PARSER, from_encoding=encoding if isinstance(html, bytes) else None)
+
+    # Try to find common job description containers
+    # This is a heuristic and varies by site
+    content = ""
+
+    # Priority to generic semantic tags
+    main_content = soup.find('main') or soup.find('article') or soup.body
+
+    if main_content:
+        # Remove scripts and styles
+        for script in main_content(["script", "style", "nav", "footer", "header"]):
+            script.decompose()
+        content = main_content.get_text(separator="\n")
+
+    return content.strip()[:SCRAPE_MAX_CHARS]
+
+
+async def _fetch_page(url: str, validators: dict) -> tuple:
+    """
+    Conditional GET over the pooled client. Returns (status, headers, body, truncated, charset);
+    the body stops at SCRAPE_MAX_BYTES instead of downloading the rest of the page.
+    """
+    headers = {"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    async with get_http_client().stream("GET", url, headers=headers, timeout=SCRAPE_TIMEOUT_SECONDS) as response:
+        if response.status_code == 304:
+            return 304, response.headers, b"", False, None
+        response.raise_for_status()
+        body = bytearray()
+        truncated = False
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) >= SCRAPE_MAX_BYTES:
+                del body[SCRAPE_MAX_BYTES:]
+                truncated = True
+                break
+        return response.status_code, response.headers, bytes(body), truncated, response.charset_encoding
+
+
+@span("page_parse")
+def parse_job_page(body: bytes, encoding: str = None) -> dict:
+    """Job posting text and structured fields (see extract_job_posting) from raw page bytes."""
+    posting = extract_job_posting(body, max_chars=SCRAPE_MAX_CHARS, encoding=encoding)
+    if not posting["text"]:
+        posting["text"] = extract_page_text(body, encoding)
+        posting["source"] = "page"
+    return posting
+
+
+async def fetch_job_page(url: str, refresh: bool = False) -> dict:
+    """
+    Scrapes a job page, returning {"url", "text", "fields", "source", "truncated"}.
+    `fields` holds the structured posting fields (title, company, location,
+    employment_type, date_posted, requirements, skills, extraction).
+    source is "cache" (fresh cached text, no request), "not_modified" (cached text
+    revalidated with a 304) or "network". `refresh` skips the freshness window
+    but still sends the validators. At most SCRAPE_PER_HOST_LIMIT requests per
+    host run at once. Raises on network or HTTP errors.
+    """
+    key = make_key("job-page", url)
+    cached = page_cache.get(key)
+    if cached and not refresh and time.time() - cached["checked_at"] < SCRAPE_FRESH_SECONDS:
+        return {"url": url, "text": cached["text"], "fields": cached["fields"], "source": "cache",
+                "truncated": cached["truncated"]}
+
+    async with _host_limit(url):
+        with span("page_fetch"):
+            status, headers, body, truncated, charset = await _fetch_page(url, cached or {})
+
+    if status == 304 and cached:
+        cached["checked_at"] = time.time()
+        page_cache.set(key, cached)
+        return {"url": url, "text": cached["text"], "fields": cached["fields"], "source": "not_modified",
+                "truncated": cached["truncated"]}
+
+    # Parsing is CPU-bound; keep it off the event loop
+    posting = await run_cpu(parse_job_page, body, charset)
+    text = posting.pop("text")
+    # "source" in the result says where the page came from; the extraction method goes in the fields
+    posting["extraction"] = posting.pop("source")
+    if text:
+        page_cache.set(key, {
+            "text": text,
+            "fields": posting,
+            "truncated": truncated,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "checked_at": time.time(),
+        })
+    return {"url": url, "text": text, "fields": posting, "source": "network", "truncated": truncated}
+
+
+async def scrape_job_description(url: str) -> str:
     """
     Scrapes job description text from a given URL.
-    Uses basic requests/bs4 for simplicity. 
     For complex SPAs (LinkedIn/Indeed), Playwright would be needed.
+    Returns "" on failure.
     """
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Try to find common job description containers
-        # This is a heuristic and varies by site
-        content = ""
-        
-        # Priority to generic semantic tags
-        main_content = soup.find('main') or soup.find('article') or soup.body
-        
-        if main_content:
-            # Remove scripts and styles
-            for script in main_content(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            content = main_content.get_text(separator="\n")
-            
-        return content.strip()[:10000] # Limit length
-
+        return (await fetch_job_page(url))["text"]
     except Exception as e:
         print(f"Scraping Error: {e}")
         return ""
 
-def search_google_jobs(query: str, limit: int = 10) -> list:
+
+async def scrape_job_pages(urls: list, concurrency: int = 8, refresh: bool = False) -> list:
+    """
+    Scrapes many job pages concurrently (`concurrency` overall, SCRAPE_PER_HOST_LIMIT
+    per host). Returns one {"url", "success", ...} entry per URL, in input order.
+    """
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def scrape(url):
+        async with limit:
+            try:
+                page = await fetch_job_page(url, refresh=refresh)
+            except Exception as e:
+                print(f"Scraping Error: {e}")
+                return {"url": url, "success": False, "error": str(e)}
+        if not page["text"]:
+            return {"url": url, "success": False, "error": "Failed to scrape content"}
+        return {"success": True, **page}
+
+    return await asyncio.gather(*(scrape(url) for url in urls))
+
+
+async def search_google_jobs(query: str, limit: int = 10):
     """
     Searches Google Jobs via SerpApi (Best for India - Naukri, LinkedIn, etc.)
+    Results are cached by normalized query; empty results and errors are not cached.
+    Returns None when SerpApi is not configured.
     """
-    results = []
+    if not os.getenv("SERPAPI_KEY"):
+        return None
+
+    return await google_jobs_cache.get_or_fetch(
+        ("serpapi", normalize_query(query), limit),
+        lambda: _fetch_google_jobs(query, limit),
+        cost=lambda jobs: {"serpapi": 1},
+        cacheable=bool,
+    )
+
+
+async def _fetch_google_jobs(query: str, limit: int) -> list:
     api_key = os.getenv("SERPAPI_KEY")
-    
-    if not api_key:
+
+    # Enforce India context for better results
+    if "india" not in query.lower() and "remote" not in query.lower():
+        query += " in India"
+
+    params = {
+        "engine": "google_jobs",
+        "q": query,
+        "hl": "en",
+        "gl": "in", # Target India
+        "api_key": api_key,
+        "num": limit
+    }
+
+    response = await get_http_client().get(f"{SERPAPI_BASE_URL}/search.json", params=params)
+    # Quota, auth and rate-limit failures must not be cached as "no jobs". The status is checked
+    # by hand because raise_for_status would put the request URL, with the api key, in the logs.
+    if response.status_code != 200:
+        raise ValueError(f"SerpApi returned HTTP {response.status_code}")
+    data = response.json()
+    if data.get("error") and not data.get("jobs_results"):
+        raise ValueError(f"SerpApi error: {data['error']}")
+
+    results = []
+    for job in data.get("jobs_results", []):
+        results.append({
+            "id": job.get("job_id", ""),
+            "title": job.get("title", ""),
+            "company": job.get("company_name", "Unknown"),
+            "description": job.get("description", "")[:200] + "...",
+            "url": (
+                job.get("related_links", [{}])[0].get("link")
+                or job.get("apply_options", [{}])[0].get("link")
+                or job.get("share_link")
+                or "#"
+            ),
+            "source": job.get("via", "View Job"),
+            "location": job.get("location", "")
+        })
+    return results
+
+
+async def search_adzuna_jobs(query: str, limit: int = 10):
+    """
+    Adzuna API (Free tier: 1000 calls/month)
+    Sign up at: https://developer.adzuna.com/
+    Returns None when Adzuna is not configured.
+    """
+    adzuna_app_id = os.getenv("ADZUNA_APP_ID")
+    adzuna_api_key = os.getenv("ADZUNA_API_KEY")
+    if not (adzuna_app_id and adzuna_api_key):
+        return None
+
+    params = {
+        "app_id": adzuna_app_id,
+        "app_key": adzuna_api_key,
+        "results_per_page": limit,
+        "what": query,
+        "content-type": "application/json"
+    }
+
+    response = await get_http_client().get(f"{ADZUNA_BASE_URL}/v1/api/jobs/in/search/1", params=params)
+    if response.status_code != 200:
         return []
 
-    try:
-        # Enforce India context for better results
-        if "india" not in query.lower() and "remote" not in query.lower():
-            query += " in India"
-            
-        params = {
-            "engine": "google_jobs",
-            "q": query,
-            "hl": "en",
-            "gl": "in", # Target India
-            "api_key": api_key,
-            "num": limit
+    return [
+        {
+            "id": job.get("id", ""),
+            "title": job.get("title", ""),
+            "company": job.get("company", {}).get("display_name", "Unknown"),
+            "description": job.get("description", "")[:200] + "...",
+            "url": job.get("redirect_url", "#"),
+            "source": "Adzuna"
         }
-        
-        response = requests.get("https://serpapi.com/search.json", params=params, timeout=10)
-        data = response.json()
-        
-        if "jobs_results" in data:
-            for job in data["jobs_results"]:
-                results.append({
-                    "id": job.get("job_id", ""),
-                    "title": job.get("title", ""),
-                    "company": job.get("company_name", "Unknown"),
-                    "description": job.get("description", "")[:200] + "...",
-                    "url": (
-                        job.get("related_links", [{}])[0].get("link")
-                        or job.get("apply_options", [{}])[0].get("link")
-                        or job.get("share_link")
-                        or "#"
-                    ),
-                    "source": job.get("via", "View Job"),
-                    "location": job.get("location", "")
-                })
+        for job in response.json().get("results", [])
+    ]
+
+
+async def search_muse_jobs(query: str, limit: int = 10):
+    """The Muse API (Free, no key required)"""
+    params = {
+        "page": 0,
+        "descending": True,
+        "api_key": "public",
+        "category": query.split()[0] if query else "Software Engineer"
+    }
+
+    response = await get_http_client().get(f"{MUSE_BASE_URL}/api/public/jobs", params=params)
+    if response.status_code != 200:
+        return []
+
+    return [
+        {
+            "id": str(job.get("id", "")),
+            "title": job.get("name", ""),
+            "company": job.get("company", {}).get("name", "Unknown"),
+            "description": (job.get("contents", "") or "No description")[:200] + "...",
+            "url": job.get("refs", {}).get("landing_page", "#"),
+            "source": "The Muse"
+        }
+        for job in response.json().get("results", [])[:limit]
+    ]
+
+
+async def search_remotive_jobs(query: str, limit: int = 10):
+    """Remotive API (Free, remote jobs)"""
+    params = {
+        "search": query,
+        "limit": limit
+    }
+
+    response = await get_http_client().get(f"{REMOTIVE_BASE_URL}/api/remote-jobs", params=params)
+    if response.status_code != 200:
+        return []
+
+    return [
+        {
+            "id": str(job.get("id", "")),
+            "title": job.get("title", ""),
+            "company": job.get("company_name", "Unknown"),
+            "description": job.get("description", "")[:200] + "...",
+            "url": job.get("url", "#"),
+            "source": "Remotive"
+        }
+        for job in response.json().get("jobs", [])[:limit]
+    ]
+
+
+# Providers in merge priority order: (name, label for logs, search function)
+JOB_PROVIDERS = [
+    ("serpapi", "SerpApi", search_google_jobs),
+    ("adzuna", "Adzuna API", search_adzuna_jobs),
+    ("the_muse", "The Muse API", search_muse_jobs),
+    ("remotive", "Remotive API", search_remotive_jobs),
+]
+
+# Overall budget for one fan-out across all providers
+JOB_SEARCH_DEADLINE_SECONDS = float(os.getenv("JOB_SEARCH_DEADLINE_SECONDS", "12"))
+
+
+async def _run_provider(label: str, search, query: str, limit: int) -> dict:
+    """Runs one provider and records its outcome and wall time."""
+    start = time.perf_counter()
+    try:
+        with span("job_search", provider=label):
+            jobs = await search(query, limit=limit)
+        outcome = {"status": "skipped", "count": 0} if jobs is None else {"status": "ok", "count": len(jobs)}
+        outcome["jobs"] = jobs or []
     except Exception as e:
-        print(f"SerpApi Error: {e}")
-        
-    return results
+        print(f"{label} Error: {e}")
+        outcome = {"status": "error", "count": 0, "jobs": [], "error": str(e)}
+    outcome["ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return outcome
 
-def search_external_jobs(query: str, limit: int = 10) -> list:
+
+async def fan_out_job_search(query: str, limit: int = 10, deadline: float = JOB_SEARCH_DEADLINE_SECONDS):
     """
-    Searches for jobs using multiple free job board APIs.
-    No rate limits, completely free.
+    Queries all job providers concurrently and merges their results in priority order.
+    Returns (results, timings). Lower-priority calls are cancelled as soon as the
+    completed high-priority providers already fill `limit`; anything still running
+    at the deadline is cancelled and reported as a timeout.
     """
-    results = []
-    
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    tasks = [
+        asyncio.ensure_future(_run_provider(label, search, query, limit))
+        for _, label, search in JOB_PROVIDERS
+    ]
+    outcomes = [None] * len(tasks)
+
     try:
-        # Option 0: Google Jobs (Best for India)
-        google_limit = limit  # Give full limit to Google first
-        google_results = search_google_jobs(query, limit=google_limit)
-        results.extend(google_results)
-        
-        # If we have enough results, we can stop or fetch fewer from others
-        remaining_limit = limit - len(results)
-        if remaining_limit <= 0:
-            return results
-
-        # Option 1: Adzuna API (Free tier: 1000 calls/month)
-        # Sign up at: https://developer.adzuna.com/
-        adzuna_app_id = os.getenv("ADZUNA_APP_ID")
-        adzuna_api_key = os.getenv("ADZUNA_API_KEY")
-        
-        if adzuna_app_id and adzuna_api_key:
-            try:
-                url = f"https://api.adzuna.com/v1/api/jobs/in/search/1"
-                params = {
-                    "app_id": adzuna_app_id,
-                    "app_key": adzuna_api_key,
-                    "results_per_page": remaining_limit,
-                    "what": query,
-                    "content-type": "application/json"
-                }
-                
-                response = requests.get(url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    for job in data.get("results", []):
-                        results.append({
-                            "id": job.get("id", ""),
-                            "title": job.get("title", ""),
-                            "company": job.get("company", {}).get("display_name", "Unknown"),
-                            "description": job.get("description", "")[:200] + "...",
-                            "url": job.get("redirect_url", "#"),
-                            "source": "Adzuna"
-                        })
-                    
-                    if len(results) >= limit:
-                        return results
-            except Exception as e:
-                print(f"Adzuna API Error: {e}")
-        
-        # Option 2: The Muse API (Free, no key required)
-        remaining_limit = limit - len(results)
-        if remaining_limit > 0:
-            try:
-                url = "https://www.themuse.com/api/public/jobs"
-                params = {
-                    "page": 0,
-                    "descending": True,
-                    "api_key": "public",
-                    "category": query.split()[0] if query else "Software Engineer"
-                }
-                
-                response = requests.get(url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    for job in data.get("results", [])[:remaining_limit]:
-                        results.append({
-                            "id": str(job.get("id", "")),
-                            "title": job.get("name", ""),
-                            "company": job.get("company", {}).get("name", "Unknown"),
-                            "description": (job.get("contents", "") or "No description")[:200] + "...",
-                            "url": job.get("refs", {}).get("landing_page", "#"),
-                            "source": "The Muse"
-                        })
-            except Exception as e:
-                print(f"The Muse API Error: {e}")
-        
-        # Option 3: Remotive API (Free, remote jobs)
-        remaining_limit = limit - len(results)
-        if remaining_limit > 0:
-            try:
-                url = "https://remotive.com/api/remote-jobs"
-                params = {
-                    "search": query,
-                    "limit": remaining_limit
+        pending = set(tasks)
+        while pending:
+            remaining = deadline - (loop.time() - started)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                outcomes[tasks.index(task)] = task.result()
+
+            # Enough results from the leading, already-finished providers?
+            collected = 0
+            for outcome in outcomes:
+                if outcome is None:
+                    break
+                collected += outcome["count"]
+            if collected >= limit:
+                break
+    finally:
+        for i, task in enumerate(tasks):
+            if outcomes[i] is None:
+                task.cancel()
+                timed_out = deadline - (loop.time() - started) <= 0
+                outcomes[i] = {
+                    "status": "timeout" if timed_out else "cancelled",
+                    "count": 0,
+                    "jobs": [],
+                    "ms": round((loop.time() - started) * 1000, 1),
                 }
-                
-                response = requests.get(url, params=params, timeout=10)
-                if response.status_code == 200:
-                    data = response.json()
-                    for job in data.get("jobs", [])[:remaining_limit]:
-                        results.append({
-                            "id": str(job.get("id", "")),
-                            "title": job.get("title", ""),
-                            "company": job.get("company_name", "Unknown"),
-                            "description": job.get("description", "")[:200] + "...",
-                            "url": job.get("url", "#"),
-                            "source": "Remotive"
-                        })
-            except Exception as e:
-                print(f"Remotive API Error: {e}")
-            
+
+    results = []
+    timings = {}
+    for (name, _, _), outcome in zip(JOB_PROVIDERS, outcomes):
+        results.extend(outcome.pop("jobs"))
+        timings[name] = outcome
+    timings["total_ms"] = round((loop.time() - started) * 1000, 1)
+
+    return results[:limit], timings
+
+
+def _provider_calls(search_result) -> dict:
+    """Upstream calls a fan-out made, per provider (skipped providers cost nothing)."""
+    _, timings = search_result
+    return {
+        name: 1 for name, outcome in timings.items()
+        if isinstance(outcome, dict) and outcome.get("status") != "skipped"
+    }
+
+
+async def search_external_jobs(query: str, limit: int = 10, timings: dict = None) -> list:
+    """
+    Searches for jobs using multiple free job board APIs, queried concurrently.
+    Non-empty result sets are cached by normalized query and limit.
+    If `timings` is given it is filled with per-provider status and latency.
+    """
+    results = []
+    fetched = []
+
+    async def fetch():
+        fetched.append(True)
+        return await fan_out_job_search(query, limit=limit)
+
+    try:
+        results, provider_timings = await job_search_cache.get_or_fetch(
+            ("external", normalize_query(query), limit),
+            fetch,
+            cost=_provider_calls,
+            cacheable=lambda search_result: bool(search_result[0]),
+        )
+        if timings is not None:
+            timings.update(provider_timings)
+            timings["cached"] = not fetched
     except Exception as e:
         print(f"Job Search Error: {e}")
-    
+
     # Fallback: Return helpful message if all APIs fail
     if not results:
         api_key = os.getenv("SERPAPI_KEY")
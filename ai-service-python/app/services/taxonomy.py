@@ -0,0 +1,187 @@
+import re
+from collections import Counter
+
+# Shared vocabulary for job search queries and rule-based resume extraction
+
+# Keyword maps for domain inference from job titles and skills
+DOMAIN_KEYWORDS = [
+    (["backend", "node", "express", "fastapi", "django", "spring", "api", "server", "microservice"], "Backend Developer"),
+    (["frontend", "react", "angular", "vue", "next", "nuxt", "ui", "css", "html", "tailwind"],       "Frontend Developer"),
+    (["full stack", "fullstack", "mern", "mean", "full-stack"],                                       "Full Stack Developer"),
+    (["data science", "machine learning", "ml", "deep learning", "pytorch", "tensorflow", "nlp"],    "Data Scientist"),
+    (["devops", "kubernetes", "docker", "ci/cd", "jenkins", "terraform", "ansible", "aws", "cloud"], "DevOps Engineer"),
+    (["android", "ios", "flutter", "react native", "swift", "kotlin", "mobile"],                     "Mobile Developer"),
+    (["blockchain", "solidity", "web3", "smart contract"],                                            "Blockchain Developer"),
+]
+
+
+# Prioritize these skills for search queries as they are more "niche" and lead to better hits
+SEARCH_PRIORITY_SKILLS = [
+    "nodejs", "node.js", "react", "reactjs", "angular", "vue", "fastapi", "django",
+    "spring", "flask", "docker", "kubernetes", "aws", "azure", "gcp", "devops",
+    "machine learning", "data science", "nlp", "blockchain", "solidity", "webrtc"
+]
+
+
+# Skills recognised by the rule-based extractor, in their display form
+SKILLS = [
+    # Languages
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Golang", "Rust", "Ruby", "PHP", "Kotlin",
+    "Swift", "Scala", "Dart", "Objective-C", "MATLAB", "Perl", "Bash", "PowerShell", "SQL", "HTML", "CSS",
+    "Sass", "Solidity", "Haskell", "Elixir", "Lua",
+    # Frontend
+    "React", "Angular", "Vue", "Next.js", "Nuxt", "Svelte", "Redux", "Tailwind", "Bootstrap", "jQuery",
+    "Webpack", "Vite", "Material UI", "Three.js", "D3.js",
+    # Backend
+    "Node.js", "Express.js", "NestJS", "FastAPI", "Django", "Flask", "Spring Boot", "Spring", "Laravel",
+    "Ruby on Rails", "ASP.NET", ".NET", "GraphQL", "REST", "gRPC", "WebSockets", "WebRTC", "Microservices",
+    # Data and ML
+    "Machine Learning", "Deep Learning", "Data Science", "NLP", "Computer Vision", "PyTorch", "TensorFlow",
+    "Keras", "scikit-learn", "Pandas", "NumPy", "SciPy", "OpenCV", "Hugging Face", "LangChain", "LLM",
+    "Spark", "Hadoop", "Airflow", "Kafka", "Tableau", "Power BI", "Excel", "Statistics",
+    # Databases
+    "MySQL", "PostgreSQL", "MongoDB", "Redis", "SQLite", "Oracle", "Cassandra", "DynamoDB", "Elasticsearch",
+    "Firebase", "Supabase", "Snowflake", "BigQuery",
+    # Cloud and DevOps
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins", "GitHub Actions",
+    "GitLab CI", "CI/CD", "Linux", "Nginx", "Prometheus", "Grafana", "Serverless", "Lambda", "DevOps",
+    # Mobile
+    "Android", "iOS", "Flutter", "React Native", "SwiftUI", "Jetpack Compose",
+    # Web3
+    "Blockchain", "Web3", "Ethereum", "Smart Contracts",
+    # Tools and practices
+    "Git", "GitHub", "Jira", "Figma", "Postman", "Selenium", "Jest", "Pytest", "Cypress", "Agile", "Scrum",
+    "Unit Testing", "System Design", "Data Structures", "Algorithms", "OOP",
+]
+
+# Alternative spellings -> display form
+SKILL_ALIASES = {
+    "node": "Node.js", "nodejs": "Node.js", "node js": "Node.js",
+    "reactjs": "React", "react.js": "React",
+    "vuejs": "Vue", "vue.js": "Vue", "angularjs": "Angular", "nextjs": "Next.js", "nuxt.js": "Nuxt",
+    "expressjs": "Express.js", "express": "Express.js",
+    "golang": "Golang", "js": "JavaScript", "ts": "TypeScript",
+    "postgres": "PostgreSQL", "mongo": "MongoDB", "k8s": "Kubernetes",
+    "amazon web services": "AWS", "google cloud": "GCP", "google cloud platform": "GCP",
+    "sklearn": "scikit-learn", "ml": "Machine Learning", "dl": "Deep Learning",
+    "natural language processing": "NLP", "tailwindcss": "Tailwind", "tailwind css": "Tailwind",
+    "ci/cd pipelines": "CI/CD", "smart contract": "Smart Contracts", "rest api": "REST", "restful": "REST",
+    "springboot": "Spring Boot", "dotnet": ".NET", "html5": "HTML", "css3": "CSS",
+    "full stack": None, "fullstack": None, "full-stack": None,
+}
+
+
+def years_to_level(years: float) -> str:
+    """Map total years of experience to a job level label."""
+    if years < 1:
+        return "Intern"
+    elif years < 3:
+        return "Junior"
+    elif years < 6:
+        return "Mid-Level"
+    elif years < 10:
+        return "Senior"
+    else:
+        return "Lead"
+
+
+# Per-keyword weights for domain scoring; generic terms count less than specific ones
+_KEYWORD_WEIGHTS = {"api": 0.5, "server": 0.5, "ui": 0.5, "next": 0.5, "cloud": 0.5, "mobile": 0.5, "ml": 0.75}
+# A keyword found in a job title counts this many times more than one in the skills
+TITLE_WEIGHT = 2.0
+
+# Compared with spaces removed, the same way select_best_skill normalizes its input, so
+# multi-word entries ("machine learning", "data science") match as well
+_PRIORITY_SKILLS = frozenset(s.replace(" ", "") for s in SEARCH_PRIORITY_SKILLS)
+_DOMAIN_ORDER = {domain: i for i, (_, domain) in enumerate(DOMAIN_KEYWORDS)}
+
+
+# Maps ASCII punctuation and whitespace to spaces, so str.split() yields word tokens
+_TOKEN_TABLE = str.maketrans({chr(c): " " for c in range(128) if not (chr(c).isalnum() or chr(c) == "_")})
+
+
+def _build_domain_matcher():
+    """
+    Splits the keywords into single-token terms, looked up in a token Counter,
+    and multi-token phrases ("react native", "ci/cd"), counted on the
+    space-normalized text with word boundaries. Spellings of a domain's keyword
+    that normalize alike ("full stack", "full-stack") are kept once, so one
+    mention scores once.
+    """
+    unigrams, phrases = {}, {}
+    for keywords, domain in DOMAIN_KEYWORDS:
+        seen = set()
+        for keyword in keywords:
+            tokens = tuple(keyword.translate(_TOKEN_TABLE).split())
+            if tokens in seen:
+                continue
+            seen.add(tokens)
+            table = unigrams if len(tokens) == 1 else phrases
+            table.setdefault(tokens if len(tokens) > 1 else tokens[0], []).append((keyword, domain))
+    return unigrams, phrases
+
+
+_UNIGRAM_DOMAINS, _PHRASE_DOMAINS = _build_domain_matcher()
+
+
+def domain_scores(titles: list, skills: list) -> dict:
+    """
+    Scores every domain in one tokenizing pass per input: each whole-word keyword
+    hit adds its weight (TITLE_WEIGHT times more for titles). Returns
+    {domain: score} for the domains that matched.
+    """
+    scores = {}
+    for texts, factor in ((titles, TITLE_WEIGHT), (skills, 1.0)):
+        if not texts:
+            continue
+        normalized = " " + " ".join(texts).lower().translate(_TOKEN_TABLE) + " "
+        counts = Counter(normalized.split())
+        hits = []
+        for tokens, entries in _PHRASE_DOMAINS.items():
+            if all(t in counts for t in tokens):
+                n = normalized.count(" " + " ".join(tokens) + " ")
+                if n:
+                    hits.extend((keyword, domain, n) for keyword, domain in entries)
+                    # "react native" is not also a hit for "react"
+                    for t in tokens:
+                        counts[t] -= n
+        for token, entries in _UNIGRAM_DOMAINS.items():
+            n = counts.get(token, 0)
+            if n > 0:
+                hits.extend((keyword, domain, n) for keyword, domain in entries)
+        for keyword, domain, n in hits:
+            scores[domain] = scores.get(domain, 0.0) + _KEYWORD_WEIGHTS.get(keyword, 1.0) * factor * n
+    return scores
+
+
+def select_best_skill(skills: list) -> str:
+    """Select the most 'search-relevant' skill from a list."""
+    if not skills:
+        return ""
+
+    # Check for priority skills first
+    for s in skills:
+        if s.lower().replace(" ", "") in _PRIORITY_SKILLS:
+            return s
+
+    # Fallback to the first skill that isn't just a single character or common language
+    for s in skills:
+        if len(s) > 2: # Ignore 'C', 'C++', 'Java' (too common)
+            return s
+
+    return skills[0] if skills else ""
+
+
+def infer_domain(titles: list, skills: list) -> str:
+    """
+    Infer job domain from experience titles and skills.
+    Every whole-word keyword hit adds its weight to its domain, TITLE_WEIGHT times
+    more for titles (see domain_scores). The highest total wins, so a domain
+    whose keywords appear more often, or in titles, beats one with a single
+    stronger hit. Ties go to the earlier entry in DOMAIN_KEYWORDS. With no hits
+    the result is "Software Developer".
+    """
+    scores = domain_scores(titles, skills)
+    if not scores:
+        return "Software Developer"
+    return max(scores, key=lambda domain: (scores[domain], -_DOMAIN_ORDER[domain]))
@@ -0,0 +1,189 @@
+import re
+from collections import Counter
+
+from app.services.parser import PAGE_SEPARATOR
+
+# Section headings commonly found in resumes, mapped to a canonical name
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "about me", "objective", "career objective"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships", "internship"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "technologies", "tech stack",
+               "core competencies", "competencies"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects"),
+    "education": ("education", "academic background", "qualifications", "academics"),
+    "certifications": ("certifications", "certificates", "courses", "licenses"),
+    "achievements": ("achievements", "awards", "honors", "accomplishments"),
+}
+_HEADING_LOOKUP = {alias: name for name, aliases in SECTION_HEADINGS.items() for alias in aliases}
+
+# Sections kept first when the text is over budget; unlisted sections come last
+RESUME_SECTION_PRIORITY = ("header", "experience", "skills", "summary", "projects", "education", "certifications")
+CRITERIA_SECTION_PRIORITY = ("experience", "skills", "summary", "header", "projects", "education")
+
+# English stop words, identical to scikit-learn's ENGLISH_STOP_WORDS (kept here so tokenizing
+# does not import scikit-learn, which adds over a second to a cold start)
+ENGLISH_STOP_WORDS = frozenset("""
+a about above across after afterwards again against all almost alone along already also although
+always am among amongst amoungst amount an and another any anyhow anyone anything anyway
+anywhere are around as at back be became because become becomes becoming been before beforehand
+behind being below beside besides between beyond bill both bottom but by call can cannot cant co
+con could couldnt cry de describe detail do done down due during each eg eight either eleven
+else elsewhere empty enough etc even ever every everyone everything everywhere except few
+fifteen fifty fill find fire first five for former formerly forty found four from front full
+further get give go had has hasnt have he hence her here hereafter hereby herein hereupon hers
+herself him himself his how however hundred i ie if in inc indeed interest into is it its itself
+keep last latter latterly least less ltd made many may me meanwhile might mill mine more
+moreover most mostly move much must my myself name namely neither never nevertheless next nine
+no nobody none noone nor not nothing now nowhere of off often on once one only onto or other
+others otherwise our ours ourselves out over own part per perhaps please put rather re same see
+seem seemed seeming seems serious several she should show side since sincere six sixty so some
+somehow someone something sometime sometimes somewhere still such system take ten than that the
+their them themselves then thence there thereafter thereby therefore therein thereupon these
+they thick thin third this those though three through throughout thru thus to together too top
+toward towards twelve twenty two un under until up upon us very via was we well were what
+whatever when whence whenever where whereafter whereas whereby wherein whereupon wherever
+whether which while whither who whoever whole whom whose why will with within without would yet
+you your yours yourself yourselves
+""".split())
+
+# Same token rule as scikit-learn's default analyzer: runs of 2+ word characters
+_TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+
+# A line counts as a running header/footer if it sits at the edge of this share of pages
+_REPEATED_LINE_SHARE = 0.6
+_EDGE_LINES = 2
+
+
+def tokenize(text: str) -> Counter:
+    """
+    Raw term counts for a document: lowercased word tokens without English stop
+    words, as TfidfVectorizer(stop_words='english') would count them.
+    """
+    return Counter(t for t in _TOKEN_RE.findall((text or "").lower()) if t not in ENGLISH_STOP_WORDS)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapses runs of spaces, trims lines and squeezes blank lines down to one."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\u00a0", " ")
+    lines = [re.sub(r"[ \t\u00a0\u200b]+", " ", line).strip() for line in text.split("\n")]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+def _line_signature(line: str) -> str:
+    # Page numbers differ page to page ("Page 2 of 3"); compare with digits masked
+    return re.sub(r"\d+", "#", line.lower())
+
+
+def strip_repeated_lines(pages: list) -> list:
+    """
+    Removes running headers and footers: lines within the first or last few
+    lines of most pages whose text (ignoring digits) repeats across pages.
+    Only the first occurrence of each such line is kept.
+    """
+    if len(pages) < 2:
+        return pages
+    page_lines = [[line for line in page.split("\n") if line.strip()] for page in pages]
+    edge_counts = Counter()
+    for lines in page_lines:
+        edges = lines[:_EDGE_LINES] + lines[-_EDGE_LINES:]
+        edge_counts.update({_line_signature(line) for line in edges})
+    threshold = max(2, _REPEATED_LINE_SHARE * len(pages))
+    repeated = {sig for sig, count in edge_counts.items() if count >= threshold}
+    if not repeated:
+        return pages
+
+    # The first occurrence is kept: a repeated header often carries the candidate's name or contact details
+    cleaned, seen = [], set()
+    for lines in page_lines:
+        n = len(lines)
+        kept = []
+        for i, line in enumerate(lines):
+            sig = _line_signature(line)
+            if (i < _EDGE_LINES or i >= n - _EDGE_LINES) and sig in repeated:
+                if sig in seen:
+                    continue
+                seen.add(sig)
+            kept.append(line)
+        cleaned.append("\n".join(kept))
+    return cleaned
+
+
+def _heading_name(line: str):
+    """Returns the canonical section name if `line` looks like a section heading."""
+    if len(line) > 40:
+        return None
+    key = re.sub(r"[^a-z ]", "", line.lower()).strip()
+    return _HEADING_LOOKUP.get(key)
+
+
+def split_sections(text: str) -> list:
+    """
+    Splits resume text into [(section name, text)] in document order. Text before
+    the first heading (name, contact details) is the "header" section.
+    """
+    sections = []
+    name, lines = "header", []
+    for line in text.split("\n"):
+        heading = _heading_name(line)
+        if heading:
+            if any(l.strip() for l in lines):
+                sections.append((name, "\n".join(lines).strip()))
+            name, lines = heading, [line]
+        else:
+            lines.append(line)
+    if any(l.strip() for l in lines):
+        sections.append((name, "\n".join(lines).strip()))
+    return sections
+
+
+def _truncate_lines(text: str, max_tokens: int) -> str:
+    """Keeps whole lines from the start of `text` while they fit in `max_tokens`."""
+    kept, used = [], 0
+    for line in text.split("\n"):
+        cost = estimate_tokens(line + "\n")
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    if not kept and max_tokens > 0:
+        return text[:max_tokens * 4]
+    return "\n".join(kept)
+
+
+def compact_text(text: str, max_tokens: int, priority: tuple = RESUME_SECTION_PRIORITY) -> str:
+    """
+    Prepares extracted document text for an LLM prompt within `max_tokens`.
+
+    Whitespace is normalized and running headers/footers repeated across pages
+    (pages are separated by PAGE_SEPARATOR) are dropped. If the text is still over
+    budget, sections are kept in `priority` order and the first one that does not
+    fit is cut at a line boundary; the result keeps the original section order.
+    """
+    pages = strip_repeated_lines([normalize_whitespace(p) for p in (text or "").split(PAGE_SEPARATOR)])
+    text = normalize_whitespace("\n".join(p for p in pages if p))
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sections = split_sections(text)
+    rank = {name: i for i, name in enumerate(priority)}
+    order = sorted(range(len(sections)), key=lambda i: (rank.get(sections[i][0], len(priority)), i))
+
+    kept = {}
+    remaining = max_tokens
+    for i in order:
+        body = sections[i][1]
+        cost = estimate_tokens(body + "\n\n")
+        if cost <= remaining:
+            kept[i] = body
+            remaining -= cost
+        else:
+            if remaining > 16:
+                kept[i] = _truncate_lines(body, remaining)
+            break
+    return "\n\n".join(kept[i] for i in sorted(kept) if kept[i])
@@ -0,0 +1,217 @@
+"""
+End-to-end endpoint benchmark, fully offline.
+
+Starts the service with uvicorn against benchmarks/stubs.py (Groq, Gemini and
+the four job APIs, each with a configurable latency) and a local job-page
+server, writes the synthetic corpus PDFs to a temp dir, then runs closed-loop
+clients against one endpoint at a time:
+
+    process_resume       POST /process-resume         local PDF + LLM analysis (bypass_cache)
+    match_jobs           POST /match-jobs             one resume vs one job
+    match_jobs_batch     POST /match-jobs/batch       one job vs --batch-size resumes
+    search_candidates    POST /search-candidates      one job vs the indexed corpus
+    scrape_job           POST /scrape-job             a fresh URL on the page server
+    recommend_jobs       POST /recommend-jobs         parsed data fast path + job search
+    recommend_jobs_llm   POST /recommend-jobs         LLM search criteria + job search (RULES_FAST_PATH=false)
+
+The LLM and job-search caches are off unless --warm-caches, so every request
+reaches the stubs. Endpoints with their own settings (ENDPOINT_ENV) run against
+a separate service instance, and the run fails if an endpoint never reached the
+upstream it is meant to measure (REQUIRED_UPSTREAM). Reports requests/s and p50/p95/p99 per endpoint as JSON;
+compare two reports with benchmarks/compare.py. Run from ai-service-python:
+
+    python benchmarks/bench_endpoints.py [--concurrency 8] [--duration 10] [--only match_jobs,scrape_job]
+                                         [--latency groq=0.8] [--default-latency 0.05] [--out endpoints.json]
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import ROOT, metadata, print_table, summarize, write_report  # noqa: E402
+from benchmarks.corpus import build_corpus, write_corpus  # noqa: E402
+from benchmarks.load_test import free_port, start_page_server, start_service  # noqa: E402
+from benchmarks.stubs import StubServer, parse_latency  # noqa: E402
+
+ENDPOINTS = ("process_resume", "match_jobs", "match_jobs_batch", "search_candidates", "scrape_job",
+             "recommend_jobs", "recommend_jobs_llm")
+# Service settings per endpoint; the synthetic resumes are clean enough for the rule-based
+# fast path to answer search criteria without the LLM, so it is turned off for that scenario
+ENDPOINT_ENV = {"recommend_jobs_llm": {"RULES_FAST_PATH": "false"}}
+# Stub provider each endpoint must call at least once, or its numbers measure the wrong path
+REQUIRED_UPSTREAM = {"recommend_jobs_llm": "groq"}
+
+
+def request_builders(corpus: dict, corpus_dir: str, page_url: str, batch_size: int, rng: random.Random) -> dict:
+    """endpoint -> callable returning (path, body) for its next request."""
+    resumes = corpus["resumes"]
+    jobs = [job["text"] for job in corpus["jobs"]]
+    pdf_paths = [os.path.join(corpus_dir, "resumes", r["id"] + ".pdf") for r in resumes]
+    batch_size = min(batch_size, len(resumes))
+    counter = iter(range(10 ** 9))
+
+    def parsed(resume):
+        return {"skills": resume["skills"], "years_of_experience": resume["years"],
+                "experience": [{"title": resume["title"], "years": resume["years"]}]}
+
+    return {
+        "process_resume": lambda: ("/process-resume", {"file_path": rng.choice(pdf_paths), "bypass_cache": True}),
+        "match_jobs": lambda: ("/match-jobs", {"resume_text": rng.choice(resumes)["text"],
+                                               "job_description": rng.choice(jobs)}),
+        "match_jobs_batch": lambda: ("/match-jobs/batch", {
+            "job_description": rng.choice(jobs), "top_k": 10,
+            "resumes": [{"id": r["id"], "resume_text": r["text"]} for r in rng.sample(resumes, batch_size)],
+        }),
+        "search_candidates": lambda: ("/search-candidates", {"job_description": rng.choice(jobs), "top_k": 10}),
+        "scrape_job": lambda: ("/scrape-job", {"url": f"{page_url}/job/{next(counter)}"}),
+        "recommend_jobs": lambda: ("/recommend-jobs", {"resume_text": "", "parsed_data": parsed(rng.choice(resumes))}),
+        "recommend_jobs_llm": lambda: ("/recommend-jobs", {"resume_text": rng.choice(resumes)["text"],
+                                                           "bypass_cache": True}),
+    }
+
+
+async def index_corpus(client: httpx.AsyncClient, corpus: dict, corpus_dir: str):
+    """Adds every corpus resume to the service's resume index, for search_candidates."""
+    semaphore = asyncio.Semaphore(8)
+
+    async def index(resume):
+        async with semaphore:
+            path = os.path.join(corpus_dir, "resumes", resume["id"] + ".pdf")
+            response = await client.post("/process-resume", json={"file_path": path, "resume_id": resume["id"]})
+            response.raise_for_status()
+
+    await asyncio.gather(*(index(resume) for resume in corpus["resumes"]))
+
+
+async def run_endpoint(client: httpx.AsyncClient, build, concurrency: int, duration: float) -> dict:
+    """Closed loop: `concurrency` clients send requests back to back for `duration` seconds."""
+    samples, errors = [], 0
+
+    async def worker(stop_at: float):
+        nonlocal errors
+        while time.monotonic() < stop_at:
+            path, body = build()
+            start = time.perf_counter()
+            try:
+                ok = (await client.post(path, json=body)).status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                samples.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker(start + duration) for _ in range(concurrency)))
+    elapsed = time.monotonic() - start
+    return {**summarize(samples), "errors": errors, "rps": round(len(samples) / elapsed, 2)}
+
+
+async def run_all(base_url: str, endpoints: list, corpus: dict, corpus_dir: str, page_url: str, stub: StubServer,
+                  args) -> list:
+    builders = request_builders(corpus, corpus_dir, page_url, args.batch_size, random.Random(args.seed))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        if "search_candidates" in endpoints:
+            await index_corpus(client, corpus, corpus_dir)
+        for name in endpoints:
+            # A few untimed requests first, so lazy imports and pools are not measured
+            for _ in range(2):
+                path, body = builders[name]()
+                await client.post(path, json=body)
+            calls = dict(stub.calls)
+            row = {"name": name, **await run_endpoint(client, builders[name], args.concurrency, args.duration)}
+            row["upstream_calls"] = {p: n - calls[p] for p, n in stub.calls.items() if n > calls[p]}
+            required = REQUIRED_UPSTREAM.get(name)
+            if required and not row["upstream_calls"].get(required):
+                sys.exit(f"{name} made no {required} calls, so it did not measure the path it is named for")
+            results.append(row)
+            print(f"{name}: {row['rps']} req/s, p50 {row['p50_ms']} ms, {row['errors']} errors", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per endpoint")
+    parser.add_argument("--only", default="", help=f"comma-separated subset of: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--resumes", type=int, default=50, help="corpus size (and search index size)")
+    parser.add_argument("--pages", type=int, default=1, help="approximate PDF pages per resume")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--latency", default="", help="per provider, e.g. groq=0.8,serpapi=0.3 (seconds)")
+    parser.add_argument("--default-latency", type=float, default=0.05, help="upstream latency in seconds")
+    parser.add_argument("--page-latency-ms", type=float, default=50)
+    parser.add_argument("--warm-caches", action="store_true", help="leave the LLM and job-search caches on")
+    parser.add_argument("--app-dir", default=ROOT, help="ai-service-python directory to serve")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="show the service's own output")
+    parser.add_argument("--out", help="write the JSON report here (default: print a table and the JSON)")
+    args = parser.parse_args()
+
+    endpoints = [name.strip() for name in args.only.split(",") if name.strip()] or list(ENDPOINTS)
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        sys.exit(f"unknown endpoints in --only: {', '.join(sorted(unknown))}")
+
+    stub = StubServer(parse_latency(args.latency), args.default_latency, seed=args.seed).start()
+    page_server = start_page_server(args.page_latency_ms / 1000)
+    page_url = f"http://127.0.0.1:{page_server.server_address[1]}"
+    corpus = build_corpus(n_resumes=args.resumes, n_jobs=20, pages=args.pages, seed=args.seed)
+    env = stub.env()
+    if not args.warm_caches:
+        env.update(LLM_CACHE_ENABLED="false", JOB_CACHE_ENABLED="false")
+
+    # One service instance per distinct ENDPOINT_ENV, in --only order
+    groups = {}
+    for name in endpoints:
+        groups.setdefault(tuple(sorted(ENDPOINT_ENV.get(name, {}).items())), []).append(name)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus_dir = os.path.join(workdir, "corpus")
+        write_corpus(corpus, corpus_dir)
+        try:
+            for group, (overrides, names) in enumerate(groups.items()):
+                service_dir = os.path.join(workdir, f"service-{group}")
+                os.makedirs(service_dir)
+                port = free_port()
+                service = start_service(args.app_dir, port, service_dir, args.concurrency,
+                                        extra_env={**env, **dict(overrides)},
+                                        stdout=None if args.verbose else subprocess.DEVNULL)
+                try:
+                    results += asyncio.run(run_all(f"http://127.0.0.1:{port}", names, corpus, corpus_dir, page_url,
+                                                   stub, args))
+                finally:
+                    service.terminate()
+                    service.wait()
+        finally:
+            page_server.shutdown()
+            stub.stop()
+
+    report = {
+        "suite": "endpoints",
+        "meta": metadata(
+            concurrency=args.concurrency, duration_s=args.duration, resumes=args.resumes, pages=args.pages,
+            batch_size=args.batch_size, latency_s=stub.latency, page_latency_ms=args.page_latency_ms,
+            warm_caches=args.warm_caches, seed=args.seed, app_dir=os.path.abspath(args.app_dir),
+        ),
+        "results": results,
+        "upstream_calls": stub.calls,
+    }
+    if not args.out:
+        print_table(results, ("errors", "rps"))
+        print()
+    write_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
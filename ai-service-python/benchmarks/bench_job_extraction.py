@@ -0,0 +1,98 @@
+"""
+Benchmark for job description extraction over the saved pages in
+benchmarks/fixtures/job_pages (expected.json lists what each page should yield).
+
+Compares app.services.job_extractor with the previous approach (full
+BeautifulSoup tree, <main>/<article>/<body> text; kept here as the baseline) on
+speed, output size, recall of posting phrases and leaked boilerplate. Run from
+ai-service-python:
+
+    python benchmarks/bench_job_extraction.py [--repeat 200] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.job_extractor import extract_job_posting  # noqa: E402
+from app.services.scraper import HTML_PARSER  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "job_pages")
+
+
+def legacy_extract(html: str) -> str:
+    soup = BeautifulSoup(html, HTML_PARSER)
+    main_content = soup.find('main') or soup.find('article') or soup.body
+    content = ""
+    if main_content:
+        for script in main_content(["script", "style", "nav", "footer", "header"]):
+            script.decompose()
+        content = main_content.get_text(separator="\n")
+    return content.strip()[:10000]
+
+
+def quality(text: str, expected: dict) -> dict:
+    return {
+        "chars": len(text),
+        "recall": sum(p in text for p in expected.get("include", [])) / max(len(expected.get("include", [])), 1),
+        "leaks": [p for p in expected.get("exclude", []) if p in text],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURES, "expected.json")) as f:
+        manifest = json.load(f)
+
+    report = []
+    for name, expected in manifest.items():
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+            html = f.read()
+        legacy_text = legacy_extract(html)
+        posting = extract_job_posting(html)
+        fields_ok = all(posting.get(k) == expected[k] for k in ("source", "title", "company") if k in expected)
+        report.append({
+            "page": name,
+            "bytes": len(html.encode("utf-8")),
+            "legacy_us": min(timeit.repeat(lambda: legacy_extract(html), number=args.repeat, repeat=3)) / args.repeat * 1e6,
+            "new_us": min(timeit.repeat(lambda: extract_job_posting(html), number=args.repeat, repeat=3)) / args.repeat * 1e6,
+            "legacy": quality(legacy_text, expected),
+            "new": quality(posting["text"], expected),
+            "source": posting["source"],
+            "fields_ok": fields_ok,
+            "requirements": len(posting["requirements"]),
+            "skills": len(posting["skills"]),
+        })
+
+    if args.json:
+        print(json.dumps({"parser": HTML_PARSER, "pages": report}, indent=2))
+        return
+
+    print(f"legacy parser: {HTML_PARSER}\n")
+    print(f"{'page':<24} {'legacy us':>10} {'new us':>10} {'chars old/new':>14} {'recall old/new':>15} "
+          f"{'leaks old/new':>14} {'source':>8} fields reqs")
+    for r in report:
+        print(f"{r['page']:<24} {r['legacy_us']:>10.0f} {r['new_us']:>10.0f} "
+              f"{r['legacy']['chars']:>6}/{r['new']['chars']:<7} "
+              f"{r['legacy']['recall']:>7.2f}/{r['new']['recall']:<7.2f} "
+              f"{len(r['legacy']['leaks']):>6}/{len(r['new']['leaks']):<7} {r['source']:>8} "
+              f"{'ok' if r['fields_ok'] else 'MISS':>6} {r['requirements']:>4}")
+    for r in report:
+        if r["new"]["leaks"]:
+            print(f"  {r['page']}: leaked {r['new']['leaks']}")
+    total_old = sum(r["legacy_us"] for r in report)
+    total_new = sum(r["new_us"] for r in report)
+    print(f"\ntotal: legacy {total_old:.0f} us, new {total_new:.0f} us ({total_old / total_new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Micro-benchmarks for the service's CPU hot paths, on the synthetic corpus:
+
+    tfidf_match            calculate_match_score, one resume vs one job (job artifacts cached)
+    tfidf_batch_<n>        calculate_batch_match_scores, one job vs n resumes
+    tfidf_matrix_<n>       tfidf_from_counts over n+1 pre-tokenized documents
+    keyword_gaps_<n>       keyword_gaps for one job vs n resumes
+    pdf_extract_<p>p       extract_text_from_pdf on a p-page resume PDF
+    domain_infer           infer_domain from titles and skills (fast path)
+    domain_infer_text      infer_domain on raw resume text (LLM-failure fallback)
+
+Each benchmark times --repeat single calls (after a warm-up) and reports
+p50/p95/p99 as JSON; compare two reports with benchmarks/compare.py. Run from
+ai-service-python:
+
+    python benchmarks/bench_micro.py [--repeat 200] [--batch-size 100] [--only tfidf,pdf] [--out micro.json]
+"""
+import argparse
+import atexit
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the job artifact cache off the real database and the embedding model unloaded
+_WORKDIR = tempfile.mkdtemp(prefix="bench-micro-")
+atexit.register(shutil.rmtree, _WORKDIR, True)
+os.environ.setdefault("JOB_ARTIFACT_CACHE_PATH", os.path.join(_WORKDIR, "job_artifacts.sqlite"))
+os.environ.setdefault("EMBEDDINGS_ENABLED", "false")
+os.environ.setdefault("GROQ_API_KEY", "bench")
+
+from benchmarks.common import metadata, print_table, summarize, write_report  # noqa: E402
+from benchmarks.corpus import build_corpus, make_pdf, make_resume  # noqa: E402
+from app.services.matcher import (  # noqa: E402
+    calculate_batch_match_scores, calculate_match_score, keyword_gaps, tfidf_from_counts,
+)
+from app.services.parser import extract_text_from_pdf  # noqa: E402
+from app.services.taxonomy import infer_domain  # noqa: E402
+from app.services.text import tokenize  # noqa: E402
+
+PDF_PAGES = (1, 3, 10)
+
+
+def time_calls(fn, inputs: list, repeat: int, warmup: int = 3) -> list:
+    """Calls fn on inputs round-robin; returns the duration of each timed call in seconds."""
+    for i in range(min(warmup, repeat)):
+        fn(inputs[i % len(inputs)])
+    samples = []
+    for i in range(repeat):
+        arg = inputs[i % len(inputs)]
+        start = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def benchmarks(corpus: dict, batch_size: int, seed: int) -> dict:
+    """name -> (fn, inputs, repeat scale); the scale trims the slow cases."""
+    rng = random.Random(seed)
+    resumes = [r["text"] for r in corpus["resumes"]]
+    jobs = [j["text"] for j in corpus["jobs"]]
+    batch = [{"id": r["id"], "text": r["text"]} for r in corpus["resumes"][:batch_size]]
+    pairs = [(rng.choice(resumes), rng.choice(jobs)) for _ in range(50)]
+
+    resume_counts = [tokenize(text) for text in resumes[:batch_size]]
+    matrices = []
+    for job in jobs[:5]:
+        matrix, features = tfidf_from_counts([tokenize(job)] + resume_counts)
+        matrices.append((matrix[0], matrix[1:], features))
+
+    pdf_rng = random.Random(seed)
+    pdfs = {pages: [make_pdf(make_resume(pdf_rng, pages)["text"]) for _ in range(5)] for pages in PDF_PAGES}
+
+    parsed = [(["Senior " + r["title"], r["title"] + " Intern"], r["skills"]) for r in corpus["resumes"]]
+
+    n = batch_size
+    cases = {
+        "tfidf_match": (lambda pair: calculate_match_score(*pair), pairs, 1),
+        f"tfidf_batch_{n}": (lambda job: calculate_batch_match_scores(job, batch, top_k=10), jobs, 0.25),
+        f"tfidf_matrix_{n}": (lambda job_counts: tfidf_from_counts([job_counts] + resume_counts),
+                              [tokenize(job) for job in jobs], 0.25),
+        f"keyword_gaps_{n}": (lambda m: keyword_gaps(*m), matrices, 0.5),
+        "domain_infer": (lambda p: infer_domain(*p), parsed, 5),
+        "domain_infer_text": (lambda text: infer_domain([], [text]), resumes, 1),
+    }
+    for pages, data in pdfs.items():
+        cases[f"pdf_extract_{pages}p"] = (lambda d: extract_text_from_pdf(io.BytesIO(d)), data, 0.5 / pages ** 0.5)
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="timed calls for the fast benchmarks")
+    parser.add_argument("--batch-size", type=int, default=100, help="resumes per batch / matrix / gaps call")
+    parser.add_argument("--only", default="", help="comma-separated name prefixes to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here (default: print a table and the JSON)")
+    args = parser.parse_args()
+
+    corpus = build_corpus(n_resumes=max(args.batch_size, 50), n_jobs=20, seed=args.seed, pdf=False)
+    prefixes = [p.strip() for p in args.only.split(",") if p.strip()]
+    results = []
+    for name, (fn, inputs, scale) in benchmarks(corpus, args.batch_size, args.seed).items():
+        if prefixes and not any(name.startswith(p) for p in prefixes):
+            continue
+        samples = time_calls(fn, inputs, max(5, int(args.repeat * scale)))
+        row = {"name": name, **summarize(samples)}
+        row["ops_per_s"] = round(1000 / row["mean_ms"], 1) if row["mean_ms"] else None
+        results.append(row)
+        print(f"{name}: p50 {row['p50_ms']:.3f} ms", file=sys.stderr)
+
+    report = {
+        "suite": "micro",
+        "meta": metadata(repeat=args.repeat, batch_size=args.batch_size, seed=args.seed),
+        "results": results,
+    }
+    if not args.out:
+        print_table(results, ("ops_per_s",))
+        print()
+    write_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
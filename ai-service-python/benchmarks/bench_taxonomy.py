@@ -0,0 +1,91 @@
+"""
+Micro-benchmark for domain inference and skill selection on long resume texts.
+
+Compares the compiled single-pass matcher in app.services.taxonomy with the
+previous substring scan (kept here as the baseline). Run from ai-service-python:
+
+    python benchmarks/bench_taxonomy.py [--words 5000] [--repeat 200]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.taxonomy import (  # noqa: E402
+    DOMAIN_KEYWORDS, SEARCH_PRIORITY_SKILLS, SKILLS, infer_domain, select_best_skill,
+)
+
+FILLER = ("built designed led team customers reliable scalable platform delivered improved "
+          "performance reduced costs stakeholders requirements product features using with "
+          "for and the of in on").split()
+
+
+def legacy_infer_domain(titles: list, skills: list) -> str:
+    combined = " ".join(titles + skills).lower()
+    for keywords, domain in DOMAIN_KEYWORDS:
+        if any(kw in combined for kw in keywords):
+            return domain
+    return "Software Developer"
+
+
+def legacy_select_best_skill(skills: list) -> str:
+    for s in skills:
+        if s.lower().replace(" ", "") in SEARCH_PRIORITY_SKILLS:
+            return s
+    for s in skills:
+        if len(s) > 2:
+            return s
+    return skills[0] if skills else ""
+
+
+def make_resume(n_words: int, seed: int = 0, skill_rate: float = 0.05) -> str:
+    rng = random.Random(seed)
+    words = [rng.choice(SKILLS) if rng.random() < skill_rate else rng.choice(FILLER) for _ in range(n_words)]
+    return " ".join(words)
+
+
+def bench(label: str, fn, repeat: int) -> float:
+    seconds = min(timeit.repeat(fn, number=repeat, repeat=3)) / repeat
+    print(f"  {label:<40} {seconds * 1e6:>10.1f} us/call")
+    return seconds
+
+
+def compare(name: str, titles: list, skills: list, text: str, repeat: int):
+    """Fast path (parsed titles/skills) and slow-path fallback (raw resume text)."""
+    print(f"{name}")
+    print(f"  domains: legacy={legacy_infer_domain(titles, skills)!r} "
+          f"scored={infer_domain(titles, skills)!r}; fallback legacy="
+          f"{legacy_infer_domain([], text.lower().split())!r} scored={infer_domain([], [text])!r}")
+    bench("fast path, legacy", lambda: legacy_infer_domain(titles, skills), repeat * 20)
+    bench("fast path, scored", lambda: infer_domain(titles, skills), repeat * 20)
+    # The old fallback lowercased and split the resume before scanning
+    bench("fallback, legacy (lower + split + scan)", lambda: legacy_infer_domain([], text.lower().split()), repeat)
+    bench("fallback, scored", lambda: infer_domain([], [text]), repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=5000, help="words per synthetic resume")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rich = make_resume(args.words)
+    skills = [s for s in SKILLS if s.lower() in rich.lower()][:12] or ["Python"]
+    titles = ["Senior Software Engineer", "Backend Developer Intern"]
+    print(f"synthetic resume: {args.words} words\n")
+
+    compare("keyword-rich resume (legacy stops at the first hit)", titles, skills, rich, args.repeat)
+    # No domain keywords at all: the legacy scan has to try every keyword list
+    poor = make_resume(args.words, skill_rate=0.0)
+    compare("keyword-free resume (legacy worst case)", ["Accountant"], ["Excel", "Tally"], poor, args.repeat)
+
+    print("select_best_skill")
+    bench("legacy (list scan)", lambda: legacy_select_best_skill(skills), args.repeat * 50)
+    bench("set lookup", lambda: select_best_skill(skills), args.repeat * 50)
+
+
+if __name__ == "__main__":
+    main()
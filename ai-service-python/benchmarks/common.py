@@ -0,0 +1,84 @@
+"""
+Shared helpers for the benchmark scripts: latency summaries, run metadata and
+the JSON report format that benchmarks/compare.py reads.
+
+A report is {"suite", "meta", "results": [{"name", "n", "p50_ms", "p95_ms",
+"p99_ms", "mean_ms", ...}]}; result names are stable across commits.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))]
+
+
+def summarize(samples: list) -> dict:
+    """Latency summary in ms for a list of durations in seconds."""
+    if not samples:
+        return {"n": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+    ms = lambda seconds: round(seconds * 1000, 4)  # noqa: E731
+    return {
+        "n": len(ordered),
+        "mean_ms": ms(statistics.mean(ordered)),
+        "p50_ms": ms(percentile(ordered, 0.50)),
+        "p95_ms": ms(percentile(ordered, 0.95)),
+        "p99_ms": ms(percentile(ordered, 0.99)),
+        "max_ms": ms(ordered[-1]),
+    }
+
+
+def git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {
+        "commit": git("rev-parse", "--short", "HEAD") or None,
+        "dirty": bool(git("status", "--porcelain", "--", ".")),
+    }
+
+
+def metadata(**params) -> dict:
+    """Where and how a run was made, so reports from different commits can be told apart."""
+    return {
+        **git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "params": params,
+    }
+
+
+def write_report(report: dict, out: str = None):
+    """Writes the report as JSON to `out`, or to stdout when `out` is None or "-"."""
+    text = json.dumps(report, indent=2)
+    if out and out != "-":
+        with open(out, "w") as f:
+            f.write(text + "\n")
+        print(f"wrote {out}", file=sys.stderr)
+    else:
+        print(text)
+
+
+def print_table(results: list, extra: tuple = ()):
+    """Human-readable summary of a results list."""
+    columns = ("n", "p50_ms", "p95_ms", "p99_ms") + tuple(extra)
+    print(f"{'name':<36}" + "".join(f"{c:>12}" for c in columns))
+    for row in results:
+        cells = []
+        for c in columns:
+            value = row.get(c)
+            cells.append(f"{'-' if value is None else (f'{value:.3f}' if isinstance(value, float) else value):>12}")
+        print(f"{row['name']:<36}" + "".join(cells))
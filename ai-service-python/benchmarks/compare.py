@@ -0,0 +1,97 @@
+"""
+Compares two benchmark reports (from bench_micro.py or bench_endpoints.py),
+matching results by name, and prints the p50/p95/p99 change of each. Exits 1
+when any compared percentile is slower than the baseline by more than
+--threshold (a fraction), so it can gate CI. Run from ai-service-python:
+
+    python benchmarks/compare.py BASELINE.json CANDIDATE.json [--threshold 0.10] [--metric p50_ms,p95_ms]
+                                 [--min-ms 0.05] [--json]
+"""
+import argparse
+import json
+import sys
+
+PERCENTILES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        report = json.load(f)
+    if "results" not in report:
+        sys.exit(f"{path} is not a benchmark report (no 'results')")
+    return report
+
+
+def compare(baseline: dict, candidate: dict, metrics: tuple, threshold: float, min_ms: float) -> list:
+    """
+    One row per result name present in either report. `change` is candidate /
+    baseline - 1 per metric; a regression is a change above `threshold` where the
+    candidate is also at least `min_ms` slower, so sub-timer-resolution noise on
+    tiny benchmarks is not flagged.
+    """
+    before = {row["name"]: row for row in baseline["results"]}
+    after = {row["name"]: row for row in candidate["results"]}
+    rows = []
+    for name in list(before) + [n for n in after if n not in before]:
+        old, new = before.get(name), after.get(name)
+        row = {"name": name, "status": "ok", "changes": {}}
+        if old is None or new is None:
+            row["status"] = "added" if old is None else "removed"
+            rows.append(row)
+            continue
+        for metric in metrics:
+            a, b = old.get(metric), new.get(metric)
+            if not a or b is None:
+                continue
+            change = b / a - 1
+            row["changes"][metric] = {"baseline": a, "candidate": b, "change": round(change, 4)}
+            if change > threshold and b - a >= min_ms:
+                row["status"] = "regression"
+            elif change < -threshold and row["status"] == "ok":
+                row["status"] = "improved"
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, as a fraction")
+    parser.add_argument("--metric", default="p50_ms,p95_ms", help=f"comma-separated subset of {', '.join(PERCENTILES)}")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    parser.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    args = parser.parse_args()
+
+    metrics = tuple(m.strip() for m in args.metric.split(",") if m.strip())
+    unknown = set(metrics) - set(PERCENTILES)
+    if unknown:
+        sys.exit(f"unknown metrics: {', '.join(sorted(unknown))}")
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    if baseline.get("suite") != candidate.get("suite"):
+        print(f"warning: comparing suite {baseline.get('suite')!r} with {candidate.get('suite')!r}", file=sys.stderr)
+    rows = compare(baseline, candidate, metrics, args.threshold, args.min_ms)
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+
+    if args.json:
+        print(json.dumps({"baseline": baseline.get("meta"), "candidate": candidate.get("meta"),
+                          "threshold": args.threshold, "rows": rows, "regressions": regressions}, indent=2))
+    else:
+        revision = lambda report: (report.get("meta") or {}).get("commit") or "?"  # noqa: E731
+        print(f"{args.baseline} ({revision(baseline)}) -> {args.candidate} ({revision(candidate)})\n")
+        print(f"{'name':<28}" + "".join(f"{m:>26}" for m in metrics) + f"{'status':>12}")
+        for row in rows:
+            cells = []
+            for metric in metrics:
+                c = row["changes"].get(metric)
+                cells.append(f"{c['baseline']:>9.2f} -> {c['candidate']:>9.2f} {c['change']:>+6.0%}" if c else "-")
+            print(f"{row['name']:<28}" + "".join(f"{cell:>26}" for cell in cells) + f"{row['status']:>12}")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
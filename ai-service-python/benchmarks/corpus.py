@@ -0,0 +1,191 @@
+"""
+Synthetic, reproducible resume and job corpus for the benchmarks.
+
+Resumes are sectioned plain text (summary, experience, skills, projects,
+education) drawn from the skill taxonomy, and are also rendered to PDF with a
+minimal built-in writer, so no PDF library is needed to produce them. Job
+descriptions use the same vocabulary, so match scores cover the full range. The
+same seed always gives the same corpus.
+
+Written to disk when run directly, from ai-service-python:
+
+    python benchmarks/corpus.py --out /tmp/corpus [--resumes 50] [--jobs 20] [--pages 2] [--seed 0]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import textwrap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.taxonomy import SKILLS  # noqa: E402
+
+FIRST_NAMES = ("Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Sneha", "Arjun", "Kavya", "Rahul", "Meera",
+               "Alex", "Sam", "Jordan", "Taylor", "Chris", "Morgan")
+LAST_NAMES = ("Sharma", "Verma", "Iyer", "Reddy", "Gupta", "Nair", "Kapoor", "Singh", "Das", "Mehta",
+              "Smith", "Lee", "Garcia", "Chen")
+TITLES = ("Software Engineer", "Backend Developer", "Frontend Developer", "Full Stack Developer",
+          "Data Scientist", "Data Engineer", "DevOps Engineer", "Machine Learning Engineer",
+          "Mobile Developer", "QA Engineer")
+COMPANIES = ("Infosys", "TCS", "Wipro", "Flipkart", "Swiggy", "Zomato", "Razorpay", "Freshworks",
+             "Acme Corp", "Globex", "Initech", "Umbrella Labs")
+SCHOOLS = ("IIT Delhi", "IIT Bombay", "NIT Trichy", "BITS Pilani", "VIT Vellore", "Delhi University")
+DEGREES = ("B.Tech in Computer Science", "B.E. in Information Technology", "M.Tech in Data Science",
+           "MCA", "B.Sc in Mathematics")
+VERBS = ("Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Shipped", "Scaled", "Maintained")
+OBJECTS = ("payment APIs", "a recommendation service", "internal dashboards", "the CI/CD pipeline",
+           "data ingestion jobs", "the mobile checkout flow", "search ranking", "a monitoring stack",
+           "customer onboarding", "batch reporting")
+OUTCOMES = ("cutting latency by {n}%", "serving {n}k daily users", "reducing costs by {n}%",
+            "improving conversion by {n}%", "handling {n}k requests per minute")
+
+# Characters per PDF line and lines per page of the built-in writer
+PDF_LINE_CHARS = 95
+PDF_PAGE_LINES = 50
+
+
+def _bullet(rng: random.Random, skills: list) -> str:
+    outcome = rng.choice(OUTCOMES).format(n=rng.randint(10, 90))
+    first, second = rng.sample(skills, 2)
+    return f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {first} and {second}, {outcome}."
+
+
+def make_resume(rng: random.Random, pages: int = 1) -> dict:
+    """One resume as {"name", "title", "years", "skills", "text"}; `pages` scales the experience section."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    title = rng.choice(TITLES)
+    skills = rng.sample(SKILLS, rng.randint(8, 16))
+    jobs = max(1, min(6, pages * 2))
+    years = [rng.randint(1, 4) for _ in range(jobs)]
+
+    lines = [name, f"{name.lower().replace(' ', '.')}@example.com | +91 98{rng.randint(10000000, 99999999)}", ""]
+    lines += ["SUMMARY", f"{title} with {sum(years)} years of experience in {', '.join(skills[:3])}.", ""]
+    lines.append("EXPERIENCE")
+    end = 2025
+    for n_years in years:
+        lines.append(f"{title} | {rng.choice(COMPANIES)} | {end - n_years} - {end}")
+        lines += [_bullet(rng, skills) for _ in range(rng.randint(3, 4) * pages)]
+        lines.append("")
+        end -= n_years
+    lines += ["SKILLS", ", ".join(skills), ""]
+    lines.append("PROJECTS")
+    for _ in range(2):
+        lines.append(f"{rng.choice(OBJECTS).capitalize()} ({', '.join(rng.sample(skills, 2))})")
+        lines.append(_bullet(rng, skills))
+    lines += ["", "EDUCATION", f"{rng.choice(DEGREES)} | {rng.choice(SCHOOLS)} | {end}"]
+    return {"name": name, "title": title, "years": sum(years), "skills": skills, "text": "\n".join(lines)}
+
+
+def make_job(rng: random.Random) -> dict:
+    """One job posting as {"title", "company", "skills", "text"}."""
+    title = rng.choice(TITLES)
+    company = rng.choice(COMPANIES)
+    skills = rng.sample(SKILLS, rng.randint(5, 10))
+    lines = [
+        f"{title} at {company}",
+        f"We are hiring a {title} to join our team in Bengaluru (hybrid).",
+        "",
+        "Responsibilities:",
+        *(_bullet(rng, skills) for _ in range(5)),
+        "",
+        "Requirements:",
+        f"- {rng.randint(1, 8)}+ years of professional experience.",
+        *(f"- Strong experience with {skill}." for skill in skills),
+        "",
+        "Benefits: health insurance, learning budget, flexible hours.",
+    ]
+    return {"title": title, "company": company, "skills": skills, "text": "\n".join(lines)}
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(text: str) -> bytes:
+    """Renders text to a minimal PDF (Helvetica, wrapped lines, as many pages as needed)."""
+    lines = [wrapped for line in text.split("\n") for wrapped in (textwrap.wrap(line, PDF_LINE_CHARS) or [""])]
+    pages = [lines[i:i + PDF_PAGE_LINES] for i in range(0, len(lines), PDF_PAGE_LINES)] or [[""]]
+
+    # Objects: 1 catalog, 2 page tree, then (page, content) pairs, then the font
+    font_id = 3 + 2 * len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(len(pages)))}] "
+        f"/Count {len(pages)} >>".encode(),
+    ]
+    for i, page in enumerate(pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> >>".encode())
+        ops = ["BT /F1 10 Tf 14 TL 50 750 Td"] + [f"({_pdf_escape(line)}) Tj T*" for line in page] + ["ET"]
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def build_corpus(n_resumes: int = 50, n_jobs: int = 20, pages: int = 1, seed: int = 0, pdf: bool = True) -> dict:
+    """Returns {"resumes": [{"id", "text", "pdf", ...}], "jobs": [{"id", "text", ...}]}."""
+    rng = random.Random(seed)
+    resumes = []
+    for i in range(n_resumes):
+        resume = make_resume(rng, pages)
+        resume["id"] = f"resume-{i:04d}"
+        resume["pdf"] = make_pdf(resume["text"]) if pdf else None
+        resumes.append(resume)
+    jobs = []
+    for i in range(n_jobs):
+        job = make_job(rng)
+        job["id"] = f"job-{i:04d}"
+        jobs.append(job)
+    return {"resumes": resumes, "jobs": jobs}
+
+
+def write_corpus(corpus: dict, out: str) -> dict:
+    """Writes resumes/<id>.txt and .pdf, jobs/<id>.txt and manifest.json under `out`."""
+    os.makedirs(os.path.join(out, "resumes"), exist_ok=True)
+    os.makedirs(os.path.join(out, "jobs"), exist_ok=True)
+    manifest = {"resumes": [], "jobs": []}
+    for resume in corpus["resumes"]:
+        base = os.path.join(out, "resumes", resume["id"])
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(resume["text"])
+        if resume["pdf"]:
+            with open(base + ".pdf", "wb") as f:
+                f.write(resume["pdf"])
+        manifest["resumes"].append({k: v for k, v in resume.items() if k not in ("text", "pdf")})
+    for job in corpus["jobs"]:
+        with open(os.path.join(out, "jobs", job["id"] + ".txt"), "w", encoding="utf-8") as f:
+            f.write(job["text"])
+        manifest["jobs"].append({k: v for k, v in job.items() if k != "text"})
+    with open(os.path.join(out, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=1, help="approximate PDF pages per resume")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    manifest = write_corpus(build_corpus(args.resumes, args.jobs, args.pages, args.seed), args.out)
+    print(f"wrote {len(manifest['resumes'])} resumes and {len(manifest['jobs'])} jobs to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Cold-start import profile of app.main.
+
+Imports the app in fresh interpreters with `python -X importtime`, reports the
+median total and the slowest modules, and exits non-zero when the median goes
+over the budget or when a dependency that should load lazily (see LAZY_MODULES)
+is imported at startup. Run from ai-service-python, e.g. in CI:
+
+    python benchmarks/import_time.py [--runs 5] [--budget-ms 1500] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages that only specific routes need; importing one at startup is a regression
+LAZY_MODULES = ("sklearn", "scipy", "pypdf", "bs4", "lxml", "groq", "google", "requests",
+                "sentence_transformers", "fastembed", "uvicorn")
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+
+def profile_once(module: str) -> list:
+    """Returns [(depth, self_us, cumulative_us, name)] for one fresh import of `module`."""
+    env = dict(os.environ, GROQ_API_KEY=os.getenv("GROQ_API_KEY", "import-profile"), WARMUP_ON_IMPORT="false")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.exit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    runs = [profile_once(args.module) for _ in range(max(args.runs, 1))]
+    totals_ms = [sum(r[1] for r in rows) / 1000 for rows in runs]
+    median_ms = statistics.median(totals_ms)
+
+    # Slowest packages imported directly by the app's modules, from the median run
+    rows = runs[totals_ms.index(sorted(totals_ms)[len(totals_ms) // 2])]
+    packages = {}
+    for depth, _, cumulative_us, name in rows:
+        if depth <= 2:
+            packages[name] = max(packages.get(name, 0), cumulative_us)
+    slowest = sorted(packages.items(), key=lambda item: -item[1])[:args.top]
+
+    lazy = sorted({name for *_, name in rows if name.split(".")[0] in LAZY_MODULES})
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"median import time {median_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if lazy:
+        failures.append(f"imported at startup: {', '.join(sorted({n.split('.')[0] for n in lazy}))}")
+
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "runs_ms": [round(t, 1) for t in totals_ms],
+            "median_ms": round(median_ms, 1),
+            "budget_ms": args.budget_ms,
+            "slowest": [{"module": name, "cumulative_ms": round(us / 1000, 1)} for name, us in slowest],
+            "lazy_modules_imported": lazy,
+            "failures": failures,
+        }, indent=2))
+    else:
+        print(f"import {args.module}: median {median_ms:.0f} ms over {len(totals_ms)} runs "
+              f"(budget {args.budget_ms:.0f} ms; runs {', '.join(f'{t:.0f}' for t in totals_ms)})\n")
+        print(f"{'module':<40} {'cumulative ms':>14}")
+        for name, us in slowest:
+            print(f"{name:<40} {us / 1000:>14.1f}")
+        for failure in failures:
+            print(f"\nFAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Load test for the AI service under mixed traffic.
+
+Starts the service with uvicorn (or targets --url), plus a local job-page server
+with a fixed response latency, then runs closed-loop clients issuing a weighted
+mix of requests for a fixed duration:
+
+    match    POST /match-jobs         one resume vs one job (CPU)
+    batch    POST /match-jobs/batch   one job vs --batch-size resumes (CPU)
+    scrape   POST /scrape-job         a fresh URL on the page server (network + parse)
+
+Reports requests per second and p50/p95/p99 latency per route. To compare two
+revisions, check the older one out with `git worktree add` and pass its
+ai-service-python directory as --app-dir. Run from ai-service-python:
+
+    python benchmarks/load_test.py [--concurrency 64] [--duration 15] [--mix match=4,batch=1,scrape=3]
+                                   [--page-latency-ms 200] [--app-dir DIR | --url URL] [--json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_FIXTURE = os.path.join(ROOT, "benchmarks", "fixtures", "job_pages", "greenhouse_jsonld.html")
+
+WORDS = ("python java javascript typescript react node fastapi django flask aws azure gcp docker kubernetes "
+         "terraform sql postgres mongodb redis kafka spark airflow pandas numpy pytorch tensorflow nlp llm "
+         "microservices rest graphql ci cd testing agile leadership mentoring design architecture analytics "
+         "dashboards tableau excel communication stakeholders product backend frontend mobile android ios").split()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def synthetic_text(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words))
+
+
+def start_page_server(latency_s: float) -> ThreadingHTTPServer:
+    """Serves the job page fixture at any path after `latency_s` seconds."""
+    with open(PAGE_FIXTURE, "rb") as f:
+        page = f.read()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency_s)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_service(app_dir: str, port: int, workdir: str, concurrency: int, extra_env: dict = None,
+                  stdout=None) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        GROQ_API_KEY=os.getenv("GROQ_API_KEY", "load-test"),
+        EMBEDDINGS_ENABLED="false",
+        LLM_CACHE_PATH=os.path.join(workdir, "llm.sqlite"),
+        JOB_ARTIFACT_CACHE_PATH=os.path.join(workdir, "job_artifacts.sqlite"),
+        SCRAPE_CACHE_PATH=os.path.join(workdir, "pages.sqlite"),
+        JOB_QUEUE_PATH=os.path.join(workdir, "queue.sqlite"),
+        RESUME_INDEX_DIR=os.path.join(workdir, "resume_index"),
+        # Every scrape goes to the one local page server
+        SCRAPE_PER_HOST_LIMIT=str(concurrency),
+    )
+    env.update(extra_env or {})
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=stdout,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    sys.exit("service did not start")
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    unknown = set(weights) - {"match", "batch", "scrape"}
+    if unknown:
+        sys.exit(f"unknown routes in --mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+async def run_load(base_url: str, page_url: str, mix: dict, concurrency: int, duration: float,
+                   batch_size: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    # Payload text is generated up front so the client spends its CPU on sending requests
+    jobs = [synthetic_text(rng, 120) for _ in range(20)]
+    resumes = [synthetic_text(rng, 400) for _ in range(500)]
+    routes, weights = zip(*mix.items())
+    latencies = {route: [] for route in routes}
+    errors = {route: 0 for route in routes}
+    counter = iter(range(10 ** 9))
+
+    def build(route: str):
+        if route == "match":
+            return "/match-jobs", {"resume_text": rng.choice(resumes), "job_description": rng.choice(jobs)}
+        if route == "batch":
+            batch = [{"id": str(i), "resume_text": text} for i, text in enumerate(rng.sample(resumes, batch_size))]
+            return "/match-jobs/batch", {"job_description": rng.choice(jobs), "resumes": batch, "top_k": 10}
+        return "/scrape-job", {"url": f"{page_url}/job/{next(counter)}-{seed}"}
+
+    async def worker(client: httpx.AsyncClient, stop_at: float):
+        while time.monotonic() < stop_at:
+            route = rng.choices(routes, weights)[0]
+            path, body = build(route)
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies[route].append(time.perf_counter() - start)
+            else:
+                errors[route] += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        start = time.monotonic()
+        await asyncio.gather(*(worker(client, start + duration) for _ in range(concurrency)))
+        elapsed = time.monotonic() - start
+
+    def summary(samples: list, failed: int) -> dict:
+        ordered = sorted(samples)
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1) if ordered else None
+        return {"requests": len(samples), "errors": failed, "rps": round(len(samples) / elapsed, 1),
+                "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99),
+                "mean_ms": round(statistics.mean(samples) * 1000, 1) if samples else None}
+
+    all_samples = [s for samples in latencies.values() for s in samples]
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 1),
+        "total": summary(all_samples, sum(errors.values())),
+        "routes": {route: summary(latencies[route], errors[route]) for route in routes},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--mix", default="match=4,batch=1,scrape=3")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--page-latency-ms", type=float, default=200)
+    parser.add_argument("--app-dir", default=ROOT, help="ai-service-python directory to serve")
+    parser.add_argument("--url", help="target a running service instead of starting one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    page_server = start_page_server(args.page_latency_ms / 1000)
+    page_url = f"http://127.0.0.1:{page_server.server_address[1]}"
+    service = None
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            if args.url:
+                base_url = args.url.rstrip("/")
+            else:
+                port = free_port()
+                service = start_service(args.app_dir, port, workdir, args.concurrency)
+                base_url = f"http://127.0.0.1:{port}"
+            report = asyncio.run(run_load(base_url, page_url, parse_mix(args.mix), args.concurrency,
+                                          args.duration, args.batch_size, args.seed))
+        finally:
+            if service:
+                service.terminate()
+                service.wait()
+            page_server.shutdown()
+
+    report["app_dir"] = None if args.url else os.path.abspath(args.app_dir)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{base_url}: concurrency {report['concurrency']}, {report['duration_s']} s, "
+          f"page latency {args.page_latency_ms:.0f} ms\n")
+    print(f"{'route':<8} {'requests':>9} {'errors':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, row in list(report["routes"].items()) + [("total", report["total"])]:
+        print(f"{name:<8} {row['requests']:>9} {row['errors']:>7} {row['rps']:>8} "
+              f"{row['p50_ms'] or '-':>9} {row['p95_ms'] or '-':>9} {row['p99_ms'] or '-':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Local stand-ins for the service's upstream APIs, for offline benchmarks.
+
+One HTTP server answers for Groq (OpenAI-compatible chat completions, plain and
+streamed), Gemini (generateContent / streamGenerateContent), SerpApi, Adzuna,
+The Muse and Remotive. It replays the canned responses in
+benchmarks/fixtures/stubs after a configurable per-provider latency. Those
+responses are written in each API's response format. `StubServer.env()` gives
+the base-URL and key variables that point the service at it.
+
+Standalone, e.g. to run a dev server against it:
+
+    python benchmarks/stubs.py [--port 9100] [--latency groq=0.8,serpapi=0.3] [--default-latency 0.1]
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "stubs")
+
+PROVIDERS = ("groq", "gemini", "serpapi", "adzuna", "muse", "remotive")
+
+# Job API paths (as the service requests them) -> provider
+JOB_API_PATHS = {
+    "/search.json": "serpapi",
+    "/v1/api/jobs/in/search/1": "adzuna",
+    "/api/public/jobs": "muse",
+    "/api/remote-jobs": "remotive",
+}
+
+_RESUME_ID = re.compile(r"=== RESUME id=(\S+) ===")
+
+
+def _load(name: str):
+    with open(os.path.join(FIXTURES, f"{name}.json")) as f:
+        return json.load(f)
+
+
+def parse_latency(spec: str) -> dict:
+    """"groq=0.8,serpapi=0.3" -> {"groq": 0.8, "serpapi": 0.3} (seconds)."""
+    latency = {}
+    for part in filter(None, (spec or "").split(",")):
+        name, _, seconds = part.partition("=")
+        if name.strip() not in PROVIDERS:
+            raise ValueError(f"unknown provider {name!r}; expected one of {', '.join(PROVIDERS)}")
+        latency[name.strip()] = float(seconds)
+    return latency
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # The service cancels lower-priority job searches (closing the connection) once it has results
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """
+    Threaded stub for all upstream providers. Each request waits the provider's
+    latency (plus up to `jitter` x latency at random) before answering; `calls`
+    counts requests per provider.
+    """
+
+    def __init__(self, latency: dict = None, default_latency: float = 0.0, jitter: float = 0.0,
+                 port: int = 0, seed: int = 0):
+        self.latency = {name: default_latency for name in PROVIDERS}
+        self.latency.update(latency or {})
+        self.jitter = jitter
+        self.calls = {name: 0 for name in PROVIDERS}
+        self._llm = _load("llm")["responses"]
+        self._jobs = {name: _load(name) for name in JOB_API_PATHS.values()}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", port), self._handler())
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def env(self) -> dict:
+        """Environment variables that route the service's upstream calls here."""
+        return {
+            "GROQ_API_KEY": "stub", "GROQ_BASE_URL": self.url,
+            "GEMINI_API_KEY": "stub", "GEMINI_BASE_URL": self.url,
+            "SERPAPI_KEY": "stub", "SERPAPI_BASE_URL": self.url,
+            "ADZUNA_APP_ID": "stub", "ADZUNA_API_KEY": "stub", "ADZUNA_BASE_URL": self.url,
+            "MUSE_BASE_URL": self.url,
+            "REMOTIVE_BASE_URL": self.url,
+        }
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _wait(self, provider: str):
+        with self._lock:
+            self.calls[provider] += 1
+            delay = self.latency[provider] * (1 + self.jitter * self._rng.random())
+        time.sleep(delay)
+
+    def llm_output(self, prompt: str) -> str:
+        """The replayed model output for a prompt."""
+        for response in self._llm:
+            if response["match"] in prompt:
+                content = response["content"]
+                if response.get("batch"):
+                    content = [{"id": resume_id, **content} for resume_id in _RESUME_ID.findall(prompt)]
+                return json.dumps(content)
+        return "{}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_events(self, events: list, done: str = None):
+                body = "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+                if done:
+                    body += f"data: {done}\n\n"
+                self._send(200, body.encode(), "text/event-stream")
+
+            def do_GET(self):
+                provider = JOB_API_PATHS.get(urlsplit(self.path).path)
+                if provider is None:
+                    return self._send(404, b'{"error": "not found"}')
+                stub._wait(provider)
+                self._send(200, json.dumps(stub._jobs[provider]).encode())
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                path = urlsplit(self.path).path
+                if path.endswith("/chat/completions"):
+                    stub._wait("groq")
+                    return self._groq(body)
+                if path.startswith("/v1beta/models/"):
+                    stub._wait("gemini")
+                    return self._gemini(body, streaming=path.endswith(":streamGenerateContent"))
+                self._send(404, b'{"error": "not found"}')
+
+            def _groq(self, body: dict):
+                output = stub.llm_output(body["messages"][-1]["content"])
+                envelope = {"id": "chatcmpl-stub", "created": int(time.time()), "model": body.get("model", "")}
+                if not body.get("stream"):
+                    return self._send(200, json.dumps({
+                        **envelope, "object": "chat.completion",
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": output}}],
+                        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                    }).encode())
+                chunks = [output[i:i + 64] for i in range(0, len(output), 64)]
+                self._send_events([
+                    {**envelope, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {"content": chunk}, "finish_reason": None}]}
+                    for chunk in chunks
+                ], done="[DONE]")
+
+            def _gemini(self, body: dict, streaming: bool):
+                output = stub.llm_output(body["contents"][-1]["parts"][0]["text"])
+
+                def candidate(text):
+                    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                                            "finishReason": "STOP"}]}
+
+                if not streaming:
+                    return self._send(200, json.dumps(candidate(output)).encode())
+                self._send_events([candidate(output[i:i + 64]) for i in range(0, len(output), 64)])
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default="", help="per provider, e.g. groq=0.8,serpapi=0.3 (seconds)")
+    parser.add_argument("--default-latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, as a fraction")
+    args = parser.parse_args()
+
+    stub = StubServer(parse_latency(args.latency), args.default_latency, args.jitter, port=args.port).start()
+    print(f"stubs listening on {stub.url}; point the service at them with:\n")
+    for name, value in stub.env().items():
+        print(f"export {name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
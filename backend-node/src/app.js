@@ -3,10 +3,14 @@ const express = require('express');
 const cors = require('cors');
 const helmet = require('helmet');
 const morgan = require('morgan');
+const { requestId } = require('./middlewares/requestId');
 
 const app = express();
 
 // Middleware
+// 0. Request id first, so CORS failures and every AI-service call carry it
+app.use(requestId);
+
 // 1. CORS MUST BE FIRST for Cloud/Lambda preflights
 const allowedOrigins = [
     'http://resume-match-v2-web-937566678613.s3-website.eu-north-1.amazonaws.com',
@@ -29,7 +33,8 @@ app.use(cors({
     },
     credentials: true,
     methods: ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-    allowedHeaders: ['Content-Type', 'Authorization']
+    allowedHeaders: ['Content-Type', 'Authorization', 'X-Request-ID'],
+    exposedHeaders: ['X-Request-ID']
 }));
 
 // 2. Body Parser
@@ -41,7 +46,8 @@ app.use(helmet({
     crossOriginResourcePolicy: { policy: "cross-origin" }
 }));
 
-app.use(morgan('dev'));
+morgan.token('id', (req) => req.id);
+app.use(morgan(':id :method :url :status :response-time ms'));
 
 // Basic Route
 app.get('/', (req, res) => {
@@ -22,6 +22,10 @@ exports.createJob = async (req, res) => {
                 const response = await axios.post(`${AI_SERVICE_URL}/scrape-job`, { url });
                 if (response.data.success) {
                     description = response.data.data;
+                    // Structured fields from the posting fill in whatever the user left out
+                    const fields = response.data.fields || {};
+                    title = title || fields.title;
+                    company = company || fields.company;
                 }
             } catch (err) {
                 console.error("AI Service Error (Scraping):", err.message);
@@ -38,6 +42,12 @@ exports.createJob = async (req, res) => {
             sourceUrl: url
         });
 
+        // Precompute the job-side matching features once; matching still works if this fails
+        axios.post(`${AI_SERVICE_URL}/job-artifacts`, {
+            job_id: job._id.toString(),
+            job_description: job.description
+        }).catch(err => console.error("AI Service Error (Job Artifacts):", err.message));
+
         res.status(201).json({
             success: true,
             data: job
@@ -72,37 +82,36 @@ exports.matchCandidates = async (req, res) => {
         // Get all resumes (In prod, filter by active)
         const resumes = await Resume.find();
 
-        const matchedResumes = [];
-
-        for (const resume of resumes) {
-            // Need extracted text. If not in DB, we skip (or handle async)
-            // Ideally Resume model should have 'analyzedText' or we use rawText.
-            // For now, let's assume raw text is stored or we re-extract (expensive).
-            // Let's use 'rawText' field we added to Resume model.
-
-            // NOTE: In Phase 2 we didn't populate rawText yet.
-            // Assumption: Resume has text.
+        // Only resumes with extracted text can be scored
+        const scorable = resumes.filter(resume => resume.rawText || resume.parsedData);
+        const resumesById = new Map(scorable.map(resume => [resume._id.toString(), resume]));
 
-            if (resume.rawText || resume.parsedData) {
-                // Prepare text representation
-                const resumeText = resume.rawText || JSON.stringify(resume.parsedData);
+        const matchedResumes = [];
 
-                try {
-                    const response = await axios.post(`${AI_SERVICE_URL}/match-jobs`, {
-                        resume_text: resumeText,
-                        job_description: job.description
-                    });
+        if (scorable.length > 0) {
+            try {
+                // One batch call: the AI service fits TF-IDF once for the job and all resumes
+                const response = await axios.post(`${AI_SERVICE_URL}/match-jobs/batch`, {
+                    job_description: job.description,
+                    job_id: job._id.toString(),
+                    resumes: scorable.map(resume => ({
+                        id: resume._id.toString(),
+                        resume_text: resume.rawText || JSON.stringify(resume.parsedData)
+                    })),
+                    top_k: scorable.length
+                });
 
-                    if (response.data.success) {
+                if (response.data.success) {
+                    for (const result of response.data.data.results) {
                         matchedResumes.push({
-                            resume,
-                            score: response.data.data.match_percentage,
-                            missing_keywords: response.data.data.missing_keywords
+                            resume: resumesById.get(result.id),
+                            score: result.match_percentage,
+                            missing_keywords: result.missing_keywords
                         });
                     }
-                } catch (err) {
-                    console.error("Matching Error", err.message);
                 }
+            } catch (err) {
+                console.error("Matching Error", err.message);
             }
         }
 
@@ -11,6 +11,52 @@ if (AI_SERVICE_URL.endsWith('/')) {
     AI_SERVICE_URL = AI_SERVICE_URL.slice(0, -1);
 }
 
+// Queue S3 uploads on the AI service (/process-resume/async) instead of processing inline.
+// Only for deployments where the AI service is a long-running process: on Lambda queued jobs
+// stall when the container freezes and are not visible to other containers.
+const AI_ASYNC_PROCESSING = process.env.AI_ASYNC_PROCESSING === 'true';
+
+// Copy a successful /process-resume response onto the resume
+const applyAiResult = (resume, result) => {
+    resume.rawText = result.text_preview; // Or full text if we change API
+    // If API returns 'data' (JSON), save it
+    if (result.data) {
+        resume.parsedData = result.data;
+    }
+    resume.status = 'completed';
+    resume.processingJobId = undefined;
+};
+
+// Pull the latest status of a queued processing job from the AI service
+const syncProcessingStatus = async (resume) => {
+    if (resume.status !== 'processing' || !resume.processingJobId) {
+        return;
+    }
+    try {
+        const response = await axios.get(`${AI_SERVICE_URL}/jobs/${resume.processingJobId}`);
+        const job = response.data.data;
+        if (job.status === 'succeeded' && job.result && job.result.success) {
+            applyAiResult(resume, job.result);
+            await resume.save();
+        } else if (job.status === 'failed' || job.status === 'dead_letter') {
+            resume.status = 'failed';
+            resume.failureReason = job.error;
+            resume.processingJobId = undefined;
+            await resume.save();
+        }
+    } catch (error) {
+        // Job unknown (AI service restarted, or another instance) or polling failed: the job
+        // cannot be tracked any more, so fail the resume rather than leave it processing forever
+        console.error("Processing Status Error:", error.message);
+        resume.status = 'failed';
+        resume.failureReason = error.response && error.response.status === 404
+            ? 'Processing job not found on the AI service'
+            : `Could not get processing status: ${error.message}`;
+        resume.processingJobId = undefined;
+        await resume.save();
+    }
+};
+
 // @desc    Upload a resume
 // @route   POST /api/resumes/upload
 // @access  Private
@@ -47,22 +93,46 @@ exports.uploadResume = async (req, res) => {
                     Key: req.file.key,
                 });
 
-                // Url valid for 5 minutes
-                processingUrl = await getSignedUrl(s3, command, { expiresIn: 300 });
+                // Url valid for 15 minutes (processing may wait in the AI service queue)
+                processingUrl = await getSignedUrl(s3, command, { expiresIn: 900 });
             }
 
-            const aiResponse = await axios.post(`${AI_SERVICE_URL}/process-resume`, {
-                file_path: processingUrl
-            });
+            let aiResponse;
+            if (!req.file.key && req.file.path) {
+                // Local upload: push the bytes directly instead of sharing a path
+                const form = new FormData();
+                const buffer = await fs.promises.readFile(req.file.path);
+                form.append('file', new Blob([buffer], { type: req.file.mimetype }), req.file.originalname);
+                form.append('resume_id', resume._id.toString());
+                aiResponse = await axios.post(`${AI_SERVICE_URL}/process-resume/upload`, form);
+            } else {
+                const payload = {
+                    file_path: processingUrl,
+                    resume_id: resume._id.toString() // Adds the resume to the candidate search index
+                };
+                if (!AI_ASYNC_PROCESSING) {
+                    aiResponse = await axios.post(`${AI_SERVICE_URL}/process-resume`, payload);
+                } else {
+                    try {
+                        // Queue the work and return right away; status is synced when the resume is read
+                        const queued = await axios.post(`${AI_SERVICE_URL}/process-resume/async`, payload);
+                        resume.processingJobId = queued.data.job_id;
+                        resume.status = 'processing';
+                        await resume.save();
+                    } catch (queueError) {
+                        // Queue full (429) or disabled on the AI service (503): fall back to processing inline
+                        const status = queueError.response && queueError.response.status;
+                        if (status !== 429 && status !== 503) {
+                            throw queueError;
+                        }
+                        aiResponse = await axios.post(`${AI_SERVICE_URL}/process-resume`, payload);
+                    }
+                }
+            }
 
-            if (aiResponse.data.success) {
+            if (aiResponse && aiResponse.data.success) {
                 // 3. Update Resume with AI Data
-                resume.rawText = aiResponse.data.text_preview; // Or full text if we change API
-                // If API returns 'data' (JSON), save it
-                if (aiResponse.data.data) {
-                    resume.parsedData = aiResponse.data.data;
-                }
-                resume.status = 'completed';
+                applyAiResult(resume, aiResponse.data);
                 await resume.save();
             }
         } catch (aiError) {
@@ -83,7 +153,7 @@ exports.uploadResume = async (req, res) => {
         res.status(201).json({
             success: true,
             data: resume,
-            message: 'File uploaded and processed.'
+            message: resume.status === 'processing' ? 'File uploaded; processing started.' : 'File uploaded and processed.'
         });
 
     } catch (error) {
@@ -98,6 +168,7 @@ exports.uploadResume = async (req, res) => {
 exports.getMyResumes = async (req, res) => {
     try {
         const resumes = await Resume.find({ user: req.user.id }).sort({ createdAt: -1 });
+        await Promise.all(resumes.map(syncProcessingStatus));
         res.status(200).json({
             success: true,
             count: resumes.length,
@@ -124,6 +195,8 @@ exports.getResumeById = async (req, res) => {
             return res.status(401).json({ success: false, error: 'Not authorized' });
         }
 
+        await syncProcessingStatus(resume);
+
         res.status(200).json({
             success: true,
             data: resume
@@ -170,6 +243,13 @@ exports.deleteResume = async (req, res) => {
             }
         }
 
+        // Remove from the AI service's candidate search index (best effort)
+        try {
+            await axios.delete(`${AI_SERVICE_URL}/resume-index/${resume._id}`);
+        } catch (indexError) {
+            console.error("Resume Index Delete Error:", indexError.message);
+        }
+
         await resume.deleteOne();
 
         res.status(200).json({ success: true, data: {}, message: 'Resume deleted successfully' });
@@ -0,0 +1,33 @@
+const { AsyncLocalStorage } = require('async_hooks');
+const crypto = require('crypto');
+const axios = require('axios');
+
+const REQUEST_ID_HEADER = 'X-Request-ID';
+const requestContext = new AsyncLocalStorage();
+
+// Gives every request an id (the caller's X-Request-ID, or a new one), returns it
+// in the response and keeps it in async context for the rest of the request.
+exports.requestId = (req, res, next) => {
+    const incoming = req.get(REQUEST_ID_HEADER);
+    req.id = incoming ? incoming.slice(0, 128) : crypto.randomUUID();
+    res.set(REQUEST_ID_HEADER, req.id);
+    requestContext.run({ requestId: req.id }, next);
+};
+
+exports.currentRequestId = () => {
+    const store = requestContext.getStore();
+    return store ? store.requestId : undefined;
+};
+
+// Forward the id on outgoing axios calls (the AI service logs and echoes it),
+// so one id traces a request across both services
+axios.interceptors.request.use((config) => {
+    const id = exports.currentRequestId();
+    if (id) {
+        config.headers = config.headers || {};
+        if (!config.headers[REQUEST_ID_HEADER]) {
+            config.headers[REQUEST_ID_HEADER] = id;
+        }
+    }
+    return config;
+});
@@ -56,6 +56,10 @@ const resumeSchema = new mongoose.Schema({
     failureReason: {
         type: String
     },
+    // AI service job id while processing runs in the background
+    processingJobId: {
+        type: String
+    },
     createdAt: {
         type: Date,
         default: Date.now